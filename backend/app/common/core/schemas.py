@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class IResourceCache(BaseModel):
     resources: List[str]
+
+
+class IFileBundle(BaseModel):
+    ids: List[int] = Field(min_length=1, title="附件ID")
+    filename: Optional[str] = Field(default=None, max_length=200, title="压缩包名称")
+    compress: bool = Field(
+        default=True, title="压缩", description="已压缩的格式始终存储"
+    )
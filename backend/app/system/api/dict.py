@@ -1,6 +1,6 @@
 from pathlib import Path as FilePath
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from app.system.logic.dict_logic import DictLogic
 from app.system.model.dict_data import (
@@ -16,6 +16,9 @@ from app.system.model.dict_type import (
     DictTypeUpdate,
 )
 from senweaver import senweaver_router
+from senweaver.auth.security import requires_user
+from senweaver.exception.http_exception import BadRequestException
+from senweaver.utils.response import cached_response
 
 from ..system import module
 
@@ -23,6 +26,24 @@ path = FilePath(__file__)
 
 router = APIRouter(tags=["字典"], route_class=module.route_class)
 
+# 一次请求最多获取的字典类型数量
+REFERENCE_MAX_TYPES = 100
+
+
+@router.get("/dict/reference", summary="批量获取字典数据")
+@requires_user()
+async def get_reference(
+    request: Request,
+    types: str = Query(..., description="字典类型，多个用逗号分隔"),
+) -> Response:
+    type_list = list(dict.fromkeys(item.strip() for item in types.split(",")))
+    type_list = [item for item in type_list if item]
+    if not type_list or len(type_list) > REFERENCE_MAX_TYPES:
+        raise BadRequestException(f"字典类型数量应为 1 到 {REFERENCE_MAX_TYPES} 个")
+    etag, content = await DictLogic.get_reference(request.auth.db.session, type_list)
+    return cached_response(request, etag, content)
+
+
 type_router = senweaver_router(module=module, model=DictType, path=f"/dict/type")
 router.include_router(type_router)
 
@@ -1,14 +1,16 @@
 from pathlib import Path as FilePath
 from typing import List, Optional
 
-from fastapi import APIRouter, File, Form, Request, UploadFile
+from fastapi import APIRouter, File, Form, Query, Request, UploadFile
 
 from app.system.model.attachment import Attachment
 from senweaver import senweaver_router
 from senweaver.core.helper import SenweaverFilter
 from senweaver.utils.response import ResponseBase, success_response
 
+from ..logic.attachment_logic import AttachmentLogic
 from ..logic.common_logic import CommonLogic
+from ..schema.file import IChunkUploadInit
 from ..system import module
 
 path = FilePath(__file__)
@@ -75,4 +77,39 @@ async def upload(
     return success_response(data)
 
 
+@_router.post("/file/upload/init", summary="创建分片上传")
+async def chunk_upload_init(request: Request, data: IChunkUploadInit) -> ResponseBase:
+    data = await CommonLogic.init_chunk_upload(request, data)
+    return success_response(data)
+
+
+@_router.get("/file/upload/{upload_id}", summary="获取已上传的分片")
+async def chunk_upload_status(request: Request, upload_id: str) -> ResponseBase:
+    data = await CommonLogic.get_chunk_status(request, upload_id)
+    return success_response(data)
+
+
+@_router.put("/file/upload/{upload_id}/{index}", summary="上传分片")
+async def chunk_upload(request: Request, upload_id: str, index: int) -> ResponseBase:
+    data = await CommonLogic.upload_chunk(request, upload_id, index)
+    return success_response(data)
+
+
+@_router.post("/file/upload/{upload_id}/complete", summary="完成分片上传")
+async def chunk_upload_complete(request: Request, upload_id: str) -> ResponseBase:
+    data = await CommonLogic.complete_chunk_upload(request, upload_id)
+    return success_response(data)
+
+
+@_router.post("/file/gc", summary="清理临时附件")
+async def attachment_gc(
+    request: Request,
+    dry_run: bool = Query(True, description="只统计，不删除"),
+    max_age: Optional[int] = Query(None, ge=0, description="保留时间，单位：秒"),
+    unreferenced: Optional[bool] = Query(None, description="清理没有被引用的附件"),
+) -> ResponseBase:
+    data = await AttachmentLogic.collect(dry_run, max_age, unreferenced)
+    return success_response(data)
+
+
 router.include_router(_router)
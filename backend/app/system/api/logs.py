@@ -9,6 +9,7 @@ from senweaver import senweaver_router
 from senweaver.auth.security import Authorizer
 from senweaver.core.helper import FieldConfig, RelationConfig, SenweaverFilter
 
+from ..logic.log_logic import LogLogic
 from ..system import module
 
 path = FilePath(__file__)
@@ -23,6 +24,9 @@ login_filter_config = SenweaverFilter(
         "system": None,
         "browser": None,
         "created_time": None,
+        # 按时间范围过滤，分区表只扫描范围内的分区
+        "created_time__gte": None,
+        "created_time__lt": None,
     },
     fields=[
         "id",
@@ -64,6 +68,8 @@ oper_filter_config = SenweaverFilter(
         "system": None,
         "browser": None,
         "creator_id": None,
+        "created_time__gte": None,
+        "created_time__lt": None,
     },
     fields=[
         "id",
@@ -112,6 +118,7 @@ oper_router = senweaver_router(
     deleted_methods=["create", "update"],
     filter_config=oper_filter_config,
     path=f"/logs/operation",
+    callbacks={"read": LogLogic.read_operation_log},
 )
 
 user_login_router = senweaver_router(
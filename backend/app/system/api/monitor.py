@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+
+from senweaver.auth.security import requires_permissions
+from senweaver.db.session import get_pool_stats
+from senweaver.middleware.db import db
+from senweaver.utils.response import ResponseBase, success_response
+
+from ..system import module
+
+router = APIRouter(tags=["系统监控"], prefix="/monitor", route_class=module.route_class)
+
+
+@router.get("/database", summary="数据库连接池状态")
+@requires_permissions(f"{module.get_auth_str("Monitor", "database")}")
+async def database_stats(request: Request) -> ResponseBase:
+    return success_response(pool=get_pool_stats(), session=db.stats.to_dict())
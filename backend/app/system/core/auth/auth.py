@@ -1,3 +1,5 @@
+from datetime import timedelta
+from time import time
 from typing import Any, Generic, Optional, Sequence, Union
 
 import orjson
@@ -10,16 +12,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from starlette.requests import HTTPConnection
 
+from app.system.core.auth.claims import (
+    PermissionSet,
+    get_auth_menus,
+    load_permission_set,
+    parse_menus,
+)
 from app.system.core.auth.permission import get_allow_fields, get_data_filters
+from app.system.logic.attachment_logic import AttachmentLogic
 from app.system.logic.common_logic import CommonLogic
-from app.system.model import Dept, LoginLog, Menu, OperationLog, User
-from app.system.model.role_menu import RoleMenu
+from app.system.logic.log_logic import LogLogic
+from app.system.model import (
+    Dept,
+    DeptRole,
+    LoginLog,
+    Menu,
+    OperationLog,
+    Post,
+    Role,
+    RoleMenu,
+    User,
+    UserPost,
+    UserRole,
+)
+from config.settings import settings
 from senweaver.auth import models
 from senweaver.auth.auth import Auth
 from senweaver.auth.constants import (
+    SENWEAVER_ACCESS_TOKEN,
     SENWEAVER_FIELDS,
     SENWEAVER_FILTERS,
     SENWEAVER_MENUS,
+    SENWEAVER_PERMISSION_SET,
     SENWEAVER_PERMS,
     SENWEAVER_REQ_MENU,
     SENWEAVER_ROLE_IDS,
@@ -29,9 +53,11 @@ from senweaver.auth.constants import (
 )
 from senweaver.auth.models import IntegerIDMixin
 from senweaver.auth.schemas import ILoginLog, IOperationLog
+from senweaver.constants import TokenTypeEnum
 from senweaver.core.helper import get_file_url
 from senweaver.db.types import ModelType
 from senweaver.exception.http_exception import BadRequestException, ForbiddenException
+from senweaver.utils.cache import VersionedCache
 from senweaver.utils.encrypt import AESCipherV2
 from senweaver.utils.globals import g
 
@@ -41,6 +67,33 @@ class SystemAuth(
     Auth[models.UserProtocolType, models.ID],
     Generic[models.UserProtocolType, models.ID],
 ):
+    # 角色组合、权限摘要到权限的映射，缓存版本即 token 中的全局权限版本
+    permission_cache = VersionedCache(
+        "auth_permission",
+        tables=(
+            Role.__tablename__,
+            Menu.__tablename__,
+            RoleMenu.__tablename__,
+            DeptRole.__tablename__,
+        ),
+        maxsize=1024,
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
+    # 按 token 鉴权时的用户，用户、部门、角色、岗位变更时失效
+    user_cache = VersionedCache(
+        "auth_user",
+        tables=(
+            User.__tablename__,
+            Dept.__tablename__,
+            Role.__tablename__,
+            Post.__tablename__,
+            UserRole.__tablename__,
+            UserPost.__tablename__,
+            DeptRole.__tablename__,
+        ),
+        maxsize=settings.TOKEN_USER_CACHE_SIZE,
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
 
     async def add_login_log(
         self, request: Request, log: ILoginLog, user: models.UserProtocolType
@@ -60,15 +113,19 @@ class SystemAuth(
                 system=client.os,
                 agent=client.user_agent,
                 login_type=log.login_type,
+                is_enriched=client.enriched,
             ),
         )
 
     async def add_oper_log(self, log: IOperationLog):
         client = log.client
+        body, response_result, payload = LogLogic.pack_payloads(
+            orjson.dumps(log.request_data), orjson.dumps(log.response_result)
+        )
         oper_log = OperationLog(
             module=log.title,
             path=log.path,
-            body=orjson.dumps(log.request_data),
+            body=body,
             method=log.method,
             ipaddress=client.ip,
             country=client.country,
@@ -76,13 +133,21 @@ class SystemAuth(
             city=client.city,
             browser=client.browser,
             system=client.os,
+            agent=client.user_agent,
+            is_enriched=client.enriched,
             response_code=log.response_code,
-            respone_result=orjson.dumps(log.response_result),
+            response_result=response_result,
             status_code=log.status_code,
             cost_time=log.cost_time,
         )
         async with self.db(commit_on_exit=True):
-            await FastCRUD(OperationLog).create(self.db.session, oper_log)
+            session: AsyncSession = self.db.session
+            session.add(oper_log)
+            if payload is not None:
+                await session.flush()
+                payload.id = oper_log.id
+                payload.created_time = oper_log.created_time
+                session.add(payload)
 
     async def get_user(
         self, db: AsyncSession = None, **kwargs: Any
@@ -161,11 +226,24 @@ class SystemAuth(
         # if not file_data:
         #     raise NotFoundException("文件不存在")
         await FastCRUD(User).update(session, {"avatar": path}, id=request.user.id)
+        await AttachmentLogic.mark_used(session, filepaths=[path])
         return {"path": path}
 
     async def check_file_permission(self, request: Request):
         pass
 
+    @classmethod
+    def get_user_roles(cls, user: User) -> tuple[set[str], set[models.ID]]:
+        """用户和所在部门的角色，返回 (角色编码, 角色 id)"""
+        role_scope = set()
+        role_id_scope = set()
+        user_roles = user.roles if user.roles else []
+        dept_roles = user.dept.roles if user.dept and user.dept.roles else []
+        for role in user_roles + dept_roles:
+            role_scope.add(role.code)
+            role_id_scope.add(role.id)
+        return role_scope, role_id_scope
+
     def get_role_scope(
         self, conn: Optional[HTTPConnection] = None
     ) -> tuple[set[str], set[models.ID]]:
@@ -176,18 +254,110 @@ class SystemAuth(
         role_scope = conn.scope.get(SENWEAVER_ROLES, None)
         role_id_scope = conn.scope.get(SENWEAVER_ROLE_IDS, None)
         if role_scope is None or role_id_scope is None:
-            role_scope = set()
-            role_id_scope = set()
-            user_roles = user.roles if user.roles else []
-            dept_roles = user.dept.roles if user.dept and user.dept.roles else []
-            roles = user_roles + dept_roles
-            for role in roles:
-                role_scope.add(role.code)
-                role_id_scope.add(role.id)
+            role_scope, role_id_scope = self.get_user_roles(user)
             conn.scope[SENWEAVER_ROLES] = role_scope
             conn.scope[SENWEAVER_ROLE_IDS] = role_id_scope
         return role_scope, role_id_scope
 
+    async def get_permission_set(self, role_ids: list) -> tuple[str, PermissionSet]:
+        """返回当前权限版本和角色组合的权限"""
+        version = await self.permission_cache.sync()
+        key = "roles:" + ",".join(str(role_id) for role_id in role_ids)
+        permission_set = self.permission_cache.get(key)
+        if permission_set is None:
+            permission_set = await load_permission_set(self.db.session, role_ids)
+            # 权限相同的角色组合共用一个实例
+            digest_key = f"digest:{permission_set.digest}"
+            permission_set = self.permission_cache.get(digest_key) or permission_set
+            self.permission_cache.put(key, permission_set, version)
+            self.permission_cache.put(digest_key, permission_set, version)
+        return version, permission_set
+
+    async def get_token_claims(self, user: User) -> dict[str, Any]:
+        """
+        开启 TOKEN_PERMISSION_CLAIMS 时，access token 携带
+        {"v": 权限版本, "h": 权限摘要, "r": 角色 id, "d": 部门 id}
+        """
+        if not settings.TOKEN_PERMISSION_CLAIMS:
+            return {}
+        _, role_ids = self.get_user_roles(user)
+        role_ids = sorted(role_ids)
+        version, permission_set = await self.get_permission_set(role_ids)
+        return {
+            "pc": {
+                "v": version,
+                "h": permission_set.digest,
+                "r": role_ids,
+                "d": user.dept_id,
+            }
+        }
+
+    async def get_cached_user(self, user_id: models.ID) -> Optional[User]:
+        version = await self.user_cache.sync()
+        key = str(user_id)
+        user = self.user_cache.get(key)
+        if user is None:
+            # 在独立的会话中加载，缓存的对象不受请求会话提交、回滚的影响
+            async with self.db():
+                user = await self.get_user(id=user_id, is_active=True)
+            if user is None:
+                return None
+            self.user_cache.put(key, user, version)
+        return user
+
+    async def get_current_user(self, conn: HTTPConnection) -> Optional[User]:
+        """
+        token 携带权限时，用户和权限都从进程内缓存读取，不查询数据库和 redis。
+
+        权限版本、角色或部门与 token 不一致时按当前权限鉴权，
+        并通过响应头换发 access token，过期时间不变
+        """
+        if (
+            not settings.TOKEN_PERMISSION_CLAIMS
+            or "user" in conn.scope
+            or getattr(self.channel, "token_model", None)  # 需要查询 token 黑名单
+            or not hasattr(self.channel, "decode_token")
+        ):
+            return await super().get_current_user(conn)
+        token = self.manager.get_token(
+            conn, self.header_name, self.cookie_name, self.query_name
+        )
+        payload = self.channel.decode_token(token) if token else None
+        if payload is None:
+            return None
+        claims = payload.get("pc")
+        if claims is None:
+            # 开启前签发的 token
+            return await super().get_current_user(conn)
+        user = await self.get_cached_user(self.parse_id(payload["sub"]))
+        if user is None:
+            return None
+        conn.scope["user"] = user
+        _, role_ids = self.get_role_scope(conn)
+        role_ids = sorted(role_ids)
+        version = await self.permission_cache.sync()
+        permission_set = None
+        changed = (
+            claims["v"] != version
+            or claims["r"] != role_ids
+            or claims["d"] != user.dept_id
+        )
+        if not changed:
+            permission_set = self.permission_cache.get(f"digest:{claims['h']}")
+        if permission_set is None:
+            version, permission_set = await self.get_permission_set(role_ids)
+            if changed or permission_set.digest != claims["h"]:
+                new_token, _ = await self.channel.write_token(
+                    user,
+                    expires_delta=timedelta(seconds=max(payload["exp"] - time(), 1)),
+                    token_type=TokenTypeEnum.access,
+                    **await self.get_token_claims(user),
+                )
+                conn.scope[SENWEAVER_ACCESS_TOKEN] = new_token
+        conn.scope[SENWEAVER_PERMISSION_SET] = permission_set
+        setattr(conn.state, SENWEAVER_MENUS, set(permission_set.menu_ids))
+        return user
+
     async def get_menu_scope(self, conn: Optional[HTTPConnection] = None):
         conn = conn or g.request
         _, role_ids = self.get_role_scope(conn)
@@ -220,37 +390,33 @@ class SystemAuth(
         if user.id == 1:
             setattr(conn.state, SENWEAVER_SUPERUSER, True)  # 超级管理员
             return True
-        db: AsyncSession = self.db.session
         auth_scopes = conn.scope.get(SENWEAVER_PERMS, None)
         menu_scopes = await self.get_menu_scope(conn)
         menu_id = getattr(conn.state, SENWEAVER_REQ_MENU, 0)
         if auth_scopes is None or not menu_id:
-            auth_scopes = set()
-            auth_menus = await FastCRUD(Menu).get_multi(
-                db,
-                return_total_count=False,
-                is_active=True,
-                limit=None,
-                id__in=menu_scopes,
-                auths__or={"is_not": None, "ne": ""},
+            permission_set: Optional[PermissionSet] = conn.scope.get(
+                SENWEAVER_PERMISSION_SET
             )
+            if permission_set is None:
+                menus = parse_menus(await get_auth_menus(self.db.session, menu_scopes))
+                auth_scopes = set().union(*(menu.auths for menu in menus))
+            else:
+                menus = permission_set.menus
+                auth_scopes = permission_set.auths
             route_path = conn.scope["route"].path
             scopes_set = set(scopes)
             url_path_menu = []
             route_path_menu = []
             scope_menu = []
             scope_method = conn.scope.get("method")
-            for menu in auth_menus["data"]:
-                menu_auths = menu["auths"].split(",")
-                auth_list = [auth.strip() for auth in menu_auths if auth.strip()]
-                if menu["menu_type"] == Menu.MenuChoices.PERMISSION.value:
-                    if conn.url.path == menu["path"] and scope_method == menu["method"]:
-                        url_path_menu.append(menu["id"])
-                    elif route_path == menu["path"] and scope_method == menu["method"]:
-                        route_path_menu.append(menu["id"])
-                    elif scopes_set & set(auth_list):
-                        scope_menu.append(menu["id"])
-                auth_scopes.update(auth_list)
+            for menu in menus:
+                if menu.is_permission:
+                    if conn.url.path == menu.path and scope_method == menu.method:
+                        url_path_menu.append(menu.id)
+                    elif route_path == menu.path and scope_method == menu.method:
+                        route_path_menu.append(menu.id)
+                    elif scopes_set & menu.auths:
+                        scope_menu.append(menu.id)
             if url_path_menu:
                 menu_id = url_path_menu[0]
             elif route_path_menu:
@@ -0,0 +1,83 @@
+import hashlib
+from typing import Iterable, NamedTuple, Optional
+
+import orjson
+from fastcrud import FastCRUD
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.system.model import Menu, RoleMenu
+
+
+class MenuAuth(NamedTuple):
+    id: int
+    is_permission: bool
+    path: Optional[str]
+    method: Optional[str]
+    auths: frozenset[str]
+
+
+class PermissionSet(NamedTuple):
+    """一组角色的菜单和权限码，加载后只读，拥有相同权限的角色组合共用"""
+
+    digest: str
+    menu_ids: frozenset
+    auths: frozenset[str]
+    menus: tuple[MenuAuth, ...]
+
+
+async def get_auth_menus(db: AsyncSession, menu_ids: Iterable) -> list[dict]:
+    """设置了权限码的启用菜单"""
+    result = await FastCRUD(Menu).get_multi(
+        db,
+        return_total_count=False,
+        is_active=True,
+        limit=None,
+        id__in=menu_ids,
+        auths__or={"is_not": None, "ne": ""},
+    )
+    return result["data"]
+
+
+def parse_menus(rows: Iterable[dict]) -> tuple[MenuAuth, ...]:
+    menus = []
+    for menu in rows:
+        auths = frozenset(
+            auth.strip() for auth in menu["auths"].split(",") if auth.strip()
+        )
+        menus.append(
+            MenuAuth(
+                id=menu["id"],
+                is_permission=menu["menu_type"] == Menu.MenuChoices.PERMISSION.value,
+                path=menu["path"],
+                method=menu["method"],
+                auths=auths,
+            )
+        )
+    return tuple(menus)
+
+
+async def load_permission_set(db: AsyncSession, role_ids: Iterable) -> PermissionSet:
+    result = await FastCRUD(RoleMenu).get_multi(
+        db, role_id__in=role_ids, limit=None, return_total_count=False
+    )
+    menu_ids = frozenset(rm["menu_id"] for rm in result["data"])
+    menus = parse_menus(await get_auth_menus(db, list(menu_ids)))
+    # 摘要只由权限内容决定，与角色组合无关
+    digest = hashlib.blake2b(
+        orjson.dumps(
+            [
+                sorted(menu_ids),
+                sorted(
+                    [menu.id, menu.path, menu.method, sorted(menu.auths)]
+                    for menu in menus
+                ),
+            ]
+        ),
+        digest_size=8,
+    ).hexdigest()
+    return PermissionSet(
+        digest=digest,
+        menu_ids=menu_ids,
+        auths=frozenset().union(*(menu.auths for menu in menus)),
+        menus=menus,
+    )
@@ -1,58 +1,219 @@
+import asyncio
 import datetime
 import time
 import uuid
-from typing import Any, Callable, Dict, List
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
 
 import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
 from starlette.websockets import WebSocketState
 
+from config.settings import settings
 from senweaver.logger import logger
 
 app = FastAPI()
 
+# 队列满时的处理策略
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # 丢弃最早的消息
+OVERFLOW_COALESCE = "coalesce"  # 丢弃同类型(action)中最早的消息
+OVERFLOW_DISCONNECT = "disconnect"  # 断开连接
+
+
+class Connection:
+    """单个连接的状态，消息放入发送队列后由独立的发送任务写出，慢客户端不会阻塞广播"""
+
+    __slots__ = (
+        "client_id",
+        "connection_id",
+        "user_id",
+        "websocket",
+        "queue",
+        "ready",
+        "writer",
+        "last_seen",
+        "dropped",
+        "closed",
+    )
+
+    def __init__(self, client_id: str, websocket: WebSocket):
+        self.client_id = client_id
+        self.connection_id = f"{client_id}-{uuid.uuid4()}"
+        user = websocket.scope.get("user") if websocket is not None else None
+        self.user_id = getattr(user, "id", None)
+        self.websocket = websocket
+        # 元素为 (action, text)，text 为已编码的消息，广播时所有连接共享同一个字符串
+        self.queue: deque[tuple[Optional[str], str]] = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, text: str, action: Optional[str] = None) -> bool:
+        """放入发送队列，返回 False 表示按策略需要断开连接"""
+        if self.closed:
+            return True
+        queue = self.queue
+        if len(queue) >= settings.WEBSOCKET_QUEUE_SIZE:
+            policy = settings.WEBSOCKET_OVERFLOW_POLICY
+            if policy == OVERFLOW_DISCONNECT:
+                return False
+            self.dropped += 1
+            if policy == OVERFLOW_COALESCE and action is not None:
+                for item in queue:
+                    if item[0] == action:
+                        queue.remove(item)
+                        break
+                else:
+                    queue.popleft()
+            else:
+                queue.popleft()
+        queue.append((action, text))
+        self.ready.set()
+        return True
+
+    def stop(self):
+        self.closed = True
+        self.queue.clear()
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+
+    async def write(self):
+        websocket = self.websocket
+        queue = self.queue
+        while True:
+            await self.ready.wait()
+            while queue:
+                _, text = queue.popleft()
+                await websocket.send_text(text)
+            self.ready.clear()
+
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.connection_ids: Dict[str, str] = {}
+        self.active_connections: Dict[str, Connection] = {}
+        self.user_clients: Dict[str, str] = {}  # 用户ID -> client_id
         self.subscribers: Dict[str, List[Callable]] = {}
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        # 后台关闭连接的任务，保留引用避免执行完成前被回收
+        self.close_tasks: set[asyncio.Task] = set()
 
-    async def connect(self, client_id: str, websocket: WebSocket):
-        self.active_connections[client_id] = websocket
-        self.connection_ids[client_id] = f"{client_id}-{uuid.uuid4()}"
+    @property
+    def connection_ids(self) -> Dict[str, str]:
+        return {
+            client_id: connection.connection_id
+            for client_id, connection in self.active_connections.items()
+        }
 
-    def disconnect(self, client_id: str):
-        self.active_connections.pop(client_id, None)
-        self.connection_ids.pop(client_id, None)
+    async def connect(self, client_id: str, websocket: WebSocket) -> Connection:
+        connection = Connection(client_id, websocket)
+        previous = self.active_connections.get(client_id)
+        self.active_connections[client_id] = connection
+        if connection.user_id is not None:
+            self.user_clients[str(connection.user_id)] = client_id
+        if previous is not None:
+            # 同一客户端重复连接时关闭旧连接
+            await self.close(previous, status.WS_1000_NORMAL_CLOSURE, "Reconnected")
+        connection.writer = asyncio.create_task(self._run_writer(connection))
+        if settings.WEBSOCKET_PING_INTERVAL > 0 and (
+            self.heartbeat_task is None or self.heartbeat_task.done()
+        ):
+            self.heartbeat_task = asyncio.create_task(self.heartbeat())
+        return connection
+
+    def disconnect(self, client_id: str, connection: Optional[Connection] = None):
+        current = self.active_connections.get(client_id)
+        if current is not None and (connection is None or current is connection):
+            self.active_connections.pop(client_id, None)
+            if self.user_clients.get(str(current.user_id)) == client_id:
+                self.user_clients.pop(str(current.user_id), None)
+        connection = connection or current
+        if connection is not None:
+            connection.stop()
+
+    async def close(self, connection: Connection, code: int, reason: str):
+        self.disconnect(connection.client_id, connection)
+        websocket = connection.websocket
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return
+        try:
+            await websocket.close(code=code, reason=reason)
+        except RuntimeError as exc:
+            # This is to catch the following error:
+            #  Unexpected ASGI message 'websocket.close', after sending 'websocket.close'
+            if "after sending" in str(exc):
+                logger.error(f"Error closing connection: {exc}")
 
     async def close_connection(self, client_id: str, code: int, reason: str):
-        if websocket := self.active_connections[client_id]:
-            try:
-                await websocket.close(code=code, reason=reason)
-                self.disconnect(client_id)
-            except RuntimeError as exc:
-                # This is to catch the following error:
-                #  Unexpected ASGI message 'websocket.close', after sending 'websocket.close'
-                if "after sending" in str(exc):
-                    logger.error(f"Error closing connection: {exc}")
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections.values():
-            await connection.send_text(message)
+        if connection := self.active_connections.get(client_id):
+            await self.close(connection, code, reason)
+
+    async def _run_writer(self, connection: Connection):
+        try:
+            await connection.write()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # 发送失败说明连接已断开，由接收循环负责清理
+            logger.debug(f"Error sending websocket message: {exc}")
+            self.disconnect(connection.client_id, connection)
+
+    def _enqueue(self, connection: Connection, text: str, action: Optional[str] = None):
+        if not connection.put(text, action):
+            logger.warning(
+                f"WebSocket 发送队列已满，断开连接：{connection.connection_id}"
+            )
+            task = asyncio.create_task(
+                self.close(
+                    connection, status.WS_1008_POLICY_VIOLATION, "Send queue overflow"
+                )
+            )
+            self.close_tasks.add(task)
+            task.add_done_callback(self.close_tasks.discard)
+
+    async def heartbeat(self):
+        """定时发送心跳，设置了空闲时间时断开超过该时间未收到消息的连接"""
+        while self.active_connections:
+            await asyncio.sleep(settings.WEBSOCKET_PING_INTERVAL)
+            now = time.monotonic()
+            idle_timeout = settings.WEBSOCKET_IDLE_TIMEOUT
+            ping = orjson.dumps(
+                {"time": time.time(), "action": "ping", "data": {}}
+            ).decode("utf-8")
+            for connection in list(self.active_connections.values()):
+                if idle_timeout > 0 and now - connection.last_seen > idle_timeout:
+                    await self.close(
+                        connection, status.WS_1001_GOING_AWAY, "Idle timeout"
+                    )
+                else:
+                    self._enqueue(connection, ping, "ping")
+
+    async def broadcast(self, message: str, action: Optional[str] = None):
+        for connection in list(self.active_connections.values()):
+            self._enqueue(connection, message, action)
 
     async def broadcast_json(self, message: Any):
         json_msg = orjson.dumps(message).decode("utf-8")
-        for connection in self.active_connections.values():
-            await connection.send_text(json_msg)
+        action = message.get("action") if isinstance(message, dict) else None
+        await self.broadcast(json_msg, action)
 
-    async def send_message(self, client_id: str, message: str):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_text(message)
+    async def send_message(
+        self, client_id: str, message: str, action: Optional[str] = None
+    ):
+        if connection := self.active_connections.get(client_id):
+            self._enqueue(connection, message, action)
 
     async def send_json(self, client_id: str, message: Any):
-        websocket = self.active_connections[client_id]
-        await websocket.send_json(message)
+        action = message.get("action") if isinstance(message, dict) else None
+        await self.send_message(
+            client_id, orjson.dumps(message).decode("utf-8"), action
+        )
+
+    async def send_user_data(self, user_id: Any, action: str, content: Any):
+        """按用户ID推送消息，用户未连接到当前进程时忽略"""
+        if client_id := self.user_clients.get(str(user_id)):
+            await self.send_data(client_id, action, content)
 
     def subscribe(self, topic: str, callback: Callable):
         if topic not in self.subscribers:
@@ -68,6 +229,11 @@ class WebSocketManager:
         self, websocket: WebSocket, client_id: str, payload: Dict
     ):
         action = payload.get("action")
+        if action == "pong":
+            return
+        if action == "ping":
+            await self.send_data(client_id, "pong", {})
+            return
         if not action or action not in ["userinfo", "push_message", "chat_message"]:
             raise RuntimeError(f"action error {client_id}")
         data = payload.get("data", {})
@@ -124,40 +290,33 @@ class WebSocketManager:
         return await self.send_json(client_id, data)
 
     async def handle_websocket(self, client_id: str, websocket: WebSocket):
-        await self.connect(client_id, websocket)
+        connection = await self.connect(client_id, websocket)
         try:
             while True:
                 json_payload = await websocket.receive_json()
+                connection.last_seen = time.monotonic()
                 if isinstance(json_payload, str):
                     payload = orjson.loads(json_payload)
                 elif isinstance(json_payload, dict):
                     payload = json_payload
 
                 await self.process_message(websocket, client_id, payload)
+        except WebSocketDisconnect:
+            pass
         except Exception as exc:
             # Handle any exceptions that might occur
-            logger.exception(f"Error handling websocket: {exc}")
-            if websocket.client_state == WebSocketState.CONNECTED:
-                await self.close_connection(
-                    client_id=client_id,
-                    code=status.WS_1011_INTERNAL_ERROR,
-                    reason=str(exc),
-                )
-            elif websocket.client_state == WebSocketState.DISCONNECTED:
-                self.disconnect(client_id)
-
+            if not connection.closed:
+                logger.exception(f"Error handling websocket: {exc}")
+                await self.close(connection, status.WS_1011_INTERNAL_ERROR, str(exc))
         finally:
             try:
                 # first check if the connection is still open
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await self.close_connection(
-                        client_id=client_id,
-                        code=status.WS_1000_NORMAL_CLOSURE,
-                        reason="Client disconnected",
-                    )
+                await self.close(
+                    connection, status.WS_1000_NORMAL_CLOSURE, "Client disconnected"
+                )
             except Exception as exc:
                 logger.error(f"Error closing connection: {exc}")
-            self.disconnect(client_id)
+            self.disconnect(client_id, connection)
 
 
 manager = WebSocketManager()
@@ -0,0 +1,363 @@
+import asyncio
+import re
+import shutil
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import (
+    Column,
+    Text,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import settings
+from senweaver.db.routing import use_primary
+from senweaver.logger import logger
+from senweaver.middleware.db import db
+
+from ..model.attachment import Attachment, AttachmentBlob
+from ..model.system_config import SystemConfig
+from ..model.user import User
+from ..model.user_config import UserConfig
+from ..system import module
+
+
+class AttachmentLogic:
+    # 以存储路径引用附件的字段，外键引用的字段自动识别
+    reference_paths: list[Column] = [User.avatar]
+    # 在文本或 JSON 中以 URL 或路径引用附件的字段，插件可以追加
+    reference_texts: list[Column] = [SystemConfig.value, UserConfig.value]
+    # 文件引用变为 0 后保留的时间，单位：秒
+    blob_grace = 300
+
+    @classmethod
+    def get_reference_conditions(cls) -> list:
+        """附件未被引用的条件：没有外键指向附件，也没有字段保存附件路径"""
+        table = Attachment.__table__
+        conditions = []
+        for other in table.metadata.sorted_tables:
+            for fk in other.foreign_keys:
+                if fk.column.table is table:
+                    conditions.append(~exists().where(fk.parent == fk.column))
+        for column in cls.reference_paths:
+            conditions.append(~exists().where(column == Attachment.filepath))
+        # 文本字段需要逐行匹配，只在清理任务中使用
+        for column in cls.reference_texts:
+            conditions.append(
+                ~exists().where(cast(column, Text).contains(Attachment.filepath))
+            )
+        return conditions
+
+    @classmethod
+    def get_upload_paths(cls, value: Any) -> set[str]:
+        """提取文本或 JSON 值中的附件存储路径，包括上传 URL 和直接保存的路径"""
+        paths = set()
+        if isinstance(value, dict):
+            for item in value.values():
+                paths.update(cls.get_upload_paths(item))
+        elif isinstance(value, (list, tuple, set)):
+            for item in value:
+                paths.update(cls.get_upload_paths(item))
+        elif isinstance(value, str) and value:
+            pattern = (
+                re.escape(settings.UPLOAD_URL.strip("/")) + r"/([^\s\"'<>()?#\\]+)"
+            )
+            paths.update(re.findall(pattern, value))
+            if len(value) <= 255 and not re.search(r"[\s\"'<>]", value):
+                paths.add(value.lstrip("/"))
+        return paths
+
+    @classmethod
+    async def mark_used(
+        cls,
+        db: AsyncSession,
+        ids: Optional[list] = None,
+        filepaths: Optional[list] = None,
+    ):
+        """附件被引用后不再是临时附件，清理任务不会按过期时间删除"""
+        conditions = []
+        if ids:
+            conditions.append(Attachment.id.in_(list(ids)))
+        if filepaths:
+            conditions.append(Attachment.filepath.in_(list(filepaths)))
+        if not conditions:
+            return
+        await db.execute(
+            update(Attachment)
+            .where(or_(*conditions), Attachment.is_tmp == True)
+            .values(is_tmp=False)
+        )
+
+    @classmethod
+    async def mark_used_in(cls, db: AsyncSession, *values: Any):
+        """表单、设置等值中引用的附件不再是临时附件"""
+        filepaths = cls.get_upload_paths(values)
+        if filepaths:
+            await cls.mark_used(db, filepaths=list(filepaths))
+
+    @classmethod
+    async def find_garbage(
+        cls,
+        db: AsyncSession,
+        cutoff: datetime,
+        last_id: Optional[int],
+        batch_size: int,
+        unreferenced: bool,
+    ) -> list:
+        """
+        按 id 分页查找过期的临时附件和未被引用的附件，
+        临时附件也需要检查引用，引用时没有清除标记的附件不会被删除
+        """
+        stmt = select(Attachment.id, Attachment.filepath, Attachment.filesize).where(
+            Attachment.created_time < cutoff,
+            or_(Attachment.storage.is_(None), Attachment.storage == "local"),
+            *cls.get_reference_conditions(),
+        )
+        if not unreferenced:
+            stmt = stmt.where(Attachment.is_tmp == True)
+        if last_id is not None:
+            stmt = stmt.where(Attachment.id > last_id)
+        result = await db.execute(stmt.order_by(Attachment.id).limit(batch_size))
+        return result.all()
+
+    @classmethod
+    async def release_files(cls, db: AsyncSession, filepaths: Counter) -> list[str]:
+        """
+        减少已删除附件的文件引用次数，返回可以删除的旧文件。
+
+        按内容存储的文件引用为 0 时由 `sweep_blobs` 删除，
+        没有文件记录的旧附件在没有其他附件使用时直接删除
+        """
+        blob_table = AttachmentBlob.__table__
+        await db.execute(
+            blob_table.update()
+            .where(blob_table.c.filepath == bindparam("b_filepath"))
+            .where(blob_table.c.ref_count > 0)
+            .values(ref_count=blob_table.c.ref_count - bindparam("b_count")),
+            [
+                {"b_filepath": filepath, "b_count": count}
+                for filepath, count in filepaths.items()
+            ],
+        )
+        result = await db.execute(
+            select(AttachmentBlob.filepath).where(
+                AttachmentBlob.filepath.in_(list(filepaths))
+            )
+        )
+        blobs = set(result.scalars().all())
+        legacy = [filepath for filepath in filepaths if filepath not in blobs]
+        if not legacy:
+            return []
+        result = await db.execute(
+            select(Attachment.filepath)
+            .where(Attachment.filepath.in_(legacy))
+            .distinct()
+        )
+        used = set(result.scalars().all())
+        return [filepath for filepath in legacy if filepath not in used]
+
+    @classmethod
+    async def sweep_blobs(
+        cls, db: AsyncSession, cutoff: datetime, batch_size: int
+    ) -> list[str]:
+        """
+        删除引用为 0 的文件记录，返回对应的文件。
+
+        只处理 cutoff 之前变为 0 的记录，避免与同内容的上传同时进行，
+        上传时增加引用次数会更新 updated_time
+        """
+        result = await db.execute(
+            select(AttachmentBlob.id, AttachmentBlob.filepath)
+            .where(AttachmentBlob.ref_count <= 0)
+            .where(AttachmentBlob.updated_time < cutoff)
+            .order_by(AttachmentBlob.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return []
+        await db.execute(
+            delete(AttachmentBlob)
+            .where(AttachmentBlob.id.in_([row.id for row in rows]))
+            .where(AttachmentBlob.ref_count <= 0)
+        )
+        # 查询后又被引用的记录不会删除
+        result = await db.execute(
+            select(AttachmentBlob.filepath).where(
+                AttachmentBlob.id.in_([row.id for row in rows])
+            )
+        )
+        kept = set(result.scalars().all())
+        return [row.filepath for row in rows if row.filepath not in kept]
+
+    @classmethod
+    def remove_files(cls, filepaths: list[str]) -> tuple[int, int]:
+        """删除文件，返回 (文件数, 字节数)，文件已不存在时忽略"""
+        count = size = 0
+        for filepath in filepaths:
+            path = settings.UPLOAD_PATH / filepath
+            try:
+                filesize = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"删除文件失败：{path}，错误信息：{e}")
+                continue
+            count += 1
+            size += filesize
+        return count, size
+
+    @classmethod
+    async def remove_files_parallel(cls, filepaths: list[str]) -> tuple[int, int]:
+        workers = max(1, settings.ATTACHMENT_GC_WORKERS)
+        results = await asyncio.gather(
+            *(
+                run_in_threadpool(cls.remove_files, filepaths[index::workers])
+                for index in range(min(workers, len(filepaths)))
+            )
+        )
+        return sum(item[0] for item in results), sum(item[1] for item in results)
+
+    @classmethod
+    def remove_stale_uploads(cls, cutoff: float, dry_run: bool) -> int:
+        """清理过期的分片上传目录和上传中断留下的临时文件"""
+        count = 0
+        temp_path = settings.UPLOAD_TEMP_PATH
+        if not temp_path.is_dir():
+            return 0
+        paths = [path for path in temp_path.iterdir() if path.is_file()]
+        chunk_path = temp_path.joinpath("chunks")
+        if chunk_path.is_dir():
+            paths.extend(chunk_path.iterdir())
+        for path in paths:
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                if not dry_run:
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    else:
+                        path.unlink()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"清理上传临时文件失败：{path}，错误信息：{e}")
+                continue
+            count += 1
+        return count
+
+    @classmethod
+    @use_primary
+    async def collect(
+        cls,
+        dry_run: bool = False,
+        max_age: Optional[int] = None,
+        unreferenced: Optional[bool] = None,
+    ) -> dict[str, Any]:
+        """
+        清理过期的临时附件和未被引用的附件，每批在独立的事务中删除记录，
+        提交后在线程池中删除文件。dry_run 时只统计，不做修改
+        """
+        max_age = settings.ATTACHMENT_GC_MAX_AGE if max_age is None else max_age
+        if unreferenced is None:
+            unreferenced = settings.ATTACHMENT_GC_UNREFERENCED
+        batch_size = settings.ATTACHMENT_GC_BATCH_SIZE
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=max_age)
+        started = time.perf_counter()
+        report = {
+            "dry_run": dry_run,
+            "cutoff": cutoff.isoformat(),
+            "batches": 0,
+            "attachments": 0,
+            "attachment_bytes": 0,
+            "files": 0,
+            "file_bytes": 0,
+            "stale_uploads": 0,
+        }
+        last_id = None
+        while True:
+            async with db(commit_on_exit=not dry_run):
+                session: AsyncSession = db.session
+                rows = await cls.find_garbage(
+                    session, cutoff, last_id, batch_size, unreferenced
+                )
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                report["batches"] += 1
+                report["attachments"] += len(rows)
+                report["attachment_bytes"] += sum(row.filesize or 0 for row in rows)
+                if dry_run:
+                    continue
+                await session.execute(
+                    delete(Attachment).where(
+                        Attachment.id.in_([row.id for row in rows])
+                    )
+                )
+                released = await cls.release_files(
+                    session, Counter(row.filepath for row in rows if row.filepath)
+                )
+            # 事务提交后再删除文件，提交失败时文件仍然可用
+            if released:
+                count, size = await cls.remove_files_parallel(released)
+                report["files"] += count
+                report["file_bytes"] += size
+            if len(rows) < batch_size:
+                break
+        blob_cutoff = now - timedelta(seconds=cls.blob_grace)
+        while not dry_run:
+            async with db(commit_on_exit=True):
+                released = await cls.sweep_blobs(db.session, blob_cutoff, batch_size)
+            if not released:
+                break
+            count, size = await cls.remove_files_parallel(released)
+            report["files"] += count
+            report["file_bytes"] += size
+        if dry_run:
+            # 只统计已经没有引用的文件，本次删除的附件释放的文件不计入
+            async with db():
+                report["files"] = await db.session.scalar(
+                    select(func.count())
+                    .select_from(AttachmentBlob)
+                    .where(AttachmentBlob.ref_count <= 0)
+                    .where(AttachmentBlob.updated_time < blob_cutoff)
+                )
+        report["stale_uploads"] = await run_in_threadpool(
+            cls.remove_stale_uploads, cutoff.timestamp(), dry_run
+        )
+        elapsed = time.perf_counter() - started
+        report["elapsed"] = round(elapsed, 3)
+        report["attachments_per_second"] = round(
+            report["attachments"] / elapsed if elapsed else 0, 1
+        )
+        return report
+
+    @classmethod
+    async def gc_worker(cls):
+        """定时清理附件，多个进程时通过 redis 锁只由一个进程执行"""
+        interval = settings.ATTACHMENT_GC_INTERVAL
+        while True:
+            try:
+                redis = getattr(module.app.state, "redis", None)
+                key = f"{settings.NAME.lower()}:lock:attachment_gc"
+                if redis is None or await redis.set(key, 1, ex=interval, nx=True):
+                    report = await cls.collect()
+                    logger.info(f"附件清理完成：{report}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"附件清理失败，错误信息：{e}")
+            await asyncio.sleep(interval)
@@ -1,23 +1,348 @@
+import asyncio
 import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import stat
+import tempfile
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import Any, BinaryIO, List, Optional
 
+import orjson
 from fastapi import Request, UploadFile
+from PIL import Image
+from sqlalchemy import select, update
+from sqlalchemy.engine.row import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from config.settings import settings
 from senweaver.core.senweaver_crud import SenweaverCRUD
-from senweaver.exception.http_exception import CustomException
+from senweaver.exception.http_exception import (
+    BadRequestException,
+    CustomException,
+    NotFoundException,
+)
+from senweaver.logger import logger
+from senweaver.utils.cache import VersionedCache
+from senweaver.utils.file import ZipEntry
+from senweaver.utils.image import get_executor, render_thumbnail
 
-from ..model.attachment import Attachment
+from ..model.attachment import Attachment, AttachmentBlob
+from ..schema.file import IChunkUploadInit
 
 
 class CommonLogic:
+    # 下载文件时使用的附件信息，附件表变更时失效
+    file_cache = VersionedCache(
+        "attachment_file",
+        tables=(Attachment.__tablename__,),
+        maxsize=settings.FILE_CACHE_SIZE,
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
+
+    # 正在生成的缩略图，按缓存键加锁
+    thumbnail_locks: dict[str, asyncio.Lock] = {}
+    # 已压缩的格式打包时直接存储
+    compressed_types = (
+        "image/",
+        "video/",
+        "audio/",
+        "application/zip",
+        "application/gzip",
+        "application/x-7z-compressed",
+        "application/x-rar-compressed",
+        "application/vnd.openxmlformats-officedocument.",
+    )
+
     @classmethod
     async def get_upload_max_size(cls, user_id: int):
         return 10485760
 
+    @classmethod
+    async def get_file(
+        cls, db: AsyncSession, filepath: str
+    ) -> Optional[dict[str, Any]]:
+        """按存储路径获取附件信息和文件状态，热点文件不再查询数据库"""
+
+        async def load():
+            result = await db.execute(
+                select(Attachment.filename, Attachment.mime_type, Attachment.hash)
+                .where(Attachment.filepath == filepath)
+                .order_by(Attachment.id)
+                .limit(1)
+            )
+            row = result.first()
+            if row is None:
+                return None
+            try:
+                stat_result = await run_in_threadpool(
+                    os.stat, settings.UPLOAD_PATH / filepath
+                )
+            except FileNotFoundError:
+                return None
+            if not stat.S_ISREG(stat_result.st_mode):
+                return None
+            return {
+                "filename": row.filename,
+                "mime_type": row.mime_type,
+                "hash": row.hash,
+                "stat_result": stat_result,
+            }
+
+        return await cls.file_cache.get_or_load(filepath, load)
+
+    @classmethod
+    async def stat_file(cls, path: Path) -> Optional[os.stat_result]:
+        try:
+            return await run_in_threadpool(os.stat, path)
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    async def get_thumbnail(
+        cls,
+        db: AsyncSession,
+        filepath: str,
+        width: int,
+        height: int,
+        fit: str,
+        format: str,
+    ) -> Optional[tuple[Path, str, os.stat_result]]:
+        """
+        获取缩略图，按 (文件哈希, 尺寸, 格式) 缓存在磁盘，返回 (路径, 缓存键, 文件状态)。
+
+        同一个缓存键在本进程内同时只生成一次，其他请求等待后直接读取；
+        多个进程同时生成时写入临时文件后替换，结果相同
+        """
+        file_data = await cls.get_file(db, filepath)
+        if not file_data:
+            return None
+        mime_type = file_data["mime_type"] or ""
+        if not mime_type.startswith("image/") or mime_type == "image/svg+xml":
+            raise BadRequestException("该文件不支持生成缩略图")
+        hash = file_data["hash"]
+        if not hash or not re.fullmatch(r"[0-9a-fA-F]{8,128}", hash):
+            hash = hashlib.sha1(filepath.encode()).hexdigest()
+        key = f"{hash.lower()}_{width}x{height}_{fit}.{format}"
+        path = settings.THUMBNAIL_PATH / key[:2] / key
+        stat_result = await cls.stat_file(path)
+        if stat_result is not None:
+            return path, key, stat_result
+        lock = cls.thumbnail_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # 等待期间可能已由其他请求生成
+                stat_result = await cls.stat_file(path)
+                if stat_result is None:
+                    loop = asyncio.get_running_loop()
+                    try:
+                        await loop.run_in_executor(
+                            get_executor(settings.THUMBNAIL_WORKERS),
+                            render_thumbnail,
+                            str(settings.UPLOAD_PATH / filepath),
+                            str(path),
+                            width,
+                            height,
+                            fit,
+                            format,
+                            settings.THUMBNAIL_QUALITY,
+                        )
+                    except (OSError, ValueError, Image.DecompressionBombError) as e:
+                        logger.warning(f"生成缩略图失败：{filepath}，错误信息：{e}")
+                        raise BadRequestException("无法生成缩略图")
+                    stat_result = await cls.stat_file(path)
+        finally:
+            if not lock.locked() and cls.thumbnail_locks.get(key) is lock:
+                del cls.thumbnail_locks[key]
+        return path, key, stat_result
+
+    @classmethod
+    async def get_bundle_files(cls, db: AsyncSession, ids: List[int]) -> list[Row]:
+        """一次查询按顺序取出需要打包的附件，缺少的附件直接报错"""
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.FILE_BUNDLE_MAX_FILES:
+            raise BadRequestException(
+                f"单次最多打包 {settings.FILE_BUNDLE_MAX_FILES} 个文件"
+            )
+        result = await db.execute(
+            select(
+                Attachment.id,
+                Attachment.filename,
+                Attachment.filepath,
+                Attachment.category,
+                Attachment.mime_type,
+            ).where(Attachment.id.in_(ids), Attachment.filepath.is_not(None))
+        )
+        rows = {row.id: row for row in result.all()}
+        missing = [id for id in ids if id not in rows]
+        if missing:
+            raise NotFoundException(f"文件不存在：{missing}")
+        return [rows[id] for id in ids]
+
+    @classmethod
+    def get_bundle_entries(cls, files: list[Row], compress: bool) -> list[ZipEntry]:
+        """生成压缩包中的文件名，同名文件追加序号"""
+        entries = []
+        names = set()
+        for item in files:
+            name = re.sub(r"[\\/]", "_", item.filename or Path(item.filepath).name)
+            stem, suffix = os.path.splitext(name)
+            count = 1
+            while name.lower() in names:
+                name = f"{stem} ({count}){suffix}"
+                count += 1
+            names.add(name.lower())
+            entries.append(
+                ZipEntry(
+                    settings.UPLOAD_PATH / item.filepath,
+                    name,
+                    compress
+                    and not (item.mime_type or "").startswith(cls.compressed_types),
+                )
+            )
+        return entries
+
+    @classmethod
+    def write_temp_file(cls, file: BinaryIO) -> tuple[Path, str, int]:
+        """在线程中执行，分块读取上传的文件，计算 SHA1 并写入临时文件"""
+        temp_dir = settings.UPLOAD_TEMP_PATH
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        sha_hash = hashlib.sha1()
+        filesize = 0
+        fd, temp_name = tempfile.mkstemp(dir=temp_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                file.seek(0)
+                while chunk := file.read(settings.UPLOAD_CHUNK_SIZE):
+                    sha_hash.update(chunk)
+                    f.write(chunk)
+                    filesize += len(chunk)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+        return Path(temp_name), sha_hash.hexdigest(), filesize
+
+    @classmethod
+    def move_temp_file(cls, temp_path: Path, target: Path, filesize: int) -> bool:
+        """在线程中执行，将临时文件原子移动到存储路径，已存在相同文件时直接删除临时文件"""
+        if target.is_file() and target.stat().st_size == filesize:
+            temp_path.unlink(missing_ok=True)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, target)
+        return True
+
+    @classmethod
+    async def save_blob(
+        cls,
+        db: AsyncSession,
+        temp_path: Path,
+        prefix: str,
+        hash: str,
+        filesize: int,
+        suffix: str,
+    ) -> str:
+        """
+        按内容保存文件，返回相对存储路径。
+        相同哈希和大小的文件只保存一份，通过 AttachmentBlob.ref_count 记录引用次数
+        """
+        filepath = f"{prefix}/{hash[:2]}/{hash}{suffix}"
+        blob = await db.scalar(
+            select(AttachmentBlob).where(AttachmentBlob.filepath == filepath)
+        )
+        if blob is not None and blob.filesize != filesize:
+            # 哈希相同但大小不同，单独保存
+            filepath = f"{prefix}/{hash[:2]}/{hash}_{uuid.uuid4().hex}{suffix}"
+            blob = None
+        try:
+            # 先增加引用次数再处理文件，更新后的记录不会被清理任务删除，
+            # 已存在的文件才可以代替临时文件
+            reused = False
+            if blob is not None:
+                result = await db.execute(
+                    update(AttachmentBlob)
+                    .where(AttachmentBlob.id == blob.id)
+                    .values(ref_count=AttachmentBlob.ref_count + 1)
+                )
+                reused = bool(result.rowcount)
+            if not reused:
+                # 记录在查询后被清理任务删除时重新创建
+                new_blob = AttachmentBlob(
+                    filepath=filepath, hash=hash, filesize=filesize, ref_count=1
+                )
+                try:
+                    # 并发上传相同内容时只有一个请求能插入，其他请求增加引用次数
+                    async with db.begin_nested():
+                        db.add(new_blob)
+                except IntegrityError:
+                    await db.execute(
+                        update(AttachmentBlob)
+                        .where(AttachmentBlob.filepath == filepath)
+                        .values(ref_count=AttachmentBlob.ref_count + 1)
+                    )
+                else:
+                    target = settings.UPLOAD_PATH / filepath
+                    if await run_in_threadpool(target.exists):
+                        # 没有记录的文件可能正在被清理任务删除，另存一份
+                        filepath = (
+                            f"{prefix}/{hash[:2]}/{hash}_{uuid.uuid4().hex}{suffix}"
+                        )
+                        new_blob.filepath = filepath
+                        await db.flush()
+            await run_in_threadpool(
+                cls.move_temp_file, temp_path, settings.UPLOAD_PATH / filepath, filesize
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return filepath
+
+    @classmethod
+    async def create_attachment(
+        cls,
+        request: Request,
+        db: AsyncSession,
+        filepath: str,
+        hash: str,
+        filesize: int,
+        filename: str,
+        bucket: str,
+        category: str,
+        mime_type: Optional[str],
+    ) -> dict[str, Any]:
+        file_obj = Attachment(
+            hash=hash,
+            filename=filename,
+            bucket=bucket,
+            category=category,
+            filepath=filepath,
+            suffix=Path(filename).suffix,
+            filesize=filesize,
+            mime_type=mime_type,
+            storage="local",
+            creator_id=request.user.id,
+            modifier_id=request.user.id,
+            is_tmp=True,
+            is_upload=True,
+        )
+        crud = SenweaverCRUD(Attachment, allow_relationship=True)
+        ret = await crud.create(db, file_obj)
+        return {
+            "id": ret["id"],
+            "access_url": file_obj.access_url,
+            "file_url": file_obj.file_url,
+            "filename": file_obj.filename,
+            "filesize": file_obj.filesize,
+            "is_tmp": file_obj.is_tmp,
+            "is_upload": file_obj.is_upload,
+            "hash": file_obj.hash,
+            "mime_type": file_obj.mime_type,
+        }
+
     @classmethod
     async def upload(
         cls,
@@ -29,72 +354,264 @@ class CommonLogic:
     ):
         result = []
         file_upload_max_size = await cls.get_upload_max_size(user_id)
-        # 使用条件语句来构建路径
         bucket_name = "default"
+        db = request.auth.db.session
         for file in files:
             if file.size > file_upload_max_size:
                 raise CustomException(
                     detail=f"文件大小不能超过 {file_upload_max_size}", code=1003
                 )
-            current_date = datetime.now().strftime("%Y%m%d")
-            if upload_id and upload_id.strip():  # 检查upload_id非空且非仅空白字符
-                path = f"{bucket_name}/{category}/{upload_id}/{current_date}"
-            else:
-                path = f"{bucket_name}/{category}/{current_date}"
-            upload_path = settings.UPLOAD_PATH / path
-
-            if not upload_path.exists():
-                upload_path.mkdir(parents=True, exist_ok=True)
-            file_obj = file.file
-            sha_hash = hashlib.sha1()
-            file_obj.seek(0)
-            while chunk := file_obj.read(4096):
-                sha_hash.update(chunk)
-            hash = sha_hash.hexdigest()
-            file_obj.seek(0)
             suffix = Path(file.filename).suffix
-            # if category == "avatar":
-            #     avatar_hash = hashlib.sha256()
-            #     avatar_hash.update(f"{user_id}_{hash}".encode('utf-8'))
-            #     filename = avatar_hash.hexdigest()
-            # else:
-            filename = f"{uuid.uuid4().hex}{suffix}"
-            filepath = upload_path / filename
-            with open(filepath, "wb") as f:
-                while chunk := file_obj.read(4096):
-                    f.write(chunk)
-            file_obj = Attachment(
+            # 一次读取同时计算哈希和写入临时文件，再按内容移动到存储路径
+            temp_path, hash, filesize = await run_in_threadpool(
+                cls.write_temp_file, file.file
+            )
+            filepath = await cls.save_blob(
+                db, temp_path, f"{bucket_name}/{category}", hash, filesize, suffix
+            )
+            file_data = await cls.create_attachment(
+                request,
+                db,
+                filepath=filepath,
                 hash=hash,
+                filesize=filesize,
                 filename=file.filename,
                 bucket=bucket_name,
                 category=category,
-                filepath=f"{path}/{filename}",
-                suffix=suffix,
-                filesize=file.size,
                 mime_type=file.content_type,
-                storage="local",
-                creator_id=request.user.id,
-                modifier_id=request.user.id,
-                is_tmp=True,
-                is_upload=True,
             )
-            db = request.auth.db.session
-            crud = SenweaverCRUD(Attachment, allow_relationship=True)
-            ret = await crud.create(db, file_obj)
-            file_data = {
-                "id": ret["id"],
-                "access_url": file_obj.access_url,
-                "file_url": file_obj.file_url,
-                "filename": file_obj.filename,
-                "filesize": file_obj.filesize,
-                "is_tmp": file_obj.is_tmp,
-                "is_upload": file_obj.is_upload,
-                "hash": file_obj.hash,
-                "mime_type": file_obj.mime_type,
-            }
             result.append(file_data)
 
         return result
 
+    @classmethod
+    def get_chunk_dir(cls, upload_id: str) -> Path:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise NotFoundException("Upload not found")
+        return settings.UPLOAD_TEMP_PATH.joinpath("chunks", upload_id)
+
+    @classmethod
+    def read_manifest(cls, chunk_dir: Path) -> Optional[dict[str, Any]]:
+        try:
+            return orjson.loads(chunk_dir.joinpath("manifest.json").read_bytes())
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def write_manifest(cls, chunk_dir: Path, manifest: dict[str, Any]):
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        chunk_dir.joinpath("manifest.json").write_bytes(orjson.dumps(manifest))
+
+    @classmethod
+    async def get_manifest(cls, request: Request, upload_id: str) -> dict[str, Any]:
+        manifest = await run_in_threadpool(
+            cls.read_manifest, cls.get_chunk_dir(upload_id)
+        )
+        if manifest is None or manifest["user_id"] != request.user.id:
+            raise NotFoundException("Upload not found")
+        return manifest
+
+    @classmethod
+    def get_chunk_size(cls, manifest: dict[str, Any], index: int) -> int:
+        if index < 0 or index >= manifest["chunk_count"]:
+            raise BadRequestException(f"分片序号不正确：{index}")
+        if index < manifest["chunk_count"] - 1:
+            return manifest["chunk_size"]
+        return manifest["filesize"] - manifest["chunk_size"] * index
+
+    @classmethod
+    def get_chunks(cls, chunk_dir: Path) -> list[int]:
+        return sorted(int(path.stem) for path in chunk_dir.glob("*.part"))
+
+    @classmethod
+    async def init_chunk_upload(
+        cls, request: Request, data: IChunkUploadInit
+    ) -> dict[str, Any]:
+        """创建分片上传，返回上传 id 和分片大小"""
+        file_upload_max_size = await cls.get_upload_max_size(request.user.id)
+        if data.filesize > file_upload_max_size:
+            raise CustomException(
+                detail=f"文件大小不能超过 {file_upload_max_size}", code=1003
+            )
+        chunk_size = settings.UPLOAD_PART_SIZE
+        upload_id = uuid.uuid4().hex
+        manifest = {
+            "user_id": request.user.id,
+            "filename": data.filename,
+            "filesize": data.filesize,
+            "category": data.category,
+            "mime_type": data.mime_type
+            or mimetypes.guess_type(data.filename)[0]
+            or "application/octet-stream",
+            "chunk_size": chunk_size,
+            "chunk_count": max(1, -(-data.filesize // chunk_size)),
+            "created_time": datetime.now(timezone.utc).isoformat(),
+        }
+        await run_in_threadpool(
+            cls.write_manifest, cls.get_chunk_dir(upload_id), manifest
+        )
+        return {
+            "upload_id": upload_id,
+            "chunk_size": chunk_size,
+            "chunk_count": manifest["chunk_count"],
+        }
+
+    @classmethod
+    async def upload_chunk(
+        cls, request: Request, upload_id: str, index: int
+    ) -> dict[str, Any]:
+        """
+        保存一个分片，请求体为分片内容，边接收边计算 SHA1。
+        重复上传同一分片会覆盖，可通过 X-Chunk-Hash 请求头校验分片的 SHA1
+        """
+        manifest = await cls.get_manifest(request, upload_id)
+        expected_size = cls.get_chunk_size(manifest, index)
+        chunk_dir = cls.get_chunk_dir(upload_id)
+        temp_path = chunk_dir / f"{index}.{uuid.uuid4().hex}.tmp"
+        try:
+            file = await run_in_threadpool(open, temp_path, "wb")
+        except FileNotFoundError:
+            raise NotFoundException("Upload not found")
+        sha_hash = hashlib.sha1()
+        size = 0
+        try:
+            buffer = bytearray()
+            async for data in request.stream():
+                size += len(data)
+                if size > expected_size:
+                    raise BadRequestException(f"分片大小不正确：{index}")
+                buffer += data
+                if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                    await run_in_threadpool(cls.write_buffer, file, sha_hash, buffer)
+                    buffer = bytearray()
+            if buffer:
+                await run_in_threadpool(cls.write_buffer, file, sha_hash, buffer)
+            await run_in_threadpool(file.close)
+            if size != expected_size:
+                raise BadRequestException(f"分片大小不正确：{index}")
+            hash = sha_hash.hexdigest()
+            chunk_hash = request.headers.get("x-chunk-hash")
+            if chunk_hash and chunk_hash.lower() != hash:
+                raise BadRequestException(f"分片校验失败：{index}")
+            await run_in_threadpool(os.replace, temp_path, chunk_dir / f"{index}.part")
+        except BaseException:
+            await run_in_threadpool(file.close)
+            await run_in_threadpool(temp_path.unlink, True)
+            raise
+        return {"index": index, "size": size, "hash": hash}
+
+    @classmethod
+    def write_buffer(cls, file: BinaryIO, sha_hash, data: bytes):
+        sha_hash.update(data)
+        file.write(data)
+
+    @classmethod
+    async def get_chunk_status(cls, request: Request, upload_id: str) -> dict[str, Any]:
+        """已接收的分片，用于断点续传"""
+        manifest = await cls.get_manifest(request, upload_id)
+        chunks = await run_in_threadpool(cls.get_chunks, cls.get_chunk_dir(upload_id))
+        return {
+            "upload_id": upload_id,
+            "chunk_size": manifest["chunk_size"],
+            "chunk_count": manifest["chunk_count"],
+            "chunks": chunks,
+        }
+
+    @classmethod
+    def copy_file(cls, src: int, dst: int, size: int):
+        """在内核中复制文件内容，支持的文件系统上不复制数据块"""
+        try:
+            while size > 0:
+                copied = os.copy_file_range(src, dst, size)
+                if copied == 0:
+                    break
+                size -= copied
+            return
+        except (AttributeError, OSError):
+            pass
+        while size > 0:
+            data = os.read(src, min(size, settings.UPLOAD_CHUNK_SIZE))
+            if not data:
+                break
+            os.write(dst, data)
+            size -= len(data)
+
+    @classmethod
+    def assemble_chunks(
+        cls, chunk_dir: Path, chunk_count: int
+    ) -> tuple[Path, str, int]:
+        """在线程中执行，按顺序拼接分片到临时文件，返回 (临时文件, SHA1, 文件大小)"""
+        sha_hash = hashlib.sha1()
+        filesize = 0
+        fd, temp_name = tempfile.mkstemp(dir=settings.UPLOAD_TEMP_PATH, suffix=".part")
+        try:
+            for index in range(chunk_count):
+                with open(chunk_dir / f"{index}.part", "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    cls.copy_file(f.fileno(), fd, size)
+                    # 完整文件的 SHA1 需要按顺序读取分片，分片刚写入时读取的是页缓存
+                    f.seek(0)
+                    while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+                        sha_hash.update(chunk)
+                    filesize += size
+        except BaseException:
+            os.close(fd)
+            os.unlink(temp_name)
+            raise
+        os.close(fd)
+        return Path(temp_name), sha_hash.hexdigest(), filesize
+
+    @classmethod
+    async def complete_chunk_upload(
+        cls, request: Request, upload_id: str
+    ) -> dict[str, Any]:
+        """所有分片上传完成后拼接文件并创建附件"""
+        manifest = await cls.get_manifest(request, upload_id)
+        chunk_dir = cls.get_chunk_dir(upload_id)
+        chunks = await run_in_threadpool(cls.get_chunks, chunk_dir)
+        missing = sorted(set(range(manifest["chunk_count"])) - set(chunks))
+        if missing:
+            raise BadRequestException(f"缺少分片：{missing[:20]}")
+        # 重命名目录，避免重复完成或完成时继续上传分片
+        assemble_dir = chunk_dir.with_name(f"{upload_id}.assemble")
+        try:
+            await run_in_threadpool(os.rename, chunk_dir, assemble_dir)
+        except FileNotFoundError:
+            raise NotFoundException("Upload not found")
+        try:
+            temp_path, hash, filesize = await run_in_threadpool(
+                cls.assemble_chunks, assemble_dir, manifest["chunk_count"]
+            )
+            if filesize != manifest["filesize"]:
+                temp_path.unlink(missing_ok=True)
+                raise BadRequestException("文件大小不正确")
+            bucket_name = "default"
+            category = manifest["category"]
+            db = request.auth.db.session
+            filepath = await cls.save_blob(
+                db,
+                temp_path,
+                f"{bucket_name}/{category}",
+                hash,
+                filesize,
+                Path(manifest["filename"]).suffix,
+            )
+            file_data = await cls.create_attachment(
+                request,
+                db,
+                filepath=filepath,
+                hash=hash,
+                filesize=filesize,
+                filename=manifest["filename"],
+                bucket=bucket_name,
+                category=category,
+                mime_type=manifest["mime_type"],
+            )
+        except BaseException:
+            await run_in_threadpool(os.rename, assemble_dir, chunk_dir)
+            raise
+        await run_in_threadpool(shutil.rmtree, assemble_dir, True)
+        return file_data
+
 
 common_logic = CommonLogic()
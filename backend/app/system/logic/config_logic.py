@@ -1,38 +1,62 @@
 from typing import Any, Optional
 
 from fastapi import Request
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.settings import settings
 from senweaver import SenweaverCRUD
+from senweaver.utils.cache import Snapshot, VersionedCache
 
 from ..model.system_config import SystemConfig
 from ..model.user_config import UserConfig
+from .attachment_logic import AttachmentLogic
 
 
 class ConfigLogic:
+    # 系统配置和每个用户的配置各加载为一个快照，配置表写入后跨进程失效
+    cache = VersionedCache(
+        "system_config",
+        tables=(SystemConfig.__tablename__, UserConfig.__tablename__),
+        maxsize=1024,
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
+
+    @classmethod
+    async def get_snapshot(
+        cls, db: AsyncSession, owner_id: Optional[int] = None
+    ) -> Snapshot:
+        async def load() -> Snapshot:
+            if owner_id is None:
+                stmt = select(SystemConfig.key, SystemConfig.value)
+            else:
+                stmt = select(UserConfig.key, UserConfig.value).where(
+                    UserConfig.owner_id == owner_id
+                )
+            result = await db.execute(stmt)
+            return Snapshot(dict(result.all()))
+
+        key = "system" if owner_id is None else f"user:{owner_id}"
+        return await cls.cache.get_or_load(key, load)
+
     @classmethod
     async def get_config(
         cls, request: Request, key: str
     ) -> UserConfig | SystemConfig | None:
         db: AsyncSession = request.auth.db.session
         auth = "AnonymousUser"
-        config = None
+        snapshot = None
         if request.user:
             auth = f"{request.user.nickname}({request.user.username})"
-            config = await SenweaverCRUD(
-                UserConfig, check_data_scope=False, check_field_scope=False
-            ).get(db, key=key, owner_id=request.user.id, one_or_none=True)
-        if config is None:
-            config = await SenweaverCRUD(SystemConfig).get(
-                db, key=key, one_or_none=True
-            )
-        data = {}
-        if config is not None:
-            data = config["value"]
+            snapshot = await cls.get_snapshot(db, request.user.id)
+        if snapshot is None or key not in snapshot:
+            snapshot = await cls.get_snapshot(db)
+        data = snapshot.get(key, {})
         return {"config": data, "auth": auth}
 
     @classmethod
     async def save_config(cls, request: Request, key: str, data: Any):
+        # 通过 CRUD 写入并提交，提交后配置表变更事件使快照失效，这里直接返回写入的值
         if data is not None:
             db: AsyncSession = request.auth.db.session
             crud = SenweaverCRUD(UserConfig, check_field_scope=False)
@@ -46,6 +70,11 @@ class ConfigLogic:
                 await crud.create(
                     db, UserConfig(key=key, owner_id=request.user.id, value=data)
                 )
+            await AttachmentLogic.mark_used_in(db, data)
+            return {
+                "config": data,
+                "auth": f"{request.user.nickname}({request.user.username})",
+            }
         return await cls.get_config(request, key)
 
 
@@ -1,14 +1,152 @@
+import hashlib
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+import orjson
 from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from senweaver.utils.cache import VersionedCache
 
+from ..model.dict_data import DictData
 from ..model.dict_type import DictType, DictTypeCreate
 
 
+class DictEntry(NamedTuple):
+    """一个字典类型预编码的 JSON 和摘要"""
+
+    digest: str
+    content: bytes
+
+
 class DictLogic:
+    # 按字典类型缓存预编码的 JSON，字典表写入后跨进程失效
+    cache = VersionedCache(
+        "system_dict",
+        tables=(DictType.__tablename__, DictData.__tablename__),
+        maxsize=1024,
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
+    # 代码中固定的列表，注册时编码一次，与字典一起按类型获取
+    static_entries: dict[str, DictEntry] = {}
+    # 字典项返回的字段
+    item_fields = (
+        "label",
+        "value",
+        "value_type",
+        "icon",
+        "css_class",
+        "list_class",
+        "is_default",
+        "options",
+        "rank",
+    )
 
     @classmethod
     async def create(cls, request: Request, user: DictTypeCreate) -> DictType:
         # TODO
         return None
 
+    @classmethod
+    def encode_entry(
+        cls,
+        name: str,
+        items: list,
+        version: Optional[datetime] = None,
+        options: Any = None,
+    ) -> DictEntry:
+        content = orjson.dumps(
+            {
+                "name": name,
+                "version": version.isoformat() if version else None,
+                "options": options,
+                "items": items,
+            }
+        )
+        # 删除字典项时最后更新时间可能不变，摘要按内容计算
+        digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+        return DictEntry(digest=digest, content=content)
+
+    @classmethod
+    def register_static(cls, type: str, name: str, items: list) -> DictEntry:
+        entry = cls.encode_entry(name, items)
+        cls.static_entries[type] = entry
+        return entry
+
+    @classmethod
+    async def load_entries(
+        cls, db: AsyncSession, types: Sequence[str]
+    ) -> dict[str, DictEntry]:
+        """一次查询多个字典类型和字典项，返回 {类型: 预编码的 JSON}"""
+        result = await db.execute(
+            select(
+                DictType.type,
+                DictType.name,
+                DictType.options,
+                DictType.updated_time,
+            ).where(DictType.type.in_(types), DictType.is_active == True)
+        )
+        dict_types = {row.type: row for row in result.all()}
+        if not dict_types:
+            return {}
+        columns = [getattr(DictData, field) for field in cls.item_fields]
+        result = await db.execute(
+            select(DictData.type, DictData.updated_time, DictData.is_active, *columns)
+            .where(DictData.type.in_(list(dict_types)))
+            .order_by(DictData.rank, DictData.id)
+        )
+        items: dict[str, list] = {type: [] for type in dict_types}
+        versions = {type: row.updated_time for type, row in dict_types.items()}
+        for row in result.all():
+            # 停用的字典项也参与版本计算
+            version = versions[row.type]
+            if row.updated_time and (version is None or row.updated_time > version):
+                versions[row.type] = row.updated_time
+            if row.is_active:
+                items[row.type].append(
+                    {field: getattr(row, field) for field in cls.item_fields}
+                )
+        return {
+            type: cls.encode_entry(row.name, items[type], versions[type], row.options)
+            for type, row in dict_types.items()
+        }
+
+    @classmethod
+    async def get_entries(
+        cls, db: AsyncSession, types: Sequence[str]
+    ) -> dict[str, DictEntry]:
+        """按类型读取缓存，未缓存的类型一次加载，不存在的类型不返回"""
+        version = await cls.cache.sync()
+        entries: dict[str, Optional[DictEntry]] = {}
+        missing = []
+        for type in types:
+            entry = cls.static_entries.get(type) or cls.cache.get(type)
+            if entry is None:
+                missing.append(type)
+            entries[type] = entry
+        if missing:
+            loaded = await cls.load_entries(db, missing)
+            for type in missing:
+                # 不存在的类型缓存为空值，避免重复查询
+                entry = loaded.get(type, ())
+                cls.cache.put(type, entry, version)
+                entries[type] = entry
+        return {type: entry for type, entry in entries.items() if entry}
+
+    @classmethod
+    async def get_reference(
+        cls, db: AsyncSession, types: Sequence[str]
+    ) -> tuple[str, bytes]:
+        """返回多个字典类型的 ETag 和预编码的 {"data": {类型: ...}} JSON"""
+        entries = await cls.get_entries(db, types)
+        content = b",".join(
+            orjson.dumps(type) + b":" + entry.content for type, entry in entries.items()
+        )
+        tag = ",".join(f"{type}:{entry.digest}" for type, entry in entries.items())
+        etag = f'"{hashlib.blake2b(tag.encode(), digest_size=16).hexdigest()}"'
+        return etag, b'{"data":{' + content + b"}}"
+
 
 dict_logic = DictLogic()
@@ -0,0 +1,269 @@
+import asyncio
+import base64
+import gzip
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import orjson
+from sqlalchemy import select, update
+from sqlalchemy.engine.row import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import settings
+from senweaver.db.partition import (
+    Partition,
+    PartitionBackend,
+    get_backend,
+    period_floor,
+    period_shift,
+)
+from senweaver.db.routing import use_primary
+from senweaver.db.types import ModelType
+from senweaver.exception.http_exception import NotFoundException
+from senweaver.logger import logger
+from senweaver.middleware.db import db
+from senweaver.utils.data import PayloadCodec
+from senweaver.utils.request import parse_location, parse_user_agent_string
+
+from ..model.login_log import LoginLog
+from ..model.operation_log import OperationLog, OperationLogPayload
+from ..system import module
+
+
+class LogLogic:
+    enrich_models: tuple[type[ModelType], ...] = (LoginLog, OperationLog)
+    partition_models: tuple[type[ModelType], ...] = (
+        LoginLog,
+        OperationLog,
+        OperationLogPayload,
+    )
+
+    @classmethod
+    def parse_clients(cls, rows: Sequence[Row]) -> list[dict[str, Any]]:
+        """解析一批日志的 ip 属地和 User-Agent，同一批次内的 ip 只解析一次"""
+        locations = {}
+        values = []
+        for id, ip, agent in rows:
+            if ip not in locations:
+                locations[ip] = parse_location(ip) if ip else (None, None, None)
+            country, region, city = locations[ip]
+            _, system, browser = parse_user_agent_string(agent or "")
+            values.append(
+                {
+                    "id": id,
+                    "country": country,
+                    "region": region,
+                    "city": city,
+                    "system": system[:64],
+                    "browser": browser[:64],
+                    "is_enriched": True,
+                }
+            )
+        return values
+
+    @classmethod
+    async def enrich_logs(
+        cls, db: AsyncSession, model: type[ModelType], batch_size: int
+    ) -> int:
+        result = await db.execute(
+            select(model.id, model.ipaddress, model.agent)
+            .where(model.is_enriched == False)
+            .order_by(model.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+        values = await run_in_threadpool(cls.parse_clients, rows)
+        await db.execute(update(model), values)
+        return len(values)
+
+    @classmethod
+    async def enrich_worker(cls):
+        """后台补全登录日志和操作日志的客户端信息"""
+        batch_size = settings.LOG_ENRICH_BATCH_SIZE
+        while True:
+            count = 0
+            try:
+                for model in cls.enrich_models:
+                    async with db(commit_on_exit=True):
+                        count = max(
+                            count, await cls.enrich_logs(db.session, model, batch_size)
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"日志解析失败，错误信息：{e}")
+            if count < batch_size:
+                await asyncio.sleep(settings.LOG_ENRICH_INTERVAL)
+
+    @classmethod
+    def pack_payloads(
+        cls, body: bytes, result: bytes
+    ) -> tuple[str, str, Optional[OperationLogPayload]]:
+        """
+        截断请求、响应内容，超过内联大小时日志表只保存预览，
+        完整内容压缩后保存到独立的表，返回 (body, response_result, payload)
+        """
+        body = PayloadCodec.truncate(body, settings.LOG_PAYLOAD_MAX_SIZE)
+        result = PayloadCodec.truncate(result, settings.LOG_PAYLOAD_MAX_SIZE)
+        inline_size = settings.LOG_PAYLOAD_INLINE_SIZE
+        if len(body) <= inline_size and len(result) <= inline_size:
+            return body.decode("utf-8"), result.decode("utf-8"), None
+        method = PayloadCodec.get_method(settings.LOG_PAYLOAD_COMPRESSION)
+        payload = OperationLogPayload(
+            encoding=method,
+            request=PayloadCodec.compress(body, method),
+            response=PayloadCodec.compress(result, method),
+            request_size=len(body),
+            response_size=len(result),
+        )
+        return (
+            PayloadCodec.truncate(body, inline_size).decode("utf-8"),
+            PayloadCodec.truncate(result, inline_size).decode("utf-8"),
+            payload,
+        )
+
+    @classmethod
+    async def read_operation_log(
+        cls, endpoint_creator, db: AsyncSession, schema_to_select, **kwargs
+    ):
+        """操作日志详情，从独立的表读取完整的请求、响应内容"""
+        log_id = kwargs.get("id")
+        item = await endpoint_creator.crud.get(
+            db, return_as_model=True, schema_to_select=schema_to_select, id=log_id
+        )
+        if not item:
+            raise NotFoundException("Item not found")
+        payload = await db.get(OperationLogPayload, log_id)
+        if payload is not None:
+            for key, value in (
+                ("body", payload.request),
+                ("response_result", payload.response),
+            ):
+                if hasattr(item, key) and value is not None:
+                    data = PayloadCodec.decompress(value, payload.encoding)
+                    setattr(item, key, data.decode("utf-8"))
+        return item
+
+    @classmethod
+    def archive_default(cls, value: Any) -> str:
+        # 二进制内容（压缩后的请求、响应）以 base64 保存
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode("ascii")
+        return str(value)
+
+    @classmethod
+    def get_partition_backend(
+        cls, model: type[ModelType], dialect: str
+    ) -> PartitionBackend:
+        return get_backend(
+            dialect, model.__table__, "created_time", settings.LOG_PARTITION_INTERVAL
+        )
+
+    @classmethod
+    async def archive_partition(
+        cls, db: AsyncSession, backend: PartitionBackend, partition: Partition
+    ) -> tuple[Path, int]:
+        """按 id 分批读取分区数据，写入 NDJSON.gz 文件"""
+        table = backend.table
+        path = Path(settings.LOG_ARCHIVE_PATH).joinpath(
+            table.name, f"{partition.name}.ndjson.gz"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        file = await run_in_threadpool(gzip.open, temp_path, "wb")
+        count = 0
+        last_id = None
+        try:
+            while True:
+                stmt = select(table).where(*backend.where(partition))
+                if last_id is not None:
+                    stmt = stmt.where(table.c.id > last_id)
+                result = await db.execute(
+                    stmt.order_by(table.c.id).limit(settings.LOG_ENRICH_BATCH_SIZE)
+                )
+                rows = result.mappings().all()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                count += len(rows)
+                data = b"".join(
+                    orjson.dumps(
+                        dict(row),
+                        default=cls.archive_default,
+                        option=orjson.OPT_APPEND_NEWLINE,
+                    )
+                    for row in rows
+                )
+                await run_in_threadpool(file.write, data)
+        finally:
+            await run_in_threadpool(file.close)
+        os.replace(temp_path, path)
+        return path, count
+
+    @classmethod
+    @use_primary
+    async def maintain_partitions(cls, now: datetime | None = None) -> dict[str, Any]:
+        """创建后续周期的分区，过期的分区归档后整体删除"""
+        interval = settings.LOG_PARTITION_INTERVAL
+        current = period_floor(now or datetime.now(timezone.utc), interval)
+        starts = [
+            period_shift(current, interval, count)
+            for count in range(settings.LOG_PARTITION_PREMAKE + 1)
+        ]
+        cutoff = None
+        if settings.LOG_RETENTION_PERIODS > 0:
+            cutoff = period_shift(current, interval, 1 - settings.LOG_RETENTION_PERIODS)
+        summary = {}
+        for model in cls.partition_models:
+            dropped = []
+            async with db(commit_on_exit=True):
+                session: AsyncSession = db.session
+                connection = await session.connection()
+                backend = cls.get_partition_backend(model, connection.dialect.name)
+                await backend.ensure(connection, starts)
+                partitions = await backend.get_partitions(connection)
+            if cutoff is not None:
+                for partition in partitions:
+                    if partition.end is None or partition.end > cutoff:
+                        continue
+                    async with db(commit_on_exit=True):
+                        session = db.session
+                        if settings.LOG_ARCHIVE_ENABLED:
+                            path, count = await cls.archive_partition(
+                                session, backend, partition
+                            )
+                            logger.info(
+                                f"日志分区 {partition.name} 已归档 {count} 条：{path}"
+                            )
+                        await backend.drop(await session.connection(), partition)
+                    dropped.append(partition.name)
+            summary[model.__tablename__] = {
+                "partitions": [item.name for item in partitions],
+                "dropped": dropped,
+            }
+        return summary
+
+    @classmethod
+    async def partition_worker(cls):
+        """定时维护日志分区，多个进程时通过 redis 锁只由一个进程执行"""
+        interval = settings.LOG_PARTITION_CHECK_INTERVAL
+        while True:
+            try:
+                redis = getattr(module.app.state, "redis", None)
+                key = f"{settings.NAME.lower()}:lock:log_partition"
+                if redis is None or await redis.set(key, 1, ex=interval, nx=True):
+                    summary = await cls.maintain_partitions()
+                    logger.info(f"日志分区维护完成：{summary}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"日志分区维护失败，错误信息：{e}")
+            await asyncio.sleep(interval)
+
+
+log_logic = LogLogic()
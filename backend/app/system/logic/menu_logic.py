@@ -1,7 +1,11 @@
-from typing import Annotated, List
+import hashlib
+from typing import Annotated, Any, List
+
+import orjson
 
 from fastapi import Depends, Path, Query, Request, routing
 from fastcrud import FastCRUD
+from sqlalchemy import and_, delete, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from senweaver import SenweaverCRUD
@@ -16,17 +20,50 @@ from senweaver.core.senweaver_creator import SenweaverEndpointCreator
 from senweaver.exception.http_exception import NotFoundException
 from senweaver.helper import build_tree
 from senweaver.module.manager import module_manager
+from senweaver.utils.cache import VersionedCache
 from senweaver.utils.response import ResponseBase, error_response, success_response
 
+from ..model.fieldpermission import FieldPermission
+from ..model.fieldpermission_field import FieldPermissionField
 from ..model.menu import Menu
 from ..model.menu_meta import MenuMeta
 from ..model.menu_model import MenuModel
+from ..model.menu_rule import MenuRule
 from ..model.modelfield import ModelField
 from ..model.role_menu import RoleMenu
 from ..schema.menu import IMenuPermission
 
 
 class MenuLogic:
+    # 不生成权限的资源路由
+    ignore_paths = ("/choices", "/search-fields", "/search-columns", "/cursor")
+    # 按角色集合缓存序列化后的路由树，菜单、菜单元数据或角色菜单变更时失效
+    routes_cache = VersionedCache(
+        "system_routes",
+        tables=(Menu.__tablename__, MenuMeta.__tablename__, RoleMenu.__tablename__),
+    )
+
+    @classmethod
+    def get_routes_fingerprint(cls, request: Request) -> str:
+        if Authorizer.is_superuser(request):
+            return "superuser"
+        _, role_ids = request.auth.get_role_scope(request)
+        roles = ",".join(sorted(str(role_id) for role_id in role_ids))
+        return hashlib.sha1(roles.encode()).hexdigest()
+
+    @classmethod
+    async def get_cached_routes(cls, request: Request) -> tuple[str, bytes]:
+        """返回路由树的 ETag 和预编码的 {"auths":..., "data":...} JSON"""
+        version = await cls.routes_cache.sync()
+        key = cls.get_routes_fingerprint(request)
+        cached = cls.routes_cache.get(key)
+        if cached is None:
+            routes, auths = await cls.get_routes(request)
+            content = orjson.dumps({"auths": auths, "data": routes})
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            cached = (etag, content)
+            cls.routes_cache.put(key, cached, version)
+        return cached
 
     @classmethod
     async def get_routes(cls, request: Request):
@@ -139,13 +176,7 @@ class MenuLogic:
             for resource_name, router in resource_routers.items():
                 label_name = getattr(router, "sw_title", resource_name)
                 for route in router.routes:
-                    ignore_paths = [
-                        "/choices",
-                        "/search-fields",
-                        "/search-columns",
-                        "/cursor",
-                    ]
-                    if any(route.path.endswith(p) for p in ignore_paths):
+                    if any(route.path.endswith(p) for p in cls.ignore_paths):
                         continue
                     url_path = module_manager.endpoints[route.endpoint].path
                     for method in route.methods:
@@ -175,76 +206,200 @@ class MenuLogic:
             menu_object = await SenweaverCRUD(Menu).get(db, id=id)
             if not menu_object:
                 raise NotFoundException()
-            for resource_name in data.views:
-                resource_router = module_manager.resource_routers.get(resource_name)
-                if resource_router is None:
-                    continue
-                model_names = []
-                filter_config = getattr(resource_router, "sw_filter", None)
-                if filter_config:
-                    for relationship in filter_config.relationships:
-                        model_names.append(relationship._model.__senweaver_name__)
-                rank = 10000
-                for route in resource_router.routes:
-                    ignore_paths = [
-                        "/choices",
-                        "/search-fields",
-                        "/search-columns",
-                        "/cursor",
+            counts = await cls.sync_menu_permissions(request, db, id, data)
+            await db.commit()
+            return success_response(counts)
+
+    @classmethod
+    def get_view_permissions(
+        cls, resource_name: str, name_suffix: str
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """根据资源路由生成权限菜单数据，返回 {名称: 字段} 和关联模型名称"""
+        resource_router = module_manager.resource_routers.get(resource_name)
+        if resource_router is None:
+            return {}, []
+        model_names = []
+        filter_config = getattr(resource_router, "sw_filter", None)
+        if filter_config:
+            for relationship in filter_config.relationships:
+                model_names.append(relationship._model.__senweaver_name__)
+        permissions = {}
+        rank = 10000
+        for route in resource_router.routes:
+            if any(route.path.endswith(p) for p in cls.ignore_paths):
+                continue
+            menu_name = f"{route.name}:{name_suffix}"
+            if menu_name in permissions or not route.methods:
+                continue
+            rank += 1
+            permissions[menu_name] = {
+                "rank": rank,
+                "path": module_manager.endpoints[route.endpoint].path,
+                "auths": ",".join(get_route_permission(route)),
+                "method": sorted(route.methods)[0],
+                "title": (route.summary or route.description or menu_name)[:250],
+            }
+        return permissions, model_names
+
+    @classmethod
+    async def sync_menu_permissions(
+        cls, request: Request, db: AsyncSession, menu_id: int, data: IMenuPermission
+    ) -> dict[str, int]:
+        """
+        按资源路由同步菜单下的权限：一次查询已有权限，在内存中比较差异后，
+        批量新增缺少的、批量更新变化的、批量删除路由已不存在的权限
+        """
+        desired: dict[str, dict[str, Any]] = {}
+        suffixes = set()
+        view_models: dict[str, list[str]] = {}
+        for resource_name in data.views:
+            name_suffix = resource_name
+            if len(data.views) == 1 and data.component:
+                name_suffix = data.component
+            permissions, model_names = cls.get_view_permissions(
+                resource_name, name_suffix
+            )
+            if not permissions:
+                continue
+            suffixes.add(name_suffix)
+            for menu_name in permissions:
+                desired.setdefault(menu_name, permissions[menu_name])
+                view_models[menu_name] = model_names
+        if not desired:
+            return {"created": 0, "updated": 0, "deleted": 0, "skipped": 0}
+
+        result = await db.execute(
+            select(
+                Menu.id,
+                Menu.name,
+                Menu.parent_id,
+                Menu.path,
+                Menu.auths,
+                Menu.method,
+                Menu.meta_id,
+            ).where(
+                or_(
+                    and_(
+                        Menu.parent_id == menu_id,
+                        Menu.menu_type == Menu.MenuChoices.PERMISSION,
+                    ),
+                    Menu.name.in_(desired.keys()),
+                )
+            )
+        )
+        existing = {row.name: row for row in result.all()}
+
+        # 差异比较
+        created = [name for name in desired if name not in existing]
+        updated = []
+        skipped = 0
+        for name, row in existing.items():
+            values = desired.get(name)
+            if values is None:
+                continue
+            if row.parent_id != menu_id or data.skip_existing:
+                # 名称全局唯一，其它菜单下的同名权限不处理
+                skipped += 1
+                continue
+            method = row.method.value if hasattr(row.method, "value") else row.method
+            if (row.path, row.auths, method) != (
+                values["path"],
+                values["auths"],
+                values["method"],
+            ):
+                updated.append(
+                    {
+                        "id": row.id,
+                        "path": values["path"],
+                        "auths": values["auths"],
+                        "method": values["method"],
+                    }
+                )
+            else:
+                skipped += 1
+        deleted = [
+            row
+            for name, row in existing.items()
+            if name not in desired
+            and row.parent_id == menu_id
+            and name.rpartition(":")[2] in suffixes
+        ]
+
+        # 1.批量新增
+        if created:
+            creator_data = request.auth.get_creator_data(Menu, request)
+            metas = [
+                MenuMeta(title=desired[name]["title"], **creator_data)
+                for name in created
+            ]
+            db.add_all(metas)
+            await db.flush()
+            menus = []
+            for name, meta in zip(created, metas):
+                values = desired[name]
+                menus.append(
+                    Menu(
+                        rank=values["rank"],
+                        is_active=True,
+                        menu_type=Menu.MenuChoices.PERMISSION,
+                        name=name,
+                        parent_id=menu_id,
+                        path=values["path"],
+                        auths=values["auths"],
+                        method=values["method"],
+                        meta_id=meta.id,
+                        **creator_data,
+                    )
+                )
+            db.add_all(menus)
+            await db.flush()
+            model_names = {n for name in created for n in view_models[name]}
+            if model_names:
+                result = await db.execute(
+                    select(ModelField.id, ModelField.name).where(
+                        ModelField.field_type == ModelField.FieldChoices.ROLE,
+                        ModelField.name.in_(model_names),
+                    )
+                )
+                model_ids = {}
+                for model_id, model_name in result.all():
+                    model_ids.setdefault(model_name, []).append(model_id)
+                db.add_all(
+                    [
+                        MenuModel(menu_id=menu.id, modelfield_id=model_id)
+                        for menu in menus
+                        for model_name in view_models[menu.name]
+                        for model_id in model_ids.get(model_name, [])
                     ]
-                    if any(route.path.endswith(p) for p in ignore_paths):
-                        continue
-                    auth_set = get_route_permission(route)
-                    auth_str = ",".join(auth_set)
-                    name_suffix = resource_name
-                    url_path = module_manager.endpoints[route.endpoint].path
-                    if len(data.views) == 1 and data.component:
-                        name_suffix = data.component
-                    menu_name = f"{route.name}:{name_suffix}"
-                    for method in route.methods:
-                        permission_menu = await SenweaverCRUD(Menu).get(
-                            db, menu_type=Menu.MenuChoices.PERMISSION, name=menu_name
+                )
+                await db.flush()
+        # 2.批量更新
+        if updated:
+            await db.execute(update(Menu), updated)
+        # 3.批量删除
+        if deleted:
+            menu_ids = [row.id for row in deleted]
+            meta_ids = [row.meta_id for row in deleted if row.meta_id]
+            await db.execute(
+                delete(FieldPermissionField).where(
+                    FieldPermissionField.fieldpermission_id.in_(
+                        select(FieldPermission.id).where(
+                            FieldPermission.menu_id.in_(menu_ids)
                         )
-                        if permission_menu:  # and data.skip_existing:
-                            continue
-                        # 1.先保存meta
-                        meta = MenuMeta(
-                            title=(route.summary or route.description)[:250]
-                        )
-                        await SenweaverCRUD(MenuMeta).create(db, meta, commit=False)
-                        # 2.保存菜单
-                        rank += 1
-                        menu = Menu(
-                            rank=rank,
-                            is_active=True,
-                            menu_type=Menu.MenuChoices.PERMISSION,
-                            name=menu_name,
-                            parent_id=id,
-                            path=url_path,
-                            auths=auth_str,
-                            method=method,
-                            meta_id=meta.id,
-                        )
-                        await SenweaverCRUD(Menu).create(db, menu, commit=False)
-                        # 3.保存关联模型
-                        if model_names:
-                            result = await SenweaverCRUD(ModelField).get_multi(
-                                db,
-                                field_type=ModelField.FieldChoices.ROLE,
-                                name__in=model_names,
-                                return_total_count=False,
-                                limit=None,
-                            )
-                            for model in result["data"]:
-                                await SenweaverCRUD(MenuModel).create(
-                                    db,
-                                    MenuModel(
-                                        menu_id=menu.id, modelfield_id=model["id"]
-                                    ),
-                                    commit=False,
-                                )
-                await db.commit()
-            return success_response()
+                    )
+                )
+            )
+            for model in (MenuModel, RoleMenu, MenuRule, FieldPermission):
+                await db.execute(delete(model).where(model.menu_id.in_(menu_ids)))
+            await db.execute(delete(Menu).where(Menu.id.in_(menu_ids)))
+            if meta_ids:
+                await db.execute(delete(MenuMeta).where(MenuMeta.id.in_(meta_ids)))
+        return {
+            "created": len(created),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "skipped": skipped,
+        }
 
 
 menu_logic = MenuLogic()
@@ -20,6 +20,7 @@ from ..model.data_permission import DataPermission
 from ..model.role import Role
 from ..model.user import User, UserCreate, UserCreateInternal
 from ..schema.user import IUserEmpower, IUserResetPassword
+from .attachment_logic import AttachmentLogic
 from .common_logic import CommonLogic
 
 
@@ -90,9 +91,9 @@ class UserLogic:
     async def upload_avatar(cls, request: Request, user_id: int, file: UploadFile):
         data = await CommonLogic.upload(request, user_id, "avatar", "", [file])
         path = data[0].filepath
-        await SenweaverCRUD(User).update(
-            request.auth.db.session, {"avatar": path}, id=user_id
-        )
+        db: AsyncSession = request.auth.db.session
+        await SenweaverCRUD(User).update(db, {"avatar": path}, id=user_id)
+        await AttachmentLogic.mark_used(db, filepaths=[path])
 
     @classmethod
     def add_custom_router(cls, endpoint_creator: SenweaverEndpointCreator):
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from .attachment import Attachment
+from .attachment import Attachment, AttachmentBlob
 from .config import Config
 from .data_permission import DataPermission
 from .dept import Dept
@@ -15,7 +15,7 @@ from .menu_meta import MenuMeta
 from .menu_model import MenuModel
 from .menu_rule import MenuRule
 from .modelfield import ModelField
-from .operation_log import OperationLog
+from .operation_log import OperationLog, OperationLogPayload
 from .post import Post
 from .role import Role
 from .role_menu import RoleMenu
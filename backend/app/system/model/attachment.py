@@ -1,7 +1,7 @@
 from typing import Optional
 from urllib.parse import urljoin
 
-from sqlalchemy import Boolean, Integer, String
+from sqlalchemy import BigInteger, Boolean, Integer, String, event, update
 
 from config.settings import settings
 from senweaver.core.models import AuditMixin, BaseMixin, PKMixin
@@ -23,7 +23,7 @@ class AttachmentBase(BaseMixin):
     category: Optional[str] = Field(default=None, sa_type=String(50), title="分类")
     filename: str = Field(default=None, sa_type=String(200), title="文件名称")
     suffix: str = Field(default=None, sa_type=String(20), title="文件后缀")
-    filesize: int = Field(default=None, sa_type=Integer, title="文件大小")
+    filesize: int = Field(default=None, sa_type=BigInteger, title="文件大小")
     filepath: Optional[str] = Field(
         default=None, sa_type=String(255), index=True, title="文件路径"
     )
@@ -60,6 +60,37 @@ class Attachment(AuditMixin, AttachmentBase, PKMixin, table=True):
     __table_args__ = {"comment": "文件信息"}
 
 
+class AttachmentBlobBase(BaseMixin):
+    storage: Optional[str] = Field(
+        default="local", sa_type=String(100), title="存储引擎"
+    )
+    filepath: str = Field(
+        sa_type=String(255), unique=True, nullable=False, title="文件路径"
+    )
+    hash: str = Field(sa_type=String(255), index=True, title="文件哈希")
+    filesize: int = Field(default=0, sa_type=BigInteger, title="文件大小")
+    ref_count: int = Field(default=0, sa_type=Integer, title="引用次数")
+
+
+class AttachmentBlob(AttachmentBlobBase, PKMixin, table=True):
+    """按内容存储的文件，相同内容的附件共用一个文件，ref_count 为引用的附件数"""
+
+    __tablename__ = "system_attachment_blob"
+    __table_args__ = {"comment": "文件存储"}
+
+
+@event.listens_for(Attachment, "after_delete")
+def _release_blob(mapper, connection, target: Attachment):
+    # 删除附件时减少文件的引用次数，引用为 0 的文件由清理任务删除
+    if target.filepath:
+        connection.execute(
+            update(AttachmentBlob)
+            .where(AttachmentBlob.filepath == target.filepath)
+            .where(AttachmentBlob.ref_count > 0)
+            .values(ref_count=AttachmentBlob.ref_count - 1)
+        )
+
+
 @optional()
 class AttachmentRead(AuditMixin, AttachmentBase, PKMixin):
     pass
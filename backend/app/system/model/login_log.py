@@ -3,7 +3,13 @@ from typing import Optional, Union
 from sqlmodel import String
 
 from senweaver.auth.constants import LoginTypeChoices
-from senweaver.core.models import AuditMixin, BaseMixin, PKMixin
+from senweaver.core.models import (
+    LOG_PARTITION_ARGS,
+    AuditMixin,
+    BaseMixin,
+    LogPartitionMixin,
+    PKMixin,
+)
 from senweaver.db.models import ChoiceType, Field
 from senweaver.utils.partial import optional
 
@@ -43,11 +49,14 @@ class LoginLogBase(BaseMixin):
         sa_type=ChoiceType(LoginTypeChoices),
         title="登录类型",
     )
+    is_enriched: bool = Field(default=True, index=True, title="已解析")
 
 
-class LoginLog(AuditMixin, LoginLogBase, PKMixin, table=True):
+class LoginLog(LogPartitionMixin, AuditMixin, LoginLogBase, PKMixin, table=True):
     __tablename__ = "system_login_log"
-    __table_args__ = {"comment": "登录日志"}
+    __table_args__ = {"comment": "登录日志", **LOG_PARTITION_ARGS}
+    # 分区时表的主键包含创建时间，按 id 读写
+    __mapper_args__ = {"primary_key": ["id"]}
 
 
 @optional()
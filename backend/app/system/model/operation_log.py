@@ -1,9 +1,16 @@
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlmodel import Float, String, Text
+from sqlmodel import Float, Integer, LargeBinary, String, Text
 
-from senweaver.core.models import AuditMixin, BaseMixin, PKMixin
-from senweaver.db.models import Field
+from senweaver.core.models import (
+    LOG_PARTITION_ARGS,
+    AuditMixin,
+    BaseMixin,
+    LogPartitionMixin,
+    PKMixin,
+)
+from senweaver.db.models import Field, SQLModel
 from senweaver.utils.partial import optional
 
 
@@ -26,12 +33,14 @@ class OperationLogBase(BaseMixin):
     )
     browser: Optional[str] = Field(default=None, max_length=64, title="浏览器")
     system: Optional[str] = Field(default=None, max_length=64, title="操作系统")
+    agent: Optional[str] = Field(default=None, max_length=128, title="用户代理")
     response_code: Optional[int] = Field(default=None, title="响应码")
     response_result: Optional[str] = Field(default=None, sa_type=Text, title="响应内容")
     status_code: Optional[int] = Field(default=None, title="状态码")
     cost_time: Optional[float] = Field(
         default=0.0, sa_type=Float, title="请求耗时（ms）"
     )
+    is_enriched: bool = Field(default=True, index=True, title="已解析")
 
     @property
     def location(self) -> str:
@@ -43,9 +52,39 @@ class OperationLogBase(BaseMixin):
         return "/".join(location_parts) if location_parts else "-"
 
 
-class OperationLog(AuditMixin, OperationLogBase, PKMixin, table=True):
+class OperationLog(
+    LogPartitionMixin, AuditMixin, OperationLogBase, PKMixin, table=True
+):
     __tablename__ = "system_operation_log"
-    __table_args__ = {"comment": "操作日志"}
+    __table_args__ = {"comment": "操作日志", **LOG_PARTITION_ARGS}
+    # 分区时表的主键包含创建时间，按 id 读写
+    __mapper_args__ = {"primary_key": ["id"]}
+
+
+class OperationLogPayloadBase(SQLModel):
+    created_time: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc), title="创建时间"
+    )
+    encoding: str = Field(default="none", sa_type=String(8), title="压缩方式")
+    # 指定长度，MySQL 使用 MEDIUMBLOB
+    request: Optional[bytes] = Field(
+        default=None, sa_type=LargeBinary(2**24 - 1), title="请求参数"
+    )
+    response: Optional[bytes] = Field(
+        default=None, sa_type=LargeBinary(2**24 - 1), title="响应内容"
+    )
+    request_size: int = Field(default=0, sa_type=Integer, title="请求参数字节数")
+    response_size: int = Field(default=0, sa_type=Integer, title="响应内容字节数")
+
+
+class OperationLogPayload(
+    LogPartitionMixin, OperationLogPayloadBase, PKMixin, table=True
+):
+    """超过内联大小的请求、响应内容，id 与操作日志相同，只在查看详情时读取"""
+
+    __tablename__ = "system_operation_log_payload"
+    __table_args__ = {"comment": "操作日志内容", **LOG_PARTITION_ARGS}
+    __mapper_args__ = {"primary_key": ["id"]}
 
 
 @optional()
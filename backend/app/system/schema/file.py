@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class IChunkUploadInit(BaseModel):
+    filename: str = Field(min_length=1, max_length=200, title="文件名称")
+    filesize: int = Field(ge=0, title="文件大小")
+    category: str = Field(default="public", max_length=50, title="分类")
+    mime_type: Optional[str] = Field(default=None, max_length=100, title="文件类型")
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
+import asyncio
 from pathlib import Path
 
+from config.settings import settings
 from fastapi import FastAPI
 from senweaver.db.session import get_session
 from senweaver.module.app import AppModule
@@ -18,7 +20,18 @@ class SystemApp(AppModule):
             )
 
     async def run(self):
-        pass
+        if settings.LOG_DEFERRED_ENRICH:
+            from .logic.log_logic import LogLogic
+
+            self.enrich_task = asyncio.create_task(LogLogic.enrich_worker())
+        if settings.LOG_PARTITION_ENABLED:
+            from .logic.log_logic import LogLogic
+
+            self.partition_task = asyncio.create_task(LogLogic.partition_worker())
+        if settings.ATTACHMENT_GC_ENABLED:
+            from .logic.attachment_logic import AttachmentLogic
+
+            self.attachment_gc_task = asyncio.create_task(AttachmentLogic.gc_worker())
 
 
 module = SystemApp(module_path=Path(__file__).parent, package=__package__)
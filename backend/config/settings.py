@@ -38,6 +38,21 @@ class Settings(BaseSettings):
     UPLOAD_PATH: Path = DATA_PATH.joinpath("uploads")
     UPLOAD_URL: str = "/uploads"
     UPLOAD_PUBLIC_URL: str = f"{UPLOAD_URL}/public"
+    UPLOAD_TEMP_PATH: Path = UPLOAD_PATH.joinpath(".tmp")  # 需要与 UPLOAD_PATH 在同一文件系统
+    UPLOAD_CHUNK_SIZE: int = 1048576  # 上传文件每次读写的字节数
+    UPLOAD_PART_SIZE: int = 8388608  # 分片上传时每个分片的字节数
+    FILE_CACHE_SIZE: int = 4096  # 下载时缓存的附件信息条数
+    FILE_BUNDLE_MAX_FILES: int = 1000  # 打包下载时单次最多的文件数
+    THUMBNAIL_PATH: Path = DATA_PATH.joinpath("thumbnails")  # 缩略图缓存目录
+    THUMBNAIL_MAX_SIZE: int = 2048  # 缩略图最大宽度、高度
+    THUMBNAIL_QUALITY: int = 85
+    THUMBNAIL_WORKERS: int = 0  # 生成缩略图的进程数，0 为 CPU 核数
+    ATTACHMENT_GC_ENABLED: bool = False  # 定时清理过期的临时附件和文件
+    ATTACHMENT_GC_INTERVAL: int = 3600  # 清理间隔，单位：秒
+    ATTACHMENT_GC_MAX_AGE: int = 86400  # 临时附件、上传临时文件保留的时间，单位：秒
+    ATTACHMENT_GC_UNREFERENCED: bool = False  # 同时清理没有被引用的非临时附件
+    ATTACHMENT_GC_BATCH_SIZE: int = 500  # 每批删除的附件数量
+    ATTACHMENT_GC_WORKERS: int = 8  # 删除文件的线程数
 
     # FastApi Project
     NAME: str = "SenWeaver"
@@ -47,6 +62,9 @@ class Settings(BaseSettings):
     DOCS_URL: str | None = "/docs"
     REDOCS_URL: str | None = "/redocs"
     OPENAPI_URL: str | None = "/openapi.json"
+    OPENAPI_PRECOMPUTE: bool = True  # 启动时生成 OpenAPI 文档，只保留编码后的内容
+    OPENAPI_GZIP: bool = True  # 预先压缩 OpenAPI 文档
+    OPENAPI_CACHE_PATH: Path = DATA_PATH.joinpath("openapi")  # 生成的文档目录，按模块和路由的指纹命名
 
     # Uvicorn
     APP_HOST: str = "0.0.0.0"
@@ -64,7 +82,16 @@ class Settings(BaseSettings):
     # Database
     DATABASE_ID_TYPE: IdTypeEnum = IdTypeEnum.SNOWFLAKE
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: list[str] = []  # 只读副本
+    DATABASE_ECHO: bool = False  # 打印SQL语句
+    POOL_ENABLE: bool = True  # 关闭后每次使用新连接(NullPool)
     POOL_SIZE: int = 5
+    POOL_MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: int = 30  # 获取连接超时时间，单位：秒
+    POOL_RECYCLE: int = 1800  # 连接回收时间，单位：秒
+    POOL_PRE_PING: bool = True
+    POOL_STATEMENT_CACHE_SIZE: int = 100  # asyncpg 预编译语句缓存数量
+    POOL_WAITERS_WARNING: int = 10  # 等待连接数超过该值时记录警告日志
     # Redis
     REDIS_ENABLE: bool = False
     REDIS_URL: str  # redis://:pass@localhost:port/dbname
@@ -72,20 +99,59 @@ class Settings(BaseSettings):
     # CAPTCHA
     CAPTCHA_ENABLE: bool = False
     CAPTCHA_EXPIRE_SECONDS: int = 60
+    CAPTCHA_POOL_SIZE: int = 200  # 预先生成的验证码数量，0 为不使用
+    CAPTCHA_POOL_LOW_WATER: int = 50  # 验证码数量低于该值时后台补充
+
+    # Login limit
+    LOGIN_LIMIT_ENABLE: bool = True
+    LOGIN_RATE: float = 1.0  # 进程内每个 IP 每秒补充的登录次数
+    LOGIN_BURST: int = 10  # 进程内每个 IP 可连续登录的次数
+    LOGIN_LIMIT_CACHE_SIZE: int = 10000  # 进程内令牌桶和锁定状态的最大数量
+    LOGIN_IP_RATE_COUNT: int = 60  # 集群内每个 IP 在窗口内最多尝试次数
+    LOGIN_IP_RATE_TIME: int = 60  # 尝试次数的统计窗口，单位：秒
+    LOGIN_USER_LIMIT_COUNT: int = 7  # 用户名登录失败次数上限
+    LOGIN_USER_LIMIT_TIME: int = 1800  # 用户名失败统计窗口和锁定时间，单位：秒
+    LOGIN_IP_LIMIT_COUNT: int = 50  # IP 登录失败次数上限
+    LOGIN_IP_LIMIT_TIME: int = 1800  # IP 失败统计窗口和锁定时间，单位：秒
+    # 受信任的反向代理地址或网段，只有来自这些地址的请求才按转发头识别客户端 IP
+    LOGIN_TRUSTED_PROXIES: list[str] = []
 
     # Middleware
     MIDDLEWARE_GZIP: bool = False
     MIDDLEWARE_ACCESS: bool = True
     MIDDLEWARE_OPERATION: bool = False
+    MIDDLEWARE_ASGI: bool = True  # 使用纯 ASGI 中间件，False 时使用 BaseHTTPMiddleware
+
+    # Log
+    USER_AGENT_CACHE_SIZE: int = 1024  # User-Agent 解析结果缓存数量
+    LOG_DEFERRED_ENRICH: bool = False  # 日志只记录原始ip和User-Agent，由后台任务解析
+    LOG_ENRICH_BATCH_SIZE: int = 500  # 后台解析每批处理的日志数量
+    LOG_ENRICH_INTERVAL: int = 10  # 后台解析间隔，单位：秒
+    LOG_PARTITION_ENABLED: bool = False  # 日志表按时间分区，PostgreSQL、MySQL 使用原生分区
+    LOG_PARTITION_INTERVAL: str = "month"  # 分区周期：day、week、month
+    LOG_PARTITION_PREMAKE: int = 2  # 提前创建的分区数量
+    LOG_PARTITION_CHECK_INTERVAL: int = 3600  # 分区维护间隔，单位：秒
+    LOG_RETENTION_PERIODS: int = 0  # 保留的分区数量（含当前分区），0 表示不清理
+    LOG_ARCHIVE_ENABLED: bool = True  # 删除过期分区前归档为 NDJSON.gz
+    LOG_ARCHIVE_PATH: Path = DATA_PATH.joinpath("archive")
+    LOG_PAYLOAD_MAX_SIZE: int = 65536  # 请求、响应内容最多保存的字节数，超出部分截断，0 表示不限制
+    LOG_PAYLOAD_INLINE_SIZE: int = 512  # 超过该字节数时完整内容保存到独立的表，日志表只保留预览
+    LOG_PAYLOAD_COMPRESSION: str = "zlib"  # 独立表中内容的压缩方式：none、zlib、zstd
+    LOG_RESPONSE_CAPTURE_SIZE: int = 16384  # 写操作日志最多记录的响应字节数，流式响应边发送边截取
 
     # Request ID
     TRACE_ID_REQUEST_HEADER_KEY: str = "X-Request-ID"
+    # Cache
+    CACHE_VERSION_INTERVAL: float = 1.0  # 配置缓存检查跨进程版本号的最小间隔，单位：秒
     # Token
     ALGORITHM: str = "HS256"
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     TOKEN_REFRESH_EXPIRE_MINUTES: int = 60 * 24 * 15  # 刷新过期时间，单位：秒
+    TOKEN_PERMISSION_CLAIMS: bool = False  # access token 携带角色和权限摘要，鉴权不查询数据库
+    TOKEN_ACCESS_HEADER: str = "X-Access-Token"  # 权限变更后换发的 access token 响应头
+    TOKEN_USER_CACHE_SIZE: int = 10000  # 按 token 鉴权时进程内缓存的用户数量
     AUTH_ENGINE: str = "app.system.core.auth.SystemAuthManager"  # 授权验证
     # CORS
     CORS_ENABLE: bool = True  # 是否启用跨域
@@ -93,6 +159,16 @@ class Settings(BaseSettings):
     CORS_ALLOW_CREDENTIALS: bool = True  # 是否支持携带 cookie
     CORS_ALLOW_METHODS: list[str] = ["*"]  # 设置允许跨域的http方法，比如 get、post等。
     CORS_ALLOW_HEADERS: list[str] = ["*"]  # 允许携带的headers，可以用来鉴别来源等作用。
+    # WebSocket
+    WEBSOCKET_QUEUE_SIZE: int = 256  # 每个连接待发送消息的最大数量
+    # 队列满时：drop_oldest、coalesce、disconnect
+    WEBSOCKET_OVERFLOW_POLICY: str = "drop_oldest"
+    WEBSOCKET_PING_INTERVAL: int = 30  # 心跳间隔，单位：秒，0 表示关闭
+    # 超过该时间未收到客户端消息则断开，单位：秒，0 表示关闭，需要客户端回复心跳
+    WEBSOCKET_IDLE_TIMEOUT: int = 0
+    # Notice
+    NOTICE_FANOUT_BATCH_SIZE: int = 1000  # 消息发布后每批写入收件箱的用户数量
+    NOTICE_UNREAD_TTL: int = 3600  # redis 中未读数缓存的过期时间，单位：秒
 
 
 @lru_cache
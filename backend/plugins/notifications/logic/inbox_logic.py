@@ -0,0 +1,688 @@
+import asyncio
+import operator
+from typing import Any, Coroutine, Iterable, Optional
+
+import orjson
+from redis.asyncio import Redis, RedisError
+from sqlalchemy import (
+    and_,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    not_,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.orm import attributes as orm_attributes
+from sqlalchemy.sql.operators import in_op
+
+from app.system.core.websocket import manager
+from app.system.model.dept import Dept
+from app.system.model.dept_role import DeptRole
+from app.system.model.user import User
+from app.system.model.user_role import UserRole
+from config.settings import settings
+from senweaver.db.routing import use_primary
+from senweaver.logger import logger
+from senweaver.middleware.db import db
+
+from ..model import Notice, NoticeDept, NoticeInbox, NoticeRole, NoticeUserRead
+from ..notifications import module
+
+SESSION_DELETED_KEY = "senweaver_deleted_notices"
+SESSION_MEMBERS_KEY = "senweaver_notice_members"
+
+# 收件箱提交后释放标记、增加版本，只累加已缓存的计数，
+# 未缓存的用户在下次读取时从收件箱重新统计
+# KEYS: 每个用户的未读数、标记、版本
+# ARGV: 每个用户的变化量，最后一个为版本的过期时间
+INCR_EXISTING_SCRIPT = """
+local count = #ARGV - 1
+local result = {}
+for i = 1, count do
+    local counter, pending, version = KEYS[i * 3 - 2], KEYS[i * 3 - 1], KEYS[i * 3]
+    if tonumber(redis.call('GET', pending) or '0') > 0 then
+        redis.call('DECR', pending)
+    end
+    redis.call('INCR', version)
+    redis.call('EXPIRE', version, ARGV[count + 1])
+    if redis.call('EXISTS', counter) == 1 then
+        result[i] = redis.call('INCRBY', counter, ARGV[i])
+    else
+        result[i] = -1
+    end
+end
+return result
+"""
+
+# 从收件箱统计的未读数只在统计期间没有变化时写入缓存：
+# 没有未提交的修改，且版本与统计前读取的相同
+# KEYS: 未读数、标记、版本
+# ARGV: 未读数、统计前的版本、过期时间
+SET_COUNT_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') > 0 then
+    return 0
+end
+if (redis.call('GET', KEYS[3]) or '') ~= ARGV[2] then
+    return 0
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3], 'NX') then
+    return 1
+end
+return 0
+"""
+
+
+class InboxLogic:
+    """
+    用户收件箱：消息发布后在后台按目标用户分批写入收件箱，
+    未读数缓存在 redis 中，变化时通过 WebSocket 推送给在线用户。
+    """
+
+    tasks: set[asyncio.Task] = set()
+    # 没有运行应用时（如命令行）使用的 redis
+    redis: Optional[Redis] = None
+    # 修改收件箱时标记的过期时间，提交失败时标记在过期后失效，单位：秒
+    hold_ttl = 60
+
+    @classmethod
+    def get_redis(cls) -> Optional[Redis]:
+        app = getattr(module, "app", None)
+        if app is not None:
+            return getattr(app.state, "redis", None)
+        return cls.redis
+
+    @classmethod
+    def counter_key(cls, owner_id: Any) -> str:
+        return f"{settings.NAME.lower()}:notice:unread:{owner_id}"
+
+    @classmethod
+    def counter_keys(cls, owner_id: Any) -> list[str]:
+        """未读数、未提交修改的标记、版本"""
+        key = cls.counter_key(owner_id)
+        return [key, f"{key}:pending", f"{key}:version"]
+
+    @classmethod
+    def channel(cls) -> str:
+        return f"{settings.NAME.lower()}:notice:unread"
+
+    @classmethod
+    def schedule(cls, coro: Coroutine):
+        task = asyncio.create_task(coro)
+        cls.tasks.add(task)
+        task.add_done_callback(cls._task_done)
+
+    @classmethod
+    def _task_done(cls, task: asyncio.Task):
+        cls.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"消息收件箱任务失败：{task.exception()}")
+
+    @classmethod
+    def get_target_stmt(cls, notice_id: int, notice_type: int):
+        """消息目标用户ID查询"""
+        stmt = select(User.id).where(User.is_deleted.is_not(True))
+        if notice_type == Notice.NoticeChoices.NOTICE:
+            return stmt
+        if notice_type == Notice.NoticeChoices.DEPT:
+            dept_ids = select(NoticeDept.dept_id).where(
+                NoticeDept.notice_id == notice_id
+            )
+            return stmt.where(
+                or_(
+                    User.dept_id.in_(dept_ids),
+                    # 未指定部门的部门通知发送给没有部门的用户
+                    and_(User.dept_id.is_(None), ~dept_ids.exists()),
+                )
+            )
+        if notice_type == Notice.NoticeChoices.ROLE:
+            role_ids = select(NoticeRole.role_id).where(
+                NoticeRole.notice_id == notice_id
+            )
+            return stmt.where(
+                or_(
+                    User.id.in_(
+                        select(UserRole.user_id).where(UserRole.role_id.in_(role_ids))
+                    ),
+                    User.dept_id.in_(
+                        select(DeptRole.dept_id).where(DeptRole.role_id.in_(role_ids))
+                    ),
+                )
+            )
+        return stmt.where(
+            User.id.in_(
+                select(NoticeUserRead.owner_id).where(
+                    NoticeUserRead.notice_id == notice_id
+                )
+            )
+        )
+
+    @classmethod
+    def get_target_condition(cls):
+        """消息是否发送给用户，与 `get_target_stmt` 相同的规则，关联 Notice 和 User"""
+        choices = Notice.NoticeChoices
+        dept_ids = select(NoticeDept.dept_id).where(NoticeDept.notice_id == Notice.id)
+        role_ids = select(NoticeRole.role_id).where(NoticeRole.notice_id == Notice.id)
+        return and_(
+            User.is_deleted.is_not(True),
+            or_(
+                Notice.notice_type == choices.NOTICE,
+                and_(
+                    Notice.notice_type == choices.DEPT,
+                    or_(
+                        User.dept_id.in_(dept_ids),
+                        and_(User.dept_id.is_(None), ~dept_ids.exists()),
+                    ),
+                ),
+                and_(
+                    Notice.notice_type == choices.ROLE,
+                    or_(
+                        User.id.in_(
+                            select(UserRole.user_id).where(
+                                UserRole.role_id.in_(role_ids)
+                            )
+                        ),
+                        User.dept_id.in_(
+                            select(DeptRole.dept_id).where(
+                                DeptRole.role_id.in_(role_ids)
+                            )
+                        ),
+                    ),
+                ),
+                and_(
+                    Notice.notice_type.not_in(
+                        [choices.NOTICE, choices.DEPT, choices.ROLE]
+                    ),
+                    exists().where(
+                        NoticeUserRead.notice_id == Notice.id,
+                        NoticeUserRead.owner_id == User.id,
+                    ),
+                ),
+            ),
+        )
+
+    @classmethod
+    @use_primary
+    async def fanout(cls, notice_id: int):
+        """按目标用户分批写入收件箱，并移除已不是目标的用户"""
+        batch_size = settings.NOTICE_FANOUT_BATCH_SIZE
+        async with db():
+            result = await db.session.execute(
+                select(Notice.notice_type, Notice.publish, Notice.created_time).where(
+                    Notice.id == notice_id
+                )
+            )
+            notice = result.first()
+        if notice is None or not notice.publish:
+            await cls.remove_notices([notice_id])
+            return
+        target = cls.get_target_stmt(notice_id, notice.notice_type)
+        last_id = None
+        total = 0
+        while True:
+            async with db(commit_on_exit=True):
+                session: AsyncSession = db.session
+                stmt = target if last_id is None else target.where(User.id > last_id)
+                result = await session.execute(stmt.order_by(User.id).limit(batch_size))
+                user_ids = result.scalars().all()
+                if not user_ids:
+                    break
+                last_id = user_ids[-1]
+                result = await session.execute(
+                    select(NoticeInbox.owner_id).where(
+                        NoticeInbox.notice_id == notice_id,
+                        NoticeInbox.owner_id.in_(user_ids),
+                    )
+                )
+                existing = set(result.scalars().all())
+                new_ids = [user_id for user_id in user_ids if user_id not in existing]
+                if new_ids:
+                    await cls.hold_counts(new_ids)
+                    await session.execute(
+                        insert(NoticeInbox),
+                        [
+                            {
+                                "owner_id": user_id,
+                                "notice_id": notice_id,
+                                "unread": True,
+                                "created_time": notice.created_time,
+                            }
+                            for user_id in new_ids
+                        ],
+                    )
+            if new_ids:
+                total += len(new_ids)
+                await cls.change_counts({user_id: 1 for user_id in new_ids})
+            if len(user_ids) < batch_size:
+                break
+        while True:
+            async with db(commit_on_exit=True):
+                session = db.session
+                result = await session.execute(
+                    select(NoticeInbox.owner_id, NoticeInbox.unread)
+                    .where(
+                        NoticeInbox.notice_id == notice_id,
+                        NoticeInbox.owner_id.not_in(target),
+                    )
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                await cls.hold_counts([row.owner_id for row in rows])
+                await session.execute(
+                    delete(NoticeInbox).where(
+                        NoticeInbox.notice_id == notice_id,
+                        NoticeInbox.owner_id.in_([row.owner_id for row in rows]),
+                    )
+                )
+            await cls.change_counts(
+                {row.owner_id: -1 if row.unread else 0 for row in rows}
+            )
+            if len(rows) < batch_size:
+                break
+        logger.info(f"消息 {notice_id} 已写入 {total} 个用户收件箱")
+        return total
+
+    @classmethod
+    @use_primary
+    async def backfill(cls) -> int:
+        """为全部已发布的消息补写收件箱，用于收件箱启用前发布的消息，返回写入数量"""
+        batch_size = settings.NOTICE_FANOUT_BATCH_SIZE
+        last_id = None
+        total = 0
+        while True:
+            async with db():
+                stmt = select(Notice.id).where(Notice.publish == True)
+                if last_id is not None:
+                    stmt = stmt.where(Notice.id > last_id)
+                result = await db.session.execute(
+                    stmt.order_by(Notice.id).limit(batch_size)
+                )
+                notice_ids = result.scalars().all()
+            for notice_id in notice_ids:
+                total += await cls.fanout(notice_id)
+            if len(notice_ids) < batch_size:
+                return total
+            last_id = notice_ids[-1]
+
+    @classmethod
+    @use_primary
+    async def sync_users(cls, user_ids: Iterable[Any]):
+        """用户的部门或角色变化后，补写新成为目标的消息，移除已不是目标的消息"""
+        user_ids = list(user_ids)
+        batch_size = settings.NOTICE_FANOUT_BATCH_SIZE
+        target = cls.get_target_condition()
+        for index in range(0, len(user_ids), batch_size):
+            batch = user_ids[index : index + batch_size]
+            async with db(commit_on_exit=True):
+                session: AsyncSession = db.session
+                result = await session.execute(
+                    select(Notice.id, User.id.label("owner_id"), Notice.created_time)
+                    .join(User, and_(User.id.in_(batch), target))
+                    .where(
+                        Notice.publish == True,
+                        ~exists().where(
+                            NoticeInbox.notice_id == Notice.id,
+                            NoticeInbox.owner_id == User.id,
+                        ),
+                    )
+                )
+                created = result.all()
+                result = await session.execute(
+                    select(
+                        NoticeInbox.notice_id, NoticeInbox.owner_id, NoticeInbox.unread
+                    )
+                    .join(Notice, Notice.id == NoticeInbox.notice_id)
+                    .join(User, User.id == NoticeInbox.owner_id)
+                    .where(
+                        NoticeInbox.owner_id.in_(batch),
+                        or_(Notice.publish.is_not(True), not_(target)),
+                    )
+                )
+                removed = result.all()
+                owner_ids = {row.owner_id for row in created}
+                owner_ids.update(row.owner_id for row in removed)
+                if not owner_ids:
+                    continue
+                await cls.hold_counts(owner_ids)
+                if created:
+                    await session.execute(
+                        insert(NoticeInbox),
+                        [
+                            {
+                                "owner_id": row.owner_id,
+                                "notice_id": row.id,
+                                "unread": True,
+                                "created_time": row.created_time,
+                            }
+                            for row in created
+                        ],
+                    )
+                for owner_id in {row.owner_id for row in removed}:
+                    await session.execute(
+                        delete(NoticeInbox).where(
+                            NoticeInbox.owner_id == owner_id,
+                            NoticeInbox.notice_id.in_(
+                                [
+                                    row.notice_id
+                                    for row in removed
+                                    if row.owner_id == owner_id
+                                ]
+                            ),
+                        )
+                    )
+            deltas = dict.fromkeys(owner_ids, 0)
+            for row in created:
+                deltas[row.owner_id] += 1
+            for row in removed:
+                if row.unread:
+                    deltas[row.owner_id] -= 1
+            await cls.change_counts(deltas)
+
+    @classmethod
+    @use_primary
+    async def sync_members(
+        cls, user_ids: Iterable[Any], dept_ids: Iterable[Any], full: bool = False
+    ):
+        """部门、角色成员变化后同步收件箱，无法确定变化的用户时同步全部消息"""
+        if full:
+            await cls.backfill()
+            return
+        user_ids = set(user_ids)
+        dept_ids = list(dept_ids)
+        if dept_ids:
+            async with db():
+                result = await db.session.execute(
+                    select(User.id).where(User.dept_id.in_(dept_ids))
+                )
+                user_ids.update(result.scalars().all())
+        if user_ids:
+            await cls.sync_users(sorted(user_ids))
+
+    @classmethod
+    @use_primary
+    async def remove_notices(cls, notice_ids: Iterable[int]):
+        """删除或撤回消息时分批清理收件箱"""
+        notice_ids = list(notice_ids)
+        batch_size = settings.NOTICE_FANOUT_BATCH_SIZE
+        while True:
+            async with db(commit_on_exit=True):
+                session: AsyncSession = db.session
+                result = await session.execute(
+                    select(
+                        NoticeInbox.owner_id, NoticeInbox.notice_id, NoticeInbox.unread
+                    )
+                    .where(NoticeInbox.notice_id.in_(notice_ids))
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                await cls.hold_counts({row.owner_id for row in rows})
+                for notice_id in {row.notice_id for row in rows}:
+                    await session.execute(
+                        delete(NoticeInbox).where(
+                            NoticeInbox.notice_id == notice_id,
+                            NoticeInbox.owner_id.in_(
+                                [
+                                    row.owner_id
+                                    for row in rows
+                                    if row.notice_id == notice_id
+                                ]
+                            ),
+                        )
+                    )
+            deltas = dict.fromkeys({row.owner_id for row in rows}, 0)
+            for row in rows:
+                if row.unread:
+                    deltas[row.owner_id] -= 1
+            await cls.change_counts(deltas)
+            if len(rows) < batch_size:
+                break
+
+    @classmethod
+    async def set_unread(
+        cls,
+        session: AsyncSession,
+        owner_id: Any,
+        notice_ids: Optional[Iterable[int]],
+        unread: bool,
+    ) -> int:
+        """
+        更新收件箱的已读状态，notice_ids 为 None 时更新全部，返回未读数的变化量，
+        提交后需要调用 `change_counts`
+        """
+        await cls.hold_counts([owner_id])
+        stmt = update(NoticeInbox).where(
+            NoticeInbox.owner_id == owner_id, NoticeInbox.unread.is_not(unread)
+        )
+        if notice_ids is not None:
+            stmt = stmt.where(NoticeInbox.notice_id.in_(list(notice_ids)))
+        result = await session.execute(
+            stmt.values(unread=unread), execution_options={"synchronize_session": False}
+        )
+        return result.rowcount if unread else -result.rowcount
+
+    @classmethod
+    async def hold_counts(cls, owner_ids: Iterable[Any]):
+        """
+        修改收件箱前标记用户，标记期间统计的未读数不写入缓存，
+        避免统计结果包含修改后 `change_counts` 又累加一次
+        """
+        redis = cls.get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for owner_id in owner_ids:
+                    key = cls.counter_keys(owner_id)[1]
+                    pipe.incr(key)
+                    pipe.expire(key, cls.hold_ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"标记未读数失败：{e}")
+
+    @classmethod
+    async def change_counts(cls, deltas: dict[Any, int]):
+        """收件箱提交后释放 `hold_counts` 的标记，并累加已缓存的未读数"""
+        redis = cls.get_redis()
+        if not deltas or redis is None:
+            return
+        owner_ids = list(deltas)
+        try:
+            values = await redis.eval(
+                INCR_EXISTING_SCRIPT,
+                len(owner_ids) * 3,
+                *[key for owner_id in owner_ids for key in cls.counter_keys(owner_id)],
+                *[deltas[owner_id] for owner_id in owner_ids],
+                settings.NOTICE_UNREAD_TTL,
+            )
+            counts = {
+                str(owner_id): int(value)
+                for owner_id, value in zip(owner_ids, values)
+                if deltas[owner_id] and int(value) >= 0
+            }
+            if counts:
+                await redis.publish(cls.channel(), orjson.dumps({"counts": counts}))
+        except RedisError as e:
+            logger.warning(f"更新未读数失败：{e}")
+
+    @classmethod
+    async def get_unread_count(cls, session: AsyncSession, owner_id: Any) -> int:
+        redis = cls.get_redis()
+        keys = cls.counter_keys(owner_id)
+        version = None
+        if redis is not None:
+            try:
+                value, version = await redis.mget(keys[0], keys[2])
+                if value is not None:
+                    return int(value)
+            except RedisError as e:
+                logger.warning(f"读取未读数失败：{e}")
+                redis = None
+        count = await session.scalar(
+            select(func.count())
+            .select_from(NoticeInbox)
+            .where(NoticeInbox.owner_id == owner_id, NoticeInbox.unread.is_(True))
+        )
+        if redis is not None:
+            try:
+                await redis.eval(
+                    SET_COUNT_SCRIPT,
+                    len(keys),
+                    *keys,
+                    count,
+                    version or "",
+                    settings.NOTICE_UNREAD_TTL,
+                )
+            except RedisError as e:
+                logger.warning(f"缓存未读数失败：{e}")
+        return count
+
+    @classmethod
+    async def listen(cls):
+        """订阅未读数变化，推送给连接到当前进程的用户"""
+        while True:
+            redis = cls.get_redis()
+            if redis is None:
+                return
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.channel())
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        counts = orjson.loads(message["data"]).get("counts", {})
+                        for owner_id, count in counts.items():
+                            if owner_id in manager.user_clients:
+                                await manager.send_user_data(
+                                    owner_id, "unread_count", {"count": count}
+                                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"未读数订阅失败：{e}")
+                await asyncio.sleep(5)
+
+
+@event.listens_for(Notice, "after_delete")
+def _collect_deleted_notice(mapper, connection, target: Notice):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(SESSION_DELETED_KEY, set()).add(target.id)
+
+
+def _member_changes(session: Session) -> dict[str, Any]:
+    return session.info.setdefault(
+        SESSION_MEMBERS_KEY, {"users": set(), "depts": set(), "full": False}
+    )
+
+
+def _has_changes(obj: Any, *keys: str) -> bool:
+    return any(
+        orm_attributes.get_history(obj, key).has_changes()
+        for key in keys
+        if key in obj.__dict__
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_member_changes(session: Session, flush_context):
+    # 新用户、部门变化、角色变化的用户和角色变化的部门，提交后同步收件箱
+    users: set = set()
+    depts: set = set()
+    for obj in session.new:
+        if isinstance(obj, User):
+            users.add(obj.id)
+        elif isinstance(obj, UserRole):
+            users.add(obj.user_id)
+        elif isinstance(obj, DeptRole):
+            depts.add(obj.dept_id)
+    for obj in session.dirty:
+        if isinstance(obj, User) and _has_changes(
+            obj, "dept_id", "roles", "is_deleted"
+        ):
+            users.add(obj.id)
+        elif isinstance(obj, Dept) and _has_changes(obj, "roles"):
+            depts.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, UserRole):
+            users.add(obj.user_id)
+        elif isinstance(obj, DeptRole):
+            depts.add(obj.dept_id)
+    if users or depts:
+        changes = _member_changes(session)
+        changes["users"].update(users)
+        changes["depts"].update(depts)
+
+
+def _get_statement_ids(state: ORMExecuteState, column) -> Optional[set]:
+    """从 `column == x` 或 `column.in_([...])` 条件中取出 id，无法确定时返回 None"""
+    whereclause = getattr(state.statement, "whereclause", None)
+    if whereclause is None:
+        return None
+    for clause in getattr(whereclause, "clauses", [whereclause]):
+        if getattr(getattr(clause, "left", None), "key", None) != column.key:
+            continue
+        value = getattr(clause.right, "value", None)
+        if clause.operator is operator.eq and value is not None:
+            return {value}
+        if clause.operator is in_op and isinstance(value, (list, tuple)):
+            return set(value)
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_member_statements(state: ORMExecuteState):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    if table is User.__table__:
+        if state.is_update:
+            values = {getattr(key, "key", key) for key in state.statement._values or {}}
+            if not values & {"dept_id", "is_deleted"}:
+                return
+        user_ids = None if state.is_insert else _get_statement_ids(state, User.id)
+        if user_ids is not None:
+            _member_changes(state.session)["users"].update(user_ids)
+            return
+    elif table is UserRole.__table__ and not state.is_insert:
+        user_ids = _get_statement_ids(state, UserRole.user_id)
+        if user_ids is not None:
+            _member_changes(state.session)["users"].update(user_ids)
+            return
+    elif table is DeptRole.__table__ and not state.is_insert:
+        dept_ids = _get_statement_ids(state, DeptRole.dept_id)
+        if dept_ids is not None:
+            _member_changes(state.session)["depts"].update(dept_ids)
+            return
+    elif table not in (UserRole.__table__, DeptRole.__table__):
+        return
+    _member_changes(state.session)["full"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_inbox_changes(session: Session):
+    session.info.pop(SESSION_DELETED_KEY, None)
+    session.info.pop(SESSION_MEMBERS_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_inbox_changes(session: Session):
+    notice_ids = session.info.pop(SESSION_DELETED_KEY, None)
+    if notice_ids:
+        InboxLogic.schedule(InboxLogic.remove_notices(notice_ids))
+    changes = session.info.pop(SESSION_MEMBERS_KEY, None)
+    if changes:
+        InboxLogic.schedule(
+            InboxLogic.sync_members(changes["users"], changes["depts"], changes["full"])
+        )
+
+
+inbox_logic = InboxLogic()
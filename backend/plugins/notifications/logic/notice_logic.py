@@ -6,10 +6,11 @@ from fastapi import Depends, Query, Request
 from fastcrud import FastCRUD
 from fastcrud.paginated.helper import compute_offset
 from pydantic import BaseModel
-from sqlalchemy import and_, distinct, func, or_, select
+from sqlalchemy import and_, distinct, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, joinedload, selectinload
 
+from app.system.logic.attachment_logic import AttachmentLogic
 from app.system.model.attachment import Attachment
 from app.system.model.dept import Dept
 from app.system.model.role import Role
@@ -25,85 +26,134 @@ from senweaver.utils.response import PageResponse, ResponseBase, success_respons
 
 from ..model import Notice, NoticeDept, NoticeRole, NoticeUserRead
 from ..schema.notice import IStateUpdate
+from .inbox_logic import InboxLogic
 
 
 class NoticeLogic:
 
     @classmethod
-    async def read_all_message(cls, request: Request):
-        db: AsyncSession = request.auth.db.session
-        crud = SenweaverCRUD(Notice)
-        _, role_ids = request.auth.get_role_scope()
-        current_user = request.user
-        filters = {"publish": True}
-        filters["__where"] = or_(
+    def get_visible_where(cls, current_user: User, role_ids: set[int]):
+        """当前用户可见的消息条件，使用 EXISTS 子查询避免关联表连接后的重复行"""
+        if current_user.dept_id is None:
+            dept_where = (
+                ~select(NoticeDept.id)
+                .where(NoticeDept.notice_id == Notice.id)
+                .correlate(Notice)
+                .exists()
+            )
+        else:
+            dept_where = (
+                select(NoticeDept.id)
+                .where(
+                    NoticeDept.notice_id == Notice.id,
+                    NoticeDept.dept_id == current_user.dept_id,
+                )
+                .correlate(Notice)
+                .exists()
+            )
+        return or_(
             Notice.notice_type == Notice.NoticeChoices.NOTICE,
-            and_(
-                Notice.notice_type == Notice.NoticeChoices.DEPT,
-                (
-                    NoticeDept.dept_id.is_(None)
-                    if current_user.dept_id is None
-                    else NoticeDept.dept_id == current_user.dept_id
-                ),
-            ),
+            and_(Notice.notice_type == Notice.NoticeChoices.DEPT, dept_where),
             and_(
                 Notice.notice_type == Notice.NoticeChoices.ROLE,
-                NoticeRole.id.in_(role_ids),
+                select(NoticeRole.id)
+                .where(
+                    NoticeRole.notice_id == Notice.id,
+                    NoticeRole.role_id.in_(role_ids),
+                )
+                .correlate(Notice)
+                .exists(),
             ),
             and_(
                 Notice.notice_type.in_(Notice.get_user_choices()),
-                and_(
+                select(NoticeUserRead.id)
+                .where(
+                    NoticeUserRead.notice_id == Notice.id,
                     NoticeUserRead.owner_id == current_user.id,
-                    NoticeUserRead.unread.is_(True),
-                ),
+                )
+                .correlate(Notice)
+                .exists(),
             ),
         )
+
+    @classmethod
+    async def read_all_message(cls, request: Request):
+        db: AsyncSession = request.auth.db.session
+        crud = SenweaverCRUD(Notice)
+        _, role_ids = request.auth.get_role_scope()
+        current_user = request.user
+        filters = {"publish": True}
+        filters["__where"] = and_(
+            cls.get_visible_where(current_user, role_ids),
+            # 排除已读的消息
+            ~select(NoticeUserRead.id)
+            .where(
+                NoticeUserRead.notice_id == Notice.id,
+                NoticeUserRead.owner_id == current_user.id,
+                NoticeUserRead.unread.is_(False),
+            )
+            .correlate(Notice)
+            .exists(),
+        )
         kwargs = await crud._build_filters(filters)
         sa_filters = crud._parse_filters(**kwargs)
-        stmt = (
-            select(Notice.id)
-            .distinct()
-            .outerjoin(NoticeDept, Notice.id == NoticeDept.dept_id)
-            .outerjoin(NoticeRole, Notice.id == NoticeRole.notice_id)
-            .outerjoin(NoticeUserRead, Notice.id == NoticeUserRead.notice_id)
-            .filter(*sa_filters)
-        )
-        result = await db.execute(stmt)
+        result = await db.execute(select(Notice.id).filter(*sa_filters))
         list_ids = result.scalars().all()
         await cls.read_message(request, list_ids)
+        delta = await InboxLogic.set_unread(db, current_user.id, None, False)
+        await db.commit()
+        await InboxLogic.change_counts({current_user.id: delta})
 
     @classmethod
-    async def read_message(cls, request: Request, ids: list[int]):
+    async def read_message(cls, request: Request, ids: list[int]) -> int:
+        """批量设置已读：一次查询已有的已读记录，批量更新未读的、批量新增缺少的"""
+        ids = list(set(ids))
+        if not ids:
+            return 0
         db: AsyncSession = request.auth.db.session
-        crud = SenweaverCRUD(NoticeUserRead)
-        await crud.update(
-            db,
-            object={"unread": False},
-            notice_id__in=ids,
-            owner_id=request.user.id,
-            unread=True,
-            allow_multiple=True,
+        owner_id = request.user.id
+        result = await db.execute(
+            select(Notice.id, NoticeUserRead.id, NoticeUserRead.unread)
+            .outerjoin(
+                NoticeUserRead,
+                and_(
+                    NoticeUserRead.notice_id == Notice.id,
+                    NoticeUserRead.owner_id == owner_id,
+                ),
+            )
+            .where(Notice.id.in_(ids))
         )
-        for id in ids:
-            db_instance = await crud.get(
-                db, return_as_model=False, notice_id=id, owner_id=request.user.id
+        user_data = {
+            "modifier_id": owner_id,
+            "updated_time": datetime.now(timezone.utc),
+        }
+        updated = []
+        created = []
+        for notice_id, read_id, unread in result.all():
+            if read_id is None:
+                created.append(notice_id)
+            elif unread:
+                updated.append({"id": read_id, "unread": False, **user_data})
+        if updated:
+            await db.execute(update(NoticeUserRead), updated)
+        if created:
+            creator_data = request.auth.get_creator_data(NoticeUserRead)
+            db.add_all(
+                [
+                    NoticeUserRead(
+                        notice_id=notice_id,
+                        owner_id=owner_id,
+                        unread=False,
+                        **user_data,
+                        **creator_data,
+                    )
+                    for notice_id in created
+                ]
             )
-            data = {"notice_id": id, "owner_id": request.user.id, "unread": False}
-            user_data = {}
-            updated_time = datetime.now(timezone.utc)
-            if request and hasattr(request, "user"):
-                user_data["modifier_id"] = request.user.id
-                user_data["updated_time"] = updated_time
-                if db_instance is None:
-                    creator_data = request.auth.get_creator_data(NoticeUserRead)
-                    user_data.update(creator_data)
-            data.update(user_data)
-            if db_instance is None:
-                await crud.create(db, object=NoticeUserRead(**data))
-            else:
-                await crud.update(
-                    db, object=data, notice_id=id, owner_id=request.user.id
-                )
+        delta = await InboxLogic.set_unread(db, owner_id, ids, False)
+        await db.commit()
+        await InboxLogic.change_counts({owner_id: delta})
+        return len(updated) + len(created)
 
     @classmethod
     async def get_user_count(cls, db: AsyncSession, obj: Notice, key: str, **kwargs):
@@ -186,10 +236,17 @@ class NoticeLogic:
         if obj is None:
             raise NotFoundException()
         notice_type = obj["notice"]["notice_type"]
+        unread = True
         if notice_type in Notice.get_user_choices():
+            unread = state.unread
             await crud.update(db, {"unread": state.unread}, id=id)
         elif notice_type in Notice.get_notice_choices():
             await crud.delete(db, id=id)
+        delta = await InboxLogic.set_unread(
+            db, obj["owner_id"], [obj["notice_id"]], unread
+        )
+        await db.commit()
+        await InboxLogic.change_counts({obj["owner_id"]: delta})
 
     @classmethod
     async def get_site_message_list(
@@ -223,7 +280,7 @@ class NoticeLogic:
             ),
             and_(
                 Notice.notice_type == Notice.NoticeChoices.ROLE,
-                NoticeRole.id.in_(role_ids),
+                NoticeRole.role_id.in_(role_ids),
             ),
             and_(
                 Notice.notice_type.in_(Notice.get_user_choices()),
@@ -255,7 +312,7 @@ class NoticeLogic:
         stmt = (
             select(Notice)
             .distinct()
-            .outerjoin(NoticeDept, Notice.id == NoticeDept.dept_id)
+            .outerjoin(NoticeDept, Notice.id == NoticeDept.notice_id)
             .outerjoin(NoticeRole, Notice.id == NoticeRole.notice_id)
             .outerjoin(NoticeUserRead, Notice.id == NoticeUserRead.notice_id)
             .filter(*sa_filters)
@@ -285,7 +342,7 @@ class NoticeLogic:
         stmt_count = select(func.count()).select_from(
             select(Notice.id)
             .distinct()
-            .outerjoin(NoticeDept, Notice.id == NoticeDept.dept_id)
+            .outerjoin(NoticeDept, Notice.id == NoticeDept.notice_id)
             .outerjoin(NoticeRole, Notice.id == NoticeRole.notice_id)
             .outerjoin(NoticeUserRead, Notice.id == NoticeUserRead.notice_id)
             .filter(*sa_filters)
@@ -296,7 +353,7 @@ class NoticeLogic:
         unread_stmt_count = select(func.count()).select_from(
             select(Notice.id)
             .distinct()
-            .outerjoin(NoticeDept, Notice.id == NoticeDept.dept_id)
+            .outerjoin(NoticeDept, Notice.id == NoticeDept.notice_id)
             .outerjoin(NoticeRole, Notice.id == NoticeRole.notice_id)
             .outerjoin(NoticeUserRead, Notice.id == NoticeUserRead.notice_id)
             .filter(NoticeUserRead.unread == True, *sa_filters)
@@ -412,10 +469,15 @@ class NoticeLogic:
         notice.notice_dept = depts
         notice.notice_role = roles
         notice.file = file
+        # 关联的附件和正文中引用的附件不再是临时附件
+        await AttachmentLogic.mark_used(db, ids=[item.id for item in file])
+        await AttachmentLogic.mark_used_in(db, data.get("message"))
         if action == "create":
             db.add(notice)
         await db.commit()
         data["id"] = notice.id
+        # 后台写入目标用户的收件箱
+        InboxLogic.schedule(InboxLogic.fanout(notice.id))
         return data
 
     @classmethod
@@ -431,14 +493,13 @@ class NoticeLogic:
         async def _unread(
             request: Request, db: AsyncSession = Depends(self.get_session)
         ) -> ResponseBase:
-            # TODO 未读
-            filters = {"unread": True}
+            total = await InboxLogic.get_unread_count(db, request.user.id)
             data = {
                 "results": [
                     {"key": "1", "name": "layout.notice", "list": [], "total": 0},
                     {"key": "2", "name": "layout.announcement", "list": [], "total": 0},
                 ],
-                "total": 0,
+                "total": total,
             }
             return success_response(data)
 
@@ -2,6 +2,7 @@
 from .notice import Notice
 from .notice_dept import NoticeDept
 from .notice_file import NoticeFile
+from .notice_inbox import NoticeInbox
 from .notice_role import NoticeRole
 from .notice_user_read import NoticeUserRead
 from .notification import (
@@ -1,7 +1,7 @@
 from typing import Any, Optional, Union
 
 from pydantic import model_validator
-from sqlalchemy import JSON, TEXT, Boolean, String
+from sqlalchemy import JSON, TEXT, Boolean, Index, String
 from sqlmodel import Relationship
 
 from app.system.model import Attachment, Dept, Role, User
@@ -72,7 +72,10 @@ class NoticeBase(BaseMixin):
 
 class Notice(AuditMixin, NoticeBase, PKMixin, table=True):
     __tablename__ = "notifications_notice"
-    __table_args__ = ({"comment": "消息内容"},)
+    __table_args__ = (
+        Index("ix_notice_publish_type", "publish", "notice_type"),
+        {"comment": "消息内容"},
+    )
     file: list["Attachment"] = Relationship(
         link_model=NoticeFile,
         sa_relationship_kwargs=dict(
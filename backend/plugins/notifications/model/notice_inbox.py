@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import BigInteger, Boolean, Index
+
+from senweaver.db.models import Field, SQLModel
+
+
+class NoticeInbox(SQLModel, table=True):
+    """用户收件箱，消息发布时按目标用户展开，未读数直接按用户索引统计"""
+
+    __tablename__ = "notifications_notice_inbox"
+    __table_args__ = (
+        Index("ix_notice_inbox_owner_unread", "owner_id", "unread"),
+        Index("ix_notice_inbox_notice", "notice_id"),
+        {"comment": "消息收件箱"},
+    )
+    # 不设置外键，删除消息时由后台任务清理，避免大批量级联
+    owner_id: int = Field(primary_key=True, sa_type=BigInteger, title="用户ID")
+    notice_id: int = Field(primary_key=True, sa_type=BigInteger, title="消息ID")
+    unread: bool = Field(default=True, sa_type=Boolean, title="未读")
+    created_time: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc), title="创建时间"
+    )
@@ -1,13 +1,42 @@
 # -*- coding: utf-8 -*-
+import asyncio
 from pathlib import Path
 
 from fastapi import FastAPI
+
+from senweaver.logger import logger
 from senweaver.module.app import AppModule
 
 
 class NotificationsApp(AppModule):
+    async def on_backfill_data(self):
+        from senweaver.db.session import async_engine, create_redis_pool
+        from senweaver.middleware.db import SQLAlchemyASGIMiddleware
+
+        from .logic.inbox_logic import InboxLogic
+
+        # 命令行中没有运行应用，初始化 db() 的会话和未读数使用的 redis
+        SQLAlchemyASGIMiddleware(None, custom_engine=async_engine)
+        InboxLogic.redis = await create_redis_pool()
+        try:
+            total = await InboxLogic.backfill()
+        finally:
+            await InboxLogic.redis.close()
+            InboxLogic.redis = None
+            await async_engine.dispose()
+        logger.info(f"已补写 {total} 条收件箱记录")
+
     async def run(self):
-        pass
+        from app.system.logic.attachment_logic import AttachmentLogic
+
+        from .logic.inbox_logic import InboxLogic
+        from .model import Notice
+
+        # 清理附件时检查通知正文中引用的附件
+        AttachmentLogic.reference_texts.append(Notice.message)
+
+        # 订阅未读数变化并推送给在线用户
+        self.listen_task = asyncio.create_task(InboxLogic.listen())
 
 
 module = NotificationsApp(module_path=Path(__file__).parent, package=__package__)
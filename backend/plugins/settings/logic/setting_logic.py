@@ -4,19 +4,29 @@ from typing import Any, Optional, Union, get_args, get_origin
 import annotated_types
 from fastapi import Request
 from pydantic import BaseModel, EmailStr, HttpUrl, SecretStr
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from senweaver import SenweaverCRUD
+from app.system.logic.attachment_logic import AttachmentLogic
+from config.settings import settings
+from senweaver.auth.limiter import LoginLimit
 from senweaver.core.schemas import IFormItem
 from senweaver.db.models import Choices
 from senweaver.db.models.helper import get_choices_dict
+from senweaver.utils.cache import Snapshot, VersionedCache
 from senweaver.utils.pydantic import parse_annotation_type
 
-from ..core.schemas import ISettingData
+from ..core.schemas import ILoginLimitSet
 from ..model.setting import Setting
 
 
 class SettingLogic:
+    cache = VersionedCache(
+        "settings_setting",
+        tables=(Setting.__tablename__,),
+        check_interval=settings.CACHE_VERSION_INTERVAL,
+    )
+
     @classmethod
     def get_input_type(cls, field_type: Any, annotation_type: Any) -> str:
 
@@ -110,52 +120,85 @@ class SettingLogic:
             data.append(item)
         return data
 
+    @classmethod
+    async def get_snapshot(cls, db: AsyncSession) -> Snapshot:
+        """全部设置项一次加载为只读快照，设置表写入提交后失效"""
+
+        async def load() -> Snapshot:
+            result = await db.execute(select(Setting.name, Setting.value))
+            return Snapshot(dict(result.all()))
+
+        return await cls.cache.get_or_load("all", load)
+
+    @classmethod
+    async def get_settings(
+        cls, db: AsyncSession, model: type[BaseModel], default: Optional[dict] = None
+    ) -> BaseModel:
+        """读取类型化的设置，返回的实例在进程内共享，调用方不应修改"""
+        snapshot = await cls.get_snapshot(db)
+        return snapshot.to_model(model, default)
+
+    @classmethod
+    async def get_login_limit(cls, request: Request) -> LoginLimit:
+        """登录限制设置，时间由分钟转换为秒"""
+        data: ILoginLimitSet = await cls.get_settings(
+            request.auth.db.session, ILoginLimitSet
+        )
+        return LoginLimit(
+            user_count=data.SECURITY_LOGIN_LIMIT_COUNT,
+            user_time=data.SECURITY_LOGIN_LIMIT_TIME * 60,
+            ip_count=data.SECURITY_LOGIN_IP_LIMIT_COUNT,
+            ip_time=data.SECURITY_LOGIN_IP_LIMIT_TIME * 60,
+            white_list=tuple(data.SECURITY_LOGIN_IP_WHITE_LIST or ()),
+            black_list=tuple(data.SECURITY_LOGIN_IP_BLACK_LIST or ()),
+        )
+
     @classmethod
     async def get_model_list(
-        cls, request: Request, model: type[BaseModel], default: dict = {}
+        cls, request: Request, model: type[BaseModel], default: Optional[dict] = None
     ):
-        keys = list(model.model_fields.keys())
         db: AsyncSession = request.auth.db.session
-        crud = SenweaverCRUD(Setting)
-        result = await crud.get_multi(
-            db,
-            limit=None,
-            schema_to_select=ISettingData,
-            return_total_count=False,
-            name__in=keys,
-        )
-        list_data = result["data"]
-        data = {}
-        for item in list_data:
-            data[item["name"]] = item["value"]
-        default.update(data)
-        return model(**default)
+        return await cls.get_settings(db, model, default)
 
     @classmethod
     async def save(cls, request: Request, category: str, object: BaseModel):
         update_data = {}
-        import orjson
-
         updated_time = datetime.now(timezone.utc)
         if request and hasattr(request, "user"):
             update_data["modifier_id"] = request.user.id
             update_data["updated_time"] = updated_time
         creator_data = request.auth.get_creator_data(Setting)
         db: AsyncSession = request.auth.db.session
-        crud = SenweaverCRUD(Setting)
         object_data = object.model_dump(exclude_unset=True)
         model_class = type(object)
-
+        if not object_data:
+            return await cls.get_model_list(request, model_class)
+        # 一次查询已存在的设置项，再批量更新和插入
+        result = await db.execute(
+            select(Setting.id, Setting.name).where(Setting.name.in_(object_data))
+        )
+        existing: dict[str, list] = {}
+        for row in result.all():
+            existing.setdefault(row.name, []).append(row.id)
+        updates = []
+        creates = []
         for field_name, field_value in object_data.items():
             data = {"name": field_name, "value": field_value, "category": category}
             data.update(update_data)
-            db_instance = await crud.get(db, return_as_model=False, name=field_name)
-            if db_instance is None:
-                data.update(creator_data)
-                await crud.create(db, object=Setting(**data))
+            if field_name in existing:
+                updates.extend({**data, "id": pk} for pk in existing[field_name])
             else:
-                await crud.update(db, object=data, name=field_name)
-        return await cls.get_model_list(request, model_class)
+                data.update(creator_data)
+                creates.append(Setting(**data))
+        if updates:
+            await db.execute(update(Setting), updates)
+        if creates:
+            db.add_all(creates)
+        await AttachmentLogic.mark_used_in(db, object_data)
+        # 请求会话不会在结束时提交，提交后设置表变更事件使快照失效，再读取新的快照
+        await db.commit()
+        snapshot = await cls.get_snapshot(db)
+        return snapshot.to_model(model_class)
 
 
 setting_logic = SettingLogic()
@@ -2,12 +2,23 @@
 from pathlib import Path
 
 from fastapi import FastAPI
+
+from senweaver.auth.limiter import LoginLimiter
 from senweaver.module.app import AppModule
 
 
 class SettingsApp(AppModule):
     async def run(self):
-        pass
+        from app.system.logic.attachment_logic import AttachmentLogic
+
+        from .logic.setting_logic import SettingLogic
+        from .model.setting import Setting
+
+        # 清理附件时检查设置中引用的附件
+        AttachmentLogic.reference_texts.append(Setting.value)
+
+        # 登录限流使用后台设置的登录限制
+        LoginLimiter.limit_loader = SettingLogic.get_login_limit
 
 
 module = SettingsApp(module_path=Path(__file__).parent, package=__package__)
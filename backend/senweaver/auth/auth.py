@@ -18,6 +18,7 @@ from senweaver.auth.helper import (
     CaptchaHelperProtocol,
     DBSessionProtocolType,
 )
+from senweaver.auth.limiter import LoginLimiter
 from senweaver.auth.password import PasswordHelper, PasswordHelperProtocol
 from senweaver.auth.schemas import (
     IChangePassword,
@@ -48,6 +49,7 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
     crud: Optional[FastCRUD] = (None,)
     password_helper: Optional[PasswordHelperProtocol] = None
     captcha_helper: Optional[CaptchaHelperProtocol] = None
+    login_limiter: Optional[LoginLimiter] = None
     db: type[DBSessionProtocolType] = None
 
     def __init__(
@@ -59,6 +61,7 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
         password_helper: Optional[PasswordHelperProtocol] = None,
         crud: Optional[FastCRUD] = None,
         captcha_helper: Optional[CaptchaHelperProtocol] = None,
+        login_limiter: Optional[LoginLimiter] = None,
         db: type[DBSessionProtocolType] = None,
         header_name: str = "Authorization",
         cookie_name: str = "X-Token",
@@ -72,6 +75,7 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
         self.channel.auth = self
         self.password_helper = password_helper or PasswordHelper()
         self.captcha_helper = captcha_helper or CaptchaHelper()
+        self.login_limiter = login_limiter or LoginLimiter()
         self.crud = crud or FastCRUD(user_model)
         self.header_name = header_name
         self.cookie_name = cookie_name
@@ -91,6 +95,10 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
         conn.scope["user"] = user
         return user
 
+    async def get_token_claims(self, user: models.UserProtocolType) -> dict[str, Any]:
+        """写入 access token 的附加内容"""
+        return {}
+
     async def get_user(
         self, db: AsyncSession = None, **kwargs: Any
     ) -> Optional[Union[dict, BaseModel]]:
@@ -138,6 +146,8 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
             data = await self.manager.create_token(request, request.user)
             return data, "已登录"
 
+        # 限流和锁定在验证码、查询用户、校验密码之前检查
+        attempt = await self.login_limiter.check(request, param.username)
         if captcha_enabled:
             await self.captcha_helper.check_captcha(
                 request=request,
@@ -151,6 +161,7 @@ class Auth(AuthProtocol, Generic[models.UserProtocolType, models.ID]):
         valid, _ = self.password_helper.verify_and_update(password, user.password)
         if not valid:
             raise CustomException("密码错误")
+        await self.login_limiter.clear_failure(request, param.username, attempt)
         client = await parse_client_info(request)
         # 登录日志
         log = ILoginLog(
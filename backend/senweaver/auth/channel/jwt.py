@@ -41,9 +41,10 @@ class JWTChannel(
     def decode_key(self) -> SecretType:
         return self.public_key or self.secret
 
-    async def read_token(
+    def decode_token(
         self, token: Optional[str], token_type: TokenTypeEnum = TokenTypeEnum.access
-    ) -> Optional[models.UserProtocolType]:
+    ) -> Optional[dict]:
+        """校验签名、过期时间和类型，返回 token 的内容"""
         if token is None:
             return None
         try:
@@ -62,6 +63,15 @@ class JWTChannel(
                 return None
         except jwt.PyJWTError:
             return None
+        return payload
+
+    async def read_token(
+        self, token: Optional[str], token_type: TokenTypeEnum = TokenTypeEnum.access
+    ) -> Optional[models.UserProtocolType]:
+        payload = self.decode_token(token, token_type)
+        if payload is None:
+            return None
+        user_id = payload["sub"]
         try:
             parsed_id = self.auth.parse_id(user_id)
             # 判断是否在黑名单里
@@ -81,7 +91,7 @@ class JWTChannel(
         user: models.UserProtocolType,
         expires_delta: timedelta = None,
         token_type: TokenTypeEnum = TokenTypeEnum.access,
-        **kwargs
+        **kwargs,
     ) -> tuple[str, datetime]:
         if expires_delta:
             expire = datetime.now(timezone.utc) + expires_delta
@@ -29,3 +29,5 @@ SENWEAVER_SCOPE_TYPE = "__senweaver_scope_type__"
 SENWEAVER_SCOPES = "__senweaver_scopes__"
 SENWEAVER_CHECK_DATA_SCOPE = "__senweaver_check_data_scope__"
 SENWEAVER_CHECK_FIELD_SCOPE = "__senweaver_check_field_scope__"
+SENWEAVER_PERMISSION_SET = "__senweaver_permission_set__"
+SENWEAVER_ACCESS_TOKEN = "__senweaver_access_token__"
@@ -1,4 +1,6 @@
+import asyncio
 import uuid
+from collections import deque
 from datetime import timedelta
 from typing import Any, Generic, Optional, Protocol, TypeVar, Union
 
@@ -63,11 +65,55 @@ class CaptchaHelperProtocol(Protocol):
 
 
 class CaptchaHelper(CaptchaHelperProtocol):
+    """
+    图片验证码。
+
+    CAPTCHA_POOL_SIZE 大于 0 时在后台预先生成验证码，请求时直接取出，
+    每个验证码只使用一次；数量低于 CAPTCHA_POOL_LOW_WATER 时后台补充，
+    池为空时在请求中生成
+    """
+
+    def __init__(self):
+        self.pool: deque[tuple[str, str]] = deque()
+        self.refill_event = asyncio.Event()
+        self.refill_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def render(cls) -> tuple[str, str]:
+        captcha_image, code = img_captcha(img_byte="base64")
+        return f"data:image/png;base64,{captcha_image}", code
+
+    async def refill(self):
+        """补充验证码池，每次在线程池中生成一个，避免占用过多线程"""
+        while True:
+            await self.refill_event.wait()
+            self.refill_event.clear()
+            try:
+                while len(self.pool) < settings.CAPTCHA_POOL_SIZE:
+                    self.pool.append(await run_in_threadpool(self.render))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"生成验证码失败，错误信息：{e}")
+                await asyncio.sleep(1)
+
+    def take(self) -> Optional[tuple[str, str]]:
+        if settings.CAPTCHA_POOL_SIZE <= 0:
+            return None
+        if self.refill_task is None or self.refill_task.done():
+            self.refill_task = asyncio.create_task(self.refill())
+        item = self.pool.popleft() if self.pool else None
+        if len(self.pool) <= settings.CAPTCHA_POOL_LOW_WATER:
+            self.refill_event.set()
+        return item
 
     async def get_captcha(self, request: Request):
         if not settings.CAPTCHA_ENABLE:
             raise BadRequestException("captcha is disabled")
-        captcha_image, code = await run_in_threadpool(img_captcha, img_byte="base64")
+        item = self.take()
+        if item is None:
+            item = await run_in_threadpool(self.render)
+        captcha_image, code = item
         redis: Redis = request.app.state.redis
         captcha_key = str(uuid.uuid4())
         await redis.set(
@@ -77,7 +123,7 @@ class CaptchaHelper(CaptchaHelperProtocol):
         )
         return dict(
             captcha_key=captcha_key,
-            captcha_image=f"data:image/png;base64,{captcha_image}",
+            captcha_image=captcha_image,
             length=len(code),
         )
 
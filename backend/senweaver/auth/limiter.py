@@ -0,0 +1,319 @@
+import ipaddress
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from secrets import token_hex
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Sequence
+
+from fastapi import Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from senweaver.exception.http_exception import (
+    ForbiddenException,
+    TooManyRequestsException,
+)
+from senweaver.logger import logger
+
+AUTH_LOGIN_LIMIT_PREFIX = "senweaver:login_limit:"
+
+# 检查锁定并记录一次尝试，返回 {IP 锁定毫秒数, 用户锁定毫秒数, 尝试过多需等待毫秒数}，
+# 均为 0 表示允许。允许的尝试先计为失败，登录成功后再移除，
+# 并发的尝试不会在失败记录写入前全部通过
+# KEYS: IP 锁定、用户锁定、IP 尝试记录、IP 失败记录、用户失败记录
+# ARGV: 当前毫秒、记录成员、尝试窗口毫秒、窗口内最多尝试次数、
+#       IP 窗口毫秒、IP 失败次数、用户窗口毫秒、用户失败次数
+CHECK_SCRIPT = """
+local ip_ttl = redis.call('PTTL', KEYS[1])
+local user_ttl = redis.call('PTTL', KEYS[2])
+if ip_ttl > 0 or user_ttl > 0 then
+    return {math.max(ip_ttl, 0), math.max(user_ttl, 0), 0}
+end
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now - window)
+if redis.call('ZCARD', KEYS[3]) >= tonumber(ARGV[4]) then
+    local oldest = redis.call('ZRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+    return {0, 0, math.max(tonumber(oldest[2]) + window - now, 1)}
+end
+local result = {0, 0, 0}
+for i = 1, 2 do
+    local key = KEYS[i + 3]
+    window = tonumber(ARGV[i * 2 + 3])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[i * 2 + 4]) then
+        redis.call('SET', KEYS[i], 1, 'PX', window)
+        redis.call('DEL', key)
+        result[i] = window
+    end
+end
+if result[1] > 0 or result[2] > 0 then
+    return result
+end
+redis.call('ZADD', KEYS[3], now, ARGV[2])
+redis.call('PEXPIRE', KEYS[3], ARGV[3])
+for i = 1, 2 do
+    redis.call('ZADD', KEYS[i + 3], now, ARGV[2])
+    redis.call('PEXPIRE', KEYS[i + 3], ARGV[i * 2 + 3])
+end
+return result
+"""
+
+
+class LoginLimit(NamedTuple):
+    user_count: int
+    user_time: int  # 用户失败次数的统计窗口和锁定时间，单位：秒
+    ip_count: int
+    ip_time: int  # IP 失败次数的统计窗口和锁定时间，单位：秒
+    white_list: tuple[str, ...] = ()
+    black_list: tuple[str, ...] = ()
+
+
+@lru_cache(maxsize=64)
+def parse_ip_rules(rules: tuple[str, ...]) -> tuple[bool, list]:
+    """解析 IP 名单，支持 *、单个地址、网段和 a-b 范围，返回 (是否匹配全部, 范围列表)"""
+    ranges = []
+    for rule in rules:
+        rule = rule.strip()
+        if rule == "*":
+            return True, []
+        try:
+            if "/" in rule:
+                network = ipaddress.ip_network(rule, strict=False)
+                ranges.append((network[0], network[-1]))
+            elif "-" in rule:
+                start, end = rule.split("-", 1)
+                ranges.append(
+                    (
+                        ipaddress.ip_address(start.strip()),
+                        ipaddress.ip_address(end.strip()),
+                    )
+                )
+            elif rule:
+                address = ipaddress.ip_address(rule)
+                ranges.append((address, address))
+        except ValueError:
+            logger.warning(f"无效的 IP 规则：{rule}")
+    return False, ranges
+
+
+def match_ip(ip: str, rules: Sequence[str]) -> bool:
+    if not rules:
+        return False
+    match_all, ranges = parse_ip_rules(tuple(rules))
+    if match_all:
+        return True
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(
+        start.version == address.version and start <= address <= end
+        for start, end in ranges
+    )
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    限流使用的客户端 IP，默认为连接的对端地址。
+
+    对端是受信任的代理时，从右向左跳过代理地址取 X-Forwarded-For 中的客户端，
+    最左侧的地址可以由客户端伪造
+    """
+    ip = request.client.host if request.client else ""
+    proxies = settings.LOGIN_TRUSTED_PROXIES
+    if not match_ip(ip, proxies):
+        return ip
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        for hop in reversed(forwarded.split(",")):
+            hop = hop.strip()
+            if hop and not match_ip(hop, proxies):
+                return hop
+    return request.headers.get("X-Real-IP", "").strip() or ip
+
+
+class TokenBucket:
+    """进程内令牌桶，超过 maxsize 个 key 时淘汰最久未使用的"""
+
+    def __init__(self, rate: float, burst: int, maxsize: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def acquire(self, key: str) -> bool:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.maxsize:
+                self.buckets.popitem(last=False)
+            bucket = self.buckets[key] = [float(self.burst), now]
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+
+class LoginLimiter:
+    """
+    登录限流，在查询用户和校验密码之前执行。
+
+    - 进程内：已知的锁定状态和按 IP 的令牌桶，拒绝时不访问 redis
+    - 集群内：redis 脚本按 IP 统计尝试次数，按 IP、用户名统计失败次数并锁定，
+      每次检查一次往返
+    - redis 不可用时只使用进程内的限制
+    """
+
+    # 读取登录限制的函数，返回 None 时使用配置文件中的值，可由设置模块替换
+    limit_loader: Optional[Callable[[Request], Awaitable[Optional[LoginLimit]]]] = None
+
+    def __init__(self):
+        self.bucket = TokenBucket(
+            settings.LOGIN_RATE, settings.LOGIN_BURST, settings.LOGIN_LIMIT_CACHE_SIZE
+        )
+        # key -> (解除时间, 是否因失败次数锁定)
+        self.locks: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self.scripts: dict[int, Any] = {}
+
+    @classmethod
+    def get_default_limit(cls) -> LoginLimit:
+        return LoginLimit(
+            user_count=settings.LOGIN_USER_LIMIT_COUNT,
+            user_time=settings.LOGIN_USER_LIMIT_TIME,
+            ip_count=settings.LOGIN_IP_LIMIT_COUNT,
+            ip_time=settings.LOGIN_IP_LIMIT_TIME,
+        )
+
+    async def get_limit(self, request: Request) -> LoginLimit:
+        if self.limit_loader is not None:
+            try:
+                limit = await self.limit_loader(request)
+                if limit is not None:
+                    return limit
+            except Exception as e:
+                logger.warning(f"读取登录限制失败，使用默认配置，错误信息：{e}")
+        return self.get_default_limit()
+
+    def get_script(self, redis: Redis):
+        script = self.scripts.get(id(redis))
+        if script is None:
+            script = redis.register_script(CHECK_SCRIPT)
+            self.scripts = {id(redis): script}
+        return script
+
+    def get_keys(self, ip: str, username: str) -> tuple[str, str]:
+        return f"ip:{ip}", f"user:{username}"
+
+    def check_lock(self, key: str, now: float):
+        lock = self.locks.get(key)
+        if lock is None:
+            return
+        if lock[0] <= now:
+            del self.locks[key]
+            return
+        self.reject(lock[0] - now, lock[1])
+
+    def set_lock(self, key: str, milliseconds: int, locked: bool = True):
+        if milliseconds <= 0:
+            return
+        if key not in self.locks and len(self.locks) >= settings.LOGIN_LIMIT_CACHE_SIZE:
+            self.locks.popitem(last=False)
+        self.locks[key] = (time.monotonic() + milliseconds / 1000, locked)
+
+    def reject(self, seconds: float, locked: bool = True):
+        retry_after = max(1, int(seconds + 0.999))
+        if locked:
+            minutes = max(1, int(retry_after / 60 + 0.999))
+            detail = f"登录失败次数过多，请 {minutes} 分钟后重试"
+        else:
+            detail = "登录尝试过于频繁，请稍后重试"
+        raise TooManyRequestsException(detail, retry_after=retry_after)
+
+    async def check(self, request: Request, username: str) -> Optional[str]:
+        """
+        登录前检查，被限制时抛出 TooManyRequestsException。
+
+        返回本次尝试的标识，登录成功后传给 `clear_failure`，
+        未调用 `clear_failure` 的尝试按失败计数
+        """
+        if not settings.LOGIN_LIMIT_ENABLE:
+            return None
+        ip = get_client_ip(request)
+        ip_key, user_key = self.get_keys(ip, username)
+        now = time.monotonic()
+        self.check_lock(ip_key, now)
+        self.check_lock(user_key, now)
+        limit = await self.get_limit(request)
+        if match_ip(ip, limit.black_list):
+            raise ForbiddenException("当前 IP 禁止登录")
+        if match_ip(ip, limit.white_list):
+            return None
+        if not self.bucket.acquire(ip):
+            self.reject(1 / settings.LOGIN_RATE if settings.LOGIN_RATE else 1, False)
+        redis: Optional[Redis] = getattr(request.app.state, "redis", None)
+        if redis is None:
+            return None
+        attempt = token_hex(8)
+        try:
+            ip_ttl, user_ttl, wait = await self.get_script(redis)(
+                keys=[
+                    f"{AUTH_LOGIN_LIMIT_PREFIX}lock:{ip_key}",
+                    f"{AUTH_LOGIN_LIMIT_PREFIX}lock:{user_key}",
+                    f"{AUTH_LOGIN_LIMIT_PREFIX}attempt:{ip_key}",
+                    f"{AUTH_LOGIN_LIMIT_PREFIX}failure:{ip_key}",
+                    f"{AUTH_LOGIN_LIMIT_PREFIX}failure:{user_key}",
+                ],
+                args=[
+                    int(time.time() * 1000),
+                    attempt,
+                    settings.LOGIN_IP_RATE_TIME * 1000,
+                    settings.LOGIN_IP_RATE_COUNT,
+                    limit.ip_time * 1000,
+                    limit.ip_count,
+                    limit.user_time * 1000,
+                    limit.user_count,
+                ],
+            )
+        except RedisError as e:
+            logger.warning(f"登录限流检查失败，错误信息：{e}")
+            return None
+        if ip_ttl or user_ttl:
+            self.set_lock(ip_key, ip_ttl)
+            self.set_lock(user_key, user_ttl)
+            self.reject(max(ip_ttl, user_ttl) / 1000)
+        if wait:
+            # 尝试过多的 IP 在等待期间同样不再访问 redis
+            self.set_lock(ip_key, wait, False)
+            self.reject(wait / 1000, False)
+        return attempt
+
+    async def clear_failure(
+        self,
+        request: Request,
+        username: str,
+        attempt: Optional[str],
+        reset: bool = True,
+    ):
+        """移除本次尝试的失败记录，reset 时清除用户名的全部失败次数"""
+        if attempt is None:
+            return
+        redis: Optional[Redis] = getattr(request.app.state, "redis", None)
+        if redis is None:
+            return
+        ip_key, user_key = self.get_keys(get_client_ip(request), username)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zrem(f"{AUTH_LOGIN_LIMIT_PREFIX}failure:{ip_key}", attempt)
+                if reset:
+                    pipe.delete(f"{AUTH_LOGIN_LIMIT_PREFIX}failure:{user_key}")
+                else:
+                    pipe.zrem(f"{AUTH_LOGIN_LIMIT_PREFIX}failure:{user_key}", attempt)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"清除登录失败次数失败，错误信息：{e}")
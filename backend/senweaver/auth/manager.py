@@ -4,12 +4,17 @@ from typing import Generic, Optional
 from config.settings import settings
 from fastapi import FastAPI, Request
 from fastapi.security.utils import get_authorization_scheme_param
+from fastapi.staticfiles import StaticFiles
 from starlette.authentication import AuthenticationBackend
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.requests import HTTPConnection
+from starlette.routing import Mount
+from starlette.types import Message, Receive, Scope, Send
 
 from senweaver.auth import models
 from senweaver.auth.auth import Auth
+from senweaver.auth.constants import SENWEAVER_ACCESS_TOKEN
 from senweaver.auth.helper import AuthManagerProtocol
 from senweaver.auth.schemas import IToken
 from senweaver.constants import TokenTypeEnum
@@ -19,6 +24,25 @@ from senweaver.utils.globals import g
 from .router import AuthRouter
 
 
+class TokenAuthenticationMiddleware(AuthenticationMiddleware):
+    """认证时换发的 access token 通过响应头返回给客户端"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                token = scope.get(SENWEAVER_ACCESS_TOKEN)
+                if token:
+                    headers = MutableHeaders(scope=message)
+                    headers[settings.TOKEN_ACCESS_HEADER] = token
+            await send(message)
+
+        await super().__call__(scope, receive, send_wrapper)
+
+
 class AuthManager(
     AuthenticationBackend,
     Module,
@@ -27,6 +51,7 @@ class AuthManager(
 ):
     app: FastAPI
     auth_router: Optional[AuthRouter] = None
+    anonymous_paths: Optional[tuple[str, ...]] = None
 
     def __init__(self, module_path: Path, package: str):
         self.auth_router = self.auth_router or AuthRouter(route_class=self.route_class)
@@ -35,7 +60,7 @@ class AuthManager(
 
     def start(self, app: FastAPI):
         self.app = app
-        self.app.add_middleware(AuthenticationMiddleware, backend=self)
+        self.app.add_middleware(TokenAuthenticationMiddleware, backend=self)
         self.auth_router.add_routes()
         self.app.include_router(self.auth_router.router)
         self.ready = True
@@ -43,6 +68,20 @@ class AuthManager(
     async def create_superuser(self, username: str, password: str, email: str):
         pass
 
+    def get_anonymous_paths(self) -> tuple[str, ...]:
+        """静态文件路径，无需解析当前用户"""
+        if self.anonymous_paths is None:
+            paths = [f"{settings.UPLOAD_PUBLIC_URL}/"]
+            for route in self.app.routes:
+                if (
+                    isinstance(route, Mount)
+                    and isinstance(route.app, StaticFiles)
+                    and route.path != settings.UPLOAD_URL
+                ):
+                    paths.append(f"{route.path}/")
+            self.anonymous_paths = tuple(paths)
+        return self.anonymous_paths
+
     async def get_auth(self, conn: Optional[HTTPConnection] = None):
         raise NotImplementedError()  # pragma: no cover
 
@@ -60,7 +99,7 @@ class AuthManager(
     ) -> IToken:
         auth: Auth = request.auth
         access_token, access_token_expires = await auth.channel.write_token(
-            user, token_type=TokenTypeEnum.access
+            user, token_type=TokenTypeEnum.access, **await auth.get_token_claims(user)
         )
         refresh_token, refresh_token_expires = await auth.channel.write_token(
             user, token_type=TokenTypeEnum.refresh
@@ -84,6 +123,8 @@ class AuthManager(
                 g.user = user
                 return auth, user
         g.request = Request(conn.scope)
+        if conn.url.path.startswith(self.get_anonymous_paths()):
+            return auth, None
         user = await auth.get_current_user(conn)
         g.user = user
         return auth, user
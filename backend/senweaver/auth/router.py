@@ -182,6 +182,7 @@ class AuthRouter:
             temp_token = await request.app.state.redis.get(f"{cache_key}")
             if item.token != temp_token:
                 raise CustomException("临时Token校验失败，请重新登录")
+            attempt = await auth.login_limiter.check(request, item.target)
             # 验证验证码
             if settings.CAPTCHA_ENABLE:
                 check_captcha = await auth.captcha_helper.check_captcha(
@@ -193,6 +194,10 @@ class AuthRouter:
             user = await auth.get_user(is_active=True, username=item.target)
             if not user:
                 return error_response("用户不存在", code=1001)
+            # 只确认了用户存在，不清除用户名之前的失败次数
+            await auth.login_limiter.clear_failure(
+                request, item.target, attempt, reset=False
+            )
             code = generate_string(6)
             cache_data = {
                 "target": item.target,
@@ -78,6 +78,7 @@ class IClient(BaseModel):
     country: Optional[str] = ""
     region: Optional[str] = ""
     city: Optional[str] = ""
+    enriched: bool = True
 
 
 class ILoginLog(BaseModel):
@@ -101,4 +102,4 @@ class IOperationLog(BaseModel):
     opera_time: datetime
     response_code: int
     status_code: int
-    response_result: dict | None = None
+    response_result: dict | str | None = None
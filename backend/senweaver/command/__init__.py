@@ -5,13 +5,14 @@ from .helper import create_module, get_tables
 
 def register_commands(app):
     """Register all CLI commands from modules."""
-    from senweaver.command.core import create, createsuperuser, crud, data
+    from senweaver.command.core import create, createsuperuser, crud, data, openapi
 
     # Register each command module
     create.concole(app)
     crud.concole(app)
     data.concole(app)
     createsuperuser.concole(app)
+    openapi.concole(app)
 
 
 __all__ = ['create_module', 'get_tables', 'register_commands']
@@ -44,6 +44,13 @@ def init(module: str = typer.Option(None, '--module', '-m', help='module name'))
     load_module('plugins', module)
 
 
+@sub_app.command()
+def backfill(module: str = typer.Option(None, '--module', '-m', help='module name')):
+    """Backfill derived data (e.g. notice inboxes) for rows created before it existed."""
+    load_module('app', module, 'on_backfill_data')
+    load_module('plugins', module, 'on_backfill_data')
+
+
 @sub_app.command()
 def dump(module: str = typer.Option(None, '--module', '-m', help='module name')):
     load_module('app', module, 'on_dump_data')
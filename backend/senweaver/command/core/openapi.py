@@ -0,0 +1,23 @@
+import typer
+
+
+def concole(app: typer.Typer):
+    @app.command()
+    def openapi(
+        force: bool = typer.Option(
+            False, "--force", "-f", help="Regenerate even if the cached file matches."
+        ),
+    ):
+        """Generate the OpenAPI document into OPENAPI_CACHE_PATH."""
+        from senweaver.core.openapi import get_cache_file, load_openapi
+        from senweaver.server import create_app
+
+        document = load_openapi(create_app(), use_cache=not force)
+        path = get_cache_file(document.fingerprint)
+        if document.elapsed:
+            typer.echo(
+                f"OpenAPI generated in {document.elapsed:.3f}s, "
+                f"{len(document.content)} bytes: {path}"
+            )
+        else:
+            typer.echo(f"OpenAPI is up to date: {path}")
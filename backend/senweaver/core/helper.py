@@ -388,7 +388,8 @@ def _create_dynamic_filters(
 
     params = []
     for key, value in filter_config.filters.items():
-        column_type = column_types.get(key, inspect._empty)
+        # 带操作符的过滤条件（如 created_time__gte）使用字段本身的类型
+        column_type = column_types.get(key.rsplit("__", 1)[0], inspect._empty)
         alias_key = key
         if "." in key:
             key = key.replace(".", "_sw_dot_")
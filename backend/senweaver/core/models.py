@@ -11,6 +11,7 @@ from typing_extensions import Self
 from config.settings import IdTypeEnum, settings
 from senweaver.db import models
 from senweaver.db.models import ChoiceType, Field, IntegerChoices, SQLModel
+from senweaver.db.partition import is_native
 from senweaver.utils.snowflake import snowflake_id
 
 
@@ -80,6 +81,29 @@ class BaseMixin(SQLModel):
     )
 
 
+class TimePartitionMixin(SQLModel):
+    """按创建时间原生分区的表，分区键需要包含在表的主键中"""
+
+    created_time: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        primary_key=True,
+        nullable=False,
+        title="创建时间",
+    )
+
+
+class NoPartitionMixin(SQLModel):
+    pass
+
+
+# 日志表是否使用原生分区，不支持分区的数据库按时间范围清理
+LOG_PARTITIONED = settings.LOG_PARTITION_ENABLED and is_native(settings.DATABASE_URL)
+LogPartitionMixin = TimePartitionMixin if LOG_PARTITIONED else NoPartitionMixin
+LOG_PARTITION_ARGS = (
+    {"postgresql_partition_by": "RANGE (created_time)"} if LOG_PARTITIONED else {}
+)
+
+
 class AuditMixin(SQLModel):
     creator_id: Optional[int] = Field(
         title="创建人ID", default=None, nullable=True, index=True, sa_type=BigInteger
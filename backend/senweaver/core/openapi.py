@@ -0,0 +1,145 @@
+import gzip
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import orjson
+from fastapi import FastAPI, Request, Response, status
+from fastapi.routing import APIRoute
+from starlette.routing import Route
+
+from config.settings import settings
+from senweaver.logger import logger
+from senweaver.module.manager import module_manager
+from senweaver.utils.response import is_not_modified
+
+
+class OpenAPIDocument(NamedTuple):
+    fingerprint: str
+    modules: frozenset[str]
+    etag: str
+    content: bytes
+    gzip_content: Optional[bytes]
+    elapsed: float  # 生成耗时，从缓存文件读取时为 0，单位：秒
+
+
+_document: Optional[OpenAPIDocument] = None
+
+
+def get_fingerprint(app: FastAPI) -> str:
+    """文档只在模块集合、版本或路由变化时重新生成"""
+    parts = [app.title, app.version, app.openapi_version]
+    parts.extend(
+        sorted(
+            f"{name}:{getattr(module.settings, 'version', '')}"
+            for name, module in module_manager.modules.items()
+        )
+    )
+    parts.extend(
+        sorted(
+            f"{','.join(sorted(route.methods))} {route.path}"
+            for route in app.routes
+            if isinstance(route, APIRoute) and route.include_in_schema
+        )
+    )
+    return hashlib.blake2b(
+        "\n".join(parts).encode(), digest_size=8, usedforsecurity=False
+    ).hexdigest()
+
+
+def get_cache_file(fingerprint: str) -> Path:
+    return settings.OPENAPI_CACHE_PATH / f"openapi.{fingerprint}.json"
+
+
+def generate_openapi(app: FastAPI) -> tuple[bytes, float]:
+    """生成并编码文档，返回 (内容, 耗时)，不保留生成的字典"""
+    started = time.perf_counter()
+    app.openapi_schema = None
+    try:
+        content = orjson.dumps(app.openapi())
+    finally:
+        app.openapi_schema = None
+    return content, time.perf_counter() - started
+
+
+def write_cache_file(path: Path, content: bytes):
+    """写入临时文件后替换，并删除其他指纹的旧文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    for old_path in path.parent.glob("openapi.*.json"):
+        if old_path != path:
+            old_path.unlink(missing_ok=True)
+
+
+def load_openapi(app: FastAPI, use_cache: bool = True) -> OpenAPIDocument:
+    """读取指纹相同的缓存文件，没有时生成并写入，多个 worker 只需生成一次"""
+    global _document
+    fingerprint = get_fingerprint(app)
+    path = get_cache_file(fingerprint)
+    content = None
+    elapsed = 0.0
+    if use_cache:
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            pass
+    if content is None:
+        content, elapsed = generate_openapi(app)
+        logger.info(
+            f"OpenAPI 文档生成完成，耗时 {elapsed:.3f} 秒，大小 {len(content)} 字节"
+        )
+        try:
+            write_cache_file(path, content)
+        except OSError as e:
+            logger.warning(f"写入 OpenAPI 文档缓存失败：{path}，错误信息：{e}")
+    gzip_content = None
+    if settings.OPENAPI_GZIP:
+        gzip_content = gzip.compress(content, compresslevel=9, mtime=0)
+    etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    _document = OpenAPIDocument(
+        fingerprint,
+        frozenset(module_manager.modules),
+        etag,
+        content,
+        gzip_content,
+        elapsed,
+    )
+    return _document
+
+
+async def openapi_endpoint(request: Request) -> Response:
+    document = _document
+    # 启用或停用模块后重新读取
+    if document is None or document.modules != module_manager.modules.keys():
+        document = load_openapi(request.app)
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if is_not_modified(request, document.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    content = document.content
+    if document.gzip_content and "gzip" in request.headers.get("accept-encoding", ""):
+        content = document.gzip_content
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def register_openapi(app: FastAPI):
+    """使用预先编码的文档替换 FastAPI 默认的 openapi 路由"""
+    if not app.openapi_url:
+        return
+    for index, route in enumerate(app.router.routes):
+        if isinstance(route, Route) and route.path == app.openapi_url:
+            app.router.routes[index] = Route(
+                app.openapi_url, openapi_endpoint, include_in_schema=False
+            )
+            break
@@ -1,17 +1,33 @@
 from asyncio import create_task
 from datetime import datetime, timezone
-from typing import Any, Callable, Coroutine, Dict
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Coroutine, Dict, Union
 
 import orjson
 from fastapi import Request, Response, UploadFile, status
 from fastapi.routing import APIRoute
+from config.settings import settings
 from senweaver.auth.schemas import IClient, IOperationLog
 from senweaver.exception.http_exception import BaseCustomException, CustomException
-from senweaver.utils.data import DataSanitizer
+from senweaver.utils.data import DataSanitizer, PayloadCodec
 from senweaver.utils.request import get_request_trace_id, parse_client_info
 
 
 class SenweaverRoute(APIRoute):
+    # 不记录内容的响应类型
+    skip_media_types: tuple[str, ...] = (
+        "application/octet-stream",
+        "application/pdf",
+        "application/zip",
+        "application/x-",
+        "application/vnd.",
+        "text/event-stream",
+        "image/",
+        "audio/",
+        "video/",
+        "font/",
+        "multipart/",
+    )
+
     def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
         original_route_handler = super().get_route_handler()
 
@@ -38,33 +54,58 @@ class SenweaverRoute(APIRoute):
                 response_code = status_code
                 response_except = e
             end_time = datetime.now(timezone.utc)
-            cost_time = (end_time - start_time).total_seconds() * 1000.0
             request_data = await self._collect_request_data(request)
             _route = request.scope.get("route")
             client: IClient = await parse_client_info(request)
-            response_data = await self._collect_response_data(
-                response, status_code, response_code
-            )
-            try:
-                log = IOperationLog(
-                    trace_id=get_request_trace_id(request),
-                    method=request.method,
-                    title=getattr(_route, "summary", None) or "",
-                    path=request.url.path,
-                    client=client,
-                    request_data=request_data,
-                    response_code=response_data["code"],
-                    cost_time=cost_time,
-                    opera_time=start_time,
-                    status_code=response_data["status_code"],
-                    response_result=response_data["body"],
+
+            def add_log(response_data: Dict[str, Any], end_time: datetime):
+                try:
+                    log = IOperationLog(
+                        trace_id=get_request_trace_id(request),
+                        method=request.method,
+                        title=getattr(_route, "summary", None) or "",
+                        path=request.url.path,
+                        client=client,
+                        request_data=request_data,
+                        response_code=response_data["code"],
+                        cost_time=(end_time - start_time).total_seconds() * 1000.0,
+                        opera_time=start_time,
+                        status_code=response_data["status_code"],
+                        response_result=response_data["body"],
+                    )
+                    if hasattr(request, "user") and request.user is not None:
+                        log.user_id = request.user.id
+                        log.username = request.user.username
+                    create_task(request.auth.add_oper_log(log=log))
+                except Exception as e:
+                    pass
+
+            if response is not None and hasattr(response, "body_iterator"):
+                # 流式响应边转发边记录，发送完成后再写日志
+                if self._is_binary(response):
+                    add_log(
+                        self._skipped_response_data(response, response_code), end_time
+                    )
+                else:
+
+                    def on_finish(body: bytes, size: int):
+                        add_log(
+                            self._parse_response_data(
+                                body, size, response.status_code, response_code
+                            ),
+                            datetime.now(timezone.utc),
+                        )
+
+                    response.body_iterator = self._tee_body_iterator(
+                        response.body_iterator, on_finish
+                    )
+            else:
+                add_log(
+                    await self._collect_response_data(
+                        response, status_code, response_code
+                    ),
+                    end_time,
                 )
-                if hasattr(request, "user") and request.user is not None:
-                    log.user_id = request.user.id
-                    log.username = request.user.username
-                create_task(request.auth.add_oper_log(log=log))
-            except Exception as e:
-                pass
             if response_except is not None:
                 raise response_except
             return response
@@ -107,27 +148,71 @@ class SenweaverRoute(APIRoute):
         data["body"] = DataSanitizer.sanitize(data["body"])
         return data
 
-    async def _collect_response_data(
-        self, response: Response, status_code: int, response_code: int
+    def _is_binary(self, response: Response) -> bool:
+        """二进制、事件流或附件下载的响应不记录内容"""
+        media_type = (response.headers.get("content-type") or "").lower()
+        if media_type.startswith(self.skip_media_types):
+            return True
+        disposition = response.headers.get("content-disposition") or ""
+        return disposition.lower().startswith("attachment")
+
+    def _skipped_response_data(
+        self, response: Response, response_code: int
     ) -> Dict[str, Any]:
-        if response is None:
-            return {"status_code": status_code, "code": response_code, "body": {}}
-        body = b""
-        if hasattr(response, "body"):
-            body = response.body
-        elif hasattr(response, "body_iterator"):
-            async for chunk in response.body_iterator:
-                body += chunk
-            response = Response(content=body, status_code=response.status_code)
+        return {
+            "status_code": response.status_code,
+            "code": response_code,
+            "body": {"media_type": response.headers.get("content-type")},
+        }
+
+    async def _tee_body_iterator(
+        self,
+        body_iterator: AsyncIterable[Union[str, bytes]],
+        on_finish: Callable[[bytes, int], None],
+    ) -> AsyncIterator[Union[str, bytes]]:
+        """原样转发响应内容，只保留前 LOG_RESPONSE_CAPTURE_SIZE 字节用于日志"""
+        limit = settings.LOG_RESPONSE_CAPTURE_SIZE
+        captured = bytearray()
+        size = 0
         try:
-            body = orjson.loads(body.decode())
-            response_code = body.get("code", response_code)
-        except:
-            body = body.decode("utf-8", errors="replace")
-            response_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            async for chunk in body_iterator:
+                data = chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+                size += len(data)
+                if len(captured) < limit:
+                    captured += data[: limit - len(captured)]
+                yield chunk
+        finally:
+            # 客户端断开时同样记录已发送的部分
+            on_finish(bytes(captured), size)
 
+    def _parse_response_data(
+        self, body: bytes, size: int, status_code: int, response_code: int
+    ) -> Dict[str, Any]:
+        if size > len(body):
+            body = PayloadCodec.truncate(body, len(body), size)
+        else:
+            try:
+                data = orjson.loads(body)
+                if isinstance(data, dict):
+                    response_code = data.get("code", response_code)
+                return {"status_code": status_code, "code": response_code, "body": data}
+            except orjson.JSONDecodeError:
+                pass
         return {
-            "status_code": response.status_code,
+            "status_code": status_code,
             "code": response_code,
-            "body": body,
+            "body": body.decode("utf-8", errors="replace"),
         }
+
+    async def _collect_response_data(
+        self, response: Response, status_code: int, response_code: int
+    ) -> Dict[str, Any]:
+        if response is None:
+            return {"status_code": status_code, "code": response_code, "body": {}}
+        if self._is_binary(response) or not hasattr(response, "body"):
+            return self._skipped_response_data(response, response_code)
+        body = bytes(response.body)
+        limit = settings.LOG_RESPONSE_CAPTURE_SIZE
+        return self._parse_response_data(
+            body[:limit], len(body), response.status_code, response_code
+        )
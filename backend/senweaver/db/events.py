@@ -0,0 +1,89 @@
+"""
+Table change notifications.
+
+Collects the tables written by a session (unit of work flushes and ORM
+insert/update/delete statements) and calls the callbacks registered for
+those tables once the transaction has been committed.
+"""
+
+import asyncio
+import inspect
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from senweaver.logger import logger
+
+SESSION_CHANGED_KEY = "senweaver_changed_tables"
+
+_listeners: dict[str, list[Callable[[set[str]], Any]]] = defaultdict(list)
+_tasks: set[asyncio.Task] = set()
+
+
+def on_tables_changed(*tables: str) -> Callable:
+    """注册数据表变更回调，事务提交后以变更的表名集合调用，支持异步函数"""
+
+    def decorator(func: Callable[[set[str]], Any]) -> Callable[[set[str]], Any]:
+        for table in tables:
+            if func not in _listeners[table]:
+                _listeners[table].append(func)
+        return func
+
+    return decorator
+
+
+def _changed_tables(session: Session) -> set[str]:
+    return session.info.setdefault(SESSION_CHANGED_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush(session: Session, flush_context):
+    tables = _changed_tables(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table in _listeners:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_execute(state: ORMExecuteState):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name in _listeners:
+        _changed_tables(state.session).add(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(SESSION_CHANGED_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session: Session):
+    tables = session.info.pop(SESSION_CHANGED_KEY, None)
+    if not tables:
+        return
+    callbacks = []
+    for table in tables:
+        for callback in _listeners.get(table, ()):
+            if callback not in callbacks:
+                callbacks.append(callback)
+    for callback in callbacks:
+        try:
+            result = callback(tables)
+        except Exception as e:
+            logger.error(f"数据表变更回调执行失败：{e}")
+            continue
+        if inspect.iscoroutine(result):
+            try:
+                task = asyncio.get_running_loop().create_task(result)
+            except RuntimeError:
+                result.close()
+                continue
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
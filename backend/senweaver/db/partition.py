@@ -0,0 +1,278 @@
+"""
+Time-range table partitions.
+
+PostgreSQL tables are declared with native range partitions and MySQL
+tables are converted to RANGE COLUMNS partitions on first use. Databases
+without partitioning (SQLite) treat each period as a logical range that
+is expired with a range delete. Backends are looked up by dialect name
+and can be replaced with `register_backend`.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Table, delete, func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+INTERVALS = ("day", "week", "month")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: Optional[datetime]  # None 表示没有下限
+    end: Optional[datetime]  # None 表示没有上限
+
+
+def period_floor(value: datetime, interval: str) -> datetime:
+    """所在周期的开始时间，统一为不带时区的 UTC 时间"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        return value.replace(day=1)
+    if interval == "week":
+        return value - timedelta(days=value.weekday())
+    if interval == "day":
+        return value
+    raise ValueError(f"Invalid partition interval: {interval}")
+
+
+def period_shift(start: datetime, interval: str, count: int = 1) -> datetime:
+    """向后（count 为负数时向前）移动若干个周期"""
+    if interval == "month":
+        month = start.month - 1 + count
+        return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+    if interval == "week":
+        return start + timedelta(weeks=count)
+    if interval == "day":
+        return start + timedelta(days=count)
+    raise ValueError(f"Invalid partition interval: {interval}")
+
+
+def format_bound(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class PartitionBackend:
+    """按时间范围分区的表，子类实现具体数据库的分区管理"""
+
+    native = True
+
+    def __init__(self, table: Table, column: str = "created_time", interval="month"):
+        if interval not in INTERVALS:
+            raise ValueError(f"Invalid partition interval: {interval}")
+        self.table = table
+        self.column = table.c[column]
+        self.interval = interval
+
+    def partition_name(self, start: datetime) -> str:
+        return f"{self.table.name}_p{start:%Y%m%d}"
+
+    def parse_start(self, name: str) -> Optional[datetime]:
+        match = re.fullmatch(rf"{re.escape(self.table.name)}_p(\d{{8}})", name)
+        return datetime.strptime(match.group(1), "%Y%m%d") if match else None
+
+    def quote(self, conn: AsyncConnection, name: str) -> str:
+        return conn.dialect.identifier_preparer.quote(name)
+
+    def where(self, partition: Partition) -> list:
+        """分区对应的查询条件，原生分区的数据库据此只扫描该分区"""
+        conditions = []
+        if partition.start is not None:
+            conditions.append(self.column >= partition.start)
+        if partition.end is not None:
+            conditions.append(self.column < partition.end)
+        return conditions
+
+    async def ensure(self, conn: AsyncConnection, starts: list[datetime]):
+        """创建指定周期的分区"""
+        raise NotImplementedError
+
+    async def get_partitions(self, conn: AsyncConnection) -> list[Partition]:
+        raise NotImplementedError
+
+    async def drop(self, conn: AsyncConnection, partition: Partition):
+        raise NotImplementedError
+
+
+class PostgresPartitionBackend(PartitionBackend):
+    """PostgreSQL 声明式分区，建表时由 `postgresql_partition_by` 指定分区键"""
+
+    async def ensure(self, conn: AsyncConnection, starts: list[datetime]):
+        table = self.quote(conn, self.table.name)
+        # 兜底分区，避免分区未及时创建时写入失败
+        await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS "
+                f"{self.quote(conn, f'{self.table.name}_default')} "
+                f"PARTITION OF {table} DEFAULT"
+            )
+        )
+        for start in starts:
+            end = period_shift(start, self.interval)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS "
+                    f"{self.quote(conn, self.partition_name(start))} "
+                    f"PARTITION OF {table} FOR VALUES FROM "
+                    f"('{format_bound(start)}') TO ('{format_bound(end)}')"
+                )
+            )
+
+    async def get_partitions(self, conn: AsyncConnection) -> list[Partition]:
+        result = await conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": self.table.name},
+        )
+        partitions = []
+        for (name,) in result.all():
+            start = self.parse_start(name)
+            if start is not None:
+                partitions.append(
+                    Partition(name, start, period_shift(start, self.interval))
+                )
+        return sorted(partitions, key=lambda item: item.start)
+
+    async def drop(self, conn: AsyncConnection, partition: Partition):
+        await conn.execute(
+            text(f"DROP TABLE IF EXISTS {self.quote(conn, partition.name)}")
+        )
+
+
+class MySQLPartitionBackend(PartitionBackend):
+    """MySQL RANGE COLUMNS 分区，首次使用时转换已有的表，历史数据放入 p_history"""
+
+    HISTORY = "p_history"
+    FUTURE = "p_future"
+
+    def partition_name(self, start: datetime) -> str:
+        return f"p{start:%Y%m%d}"
+
+    def parse_start(self, name: str) -> Optional[datetime]:
+        match = re.fullmatch(r"p(\d{8})", name)
+        return datetime.strptime(match.group(1), "%Y%m%d") if match else None
+
+    def definitions(self, starts: list[datetime]) -> str:
+        items = [
+            f"PARTITION {self.partition_name(start)} VALUES LESS THAN "
+            f"('{format_bound(period_shift(start, self.interval))}')"
+            for start in starts
+        ]
+        items.append(f"PARTITION {self.FUTURE} VALUES LESS THAN (MAXVALUE)")
+        return ", ".join(items)
+
+    async def ensure(self, conn: AsyncConnection, starts: list[datetime]):
+        if not starts:
+            return
+        table = self.quote(conn, self.table.name)
+        partitions = await self.get_partitions(conn)
+        if not partitions:
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS"
+                    f"({self.quote(conn, self.column.name)}) ("
+                    f"PARTITION {self.HISTORY} VALUES LESS THAN "
+                    f"('{format_bound(starts[0])}'), {self.definitions(starts)})"
+                )
+            )
+            return
+        last = max(
+            (item.start for item in partitions if item.start is not None),
+            default=None,
+        )
+        missing = [start for start in starts if last is None or start > last]
+        if missing:
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {table} REORGANIZE PARTITION {self.FUTURE} "
+                    f"INTO ({self.definitions(missing)})"
+                )
+            )
+
+    async def get_partitions(self, conn: AsyncConnection) -> list[Partition]:
+        result = await conn.execute(
+            text(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+                "FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_NAME IS NOT NULL"
+            ),
+            {"table": self.table.name},
+        )
+        partitions = []
+        for name, description in result.all():
+            if name == self.HISTORY:
+                end = datetime.strptime(description.strip("'"), "%Y-%m-%d %H:%M:%S")
+                partitions.append(Partition(name, None, end))
+            elif name == self.FUTURE:
+                partitions.append(Partition(name, None, None))
+            elif (start := self.parse_start(name)) is not None:
+                partitions.append(
+                    Partition(name, start, period_shift(start, self.interval))
+                )
+        return partitions
+
+    async def drop(self, conn: AsyncConnection, partition: Partition):
+        await conn.execute(
+            text(
+                f"ALTER TABLE {self.quote(conn, self.table.name)} "
+                f"DROP PARTITION {partition.name}"
+            )
+        )
+
+
+class RangePartitionBackend(PartitionBackend):
+    """不支持分区的数据库，每个周期是一个逻辑范围，过期时按范围删除"""
+
+    native = False
+
+    async def ensure(self, conn: AsyncConnection, starts: list[datetime]):
+        pass
+
+    async def get_partitions(self, conn: AsyncConnection) -> list[Partition]:
+        first = await conn.scalar(select(func.min(self.column)))
+        if first is None:
+            return []
+        if isinstance(first, str):
+            first = datetime.fromisoformat(first)
+        start = period_floor(first, self.interval)
+        current = period_floor(datetime.now(timezone.utc), self.interval)
+        partitions = []
+        while start <= current:
+            end = period_shift(start, self.interval)
+            partitions.append(Partition(self.partition_name(start), start, end))
+            start = end
+        return partitions
+
+    async def drop(self, conn: AsyncConnection, partition: Partition):
+        await conn.execute(delete(self.table).where(*self.where(partition)))
+
+
+_backends: dict[str, type[PartitionBackend]] = {
+    "postgresql": PostgresPartitionBackend,
+    "mysql": MySQLPartitionBackend,
+    "mariadb": MySQLPartitionBackend,
+}
+
+
+def is_native(url: str) -> bool:
+    """数据库是否支持原生分区，原生分区要求分区键包含在主键中"""
+    return _backends.get(make_url(url).get_backend_name(), RangePartitionBackend).native
+
+
+def register_backend(dialect: str, backend: type[PartitionBackend]):
+    _backends[dialect] = backend
+
+
+def get_backend(
+    dialect: str, table: Table, column: str = "created_time", interval: str = "month"
+) -> PartitionBackend:
+    backend = _backends.get(dialect, RangePartitionBackend)
+    return backend(table, column, interval)
@@ -0,0 +1,83 @@
+import time
+from bisect import bisect_left
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config.settings import settings
+from senweaver.logger import logger
+
+# 等待连接耗时分布的区间上限，单位：秒
+WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """连接池等待统计"""
+
+    __slots__ = ("waiters", "max_waiters", "timeouts", "wait_count", "wait_buckets")
+
+    def __init__(self):
+        self.waiters = 0
+        self.max_waiters = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_buckets = [0] * (len(WAIT_TIME_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.wait_count += 1
+        self.wait_buckets[bisect_left(WAIT_TIME_BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        histogram = {
+            f"le_{bucket}": count
+            for bucket, count in zip(WAIT_TIME_BUCKETS, self.wait_buckets)
+        }
+        histogram["le_inf"] = self.wait_buckets[-1]
+        return {
+            "waiters": self.waiters,
+            "max_waiters": self.max_waiters,
+            "timeouts": self.timeouts,
+            "wait_count": self.wait_count,
+            "wait_time_histogram": histogram,
+        }
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """记录等待连接数量、等待耗时和超时次数的连接池"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "MonitoredQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        stats = self.stats
+        stats.waiters += 1
+        stats.max_waiters = max(stats.max_waiters, stats.waiters)
+        if stats.waiters == settings.POOL_WAITERS_WARNING + 1:
+            logger.warning(
+                f"数据库连接池等待数超过 {settings.POOL_WAITERS_WARNING}：{self.status()}"
+            )
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.waiters -= 1
+            stats.observe(time.perf_counter() - start)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            **self.stats.to_dict(),
+        }
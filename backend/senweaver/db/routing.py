@@ -0,0 +1,59 @@
+"""
+Read replica routing for the request session.
+
+SELECT statements go to a replica engine unless the session has already
+written in this request, the statement locks rows, or the endpoint is
+decorated with `use_primary`.
+"""
+
+import functools
+import random
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from senweaver.db.session import async_engine, replica_engines
+
+SESSION_PRIMARY_KEY = "senweaver_primary"
+
+_use_primary: ContextVar[bool] = ContextVar("_use_primary", default=False)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any) -> Engine:
+        if (
+            replica_engines
+            and not self._flushing
+            and not self.info.get(SESSION_PRIMARY_KEY)
+            and not _use_primary.get()
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return random.choice(replica_engines).sync_engine
+        if self._flushing or not isinstance(clause, Select):
+            # 写入后本次请求剩余的查询都使用主库，保证读到自己的写入
+            self.info[SESSION_PRIMARY_KEY] = True
+        return async_engine.sync_engine
+
+
+def get_session_args() -> dict[str, Any]:
+    if not replica_engines:
+        return {}
+    return {"sync_session_class": RoutingSession}
+
+
+def use_primary(func: Callable) -> Callable:
+    """强制接口内的查询使用主库"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _use_primary.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _use_primary.reset(token)
+
+    return wrapper
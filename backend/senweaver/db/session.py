@@ -5,13 +5,51 @@ import redis.asyncio as aioredis
 from fastapi import Request
 from redis.asyncio import Redis, RedisError
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config.settings import settings
+from senweaver.db.pool import MonitoredQueuePool
 from senweaver.logger import logger
 
-async_engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+
+def create_db_engine(db_url: Optional[str] = None, **kwargs) -> AsyncEngine:
+    """根据配置创建异步引擎，应用和命令行共用同一个连接池"""
+    url = make_url(db_url or settings.DATABASE_URL)
+    engine_args = {"echo": settings.DATABASE_ECHO, "future": True}
+    if not settings.POOL_ENABLE:
+        engine_args["poolclass"] = NullPool
+    elif url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        engine_args["poolclass"] = StaticPool
+    else:
+        engine_args.update(
+            poolclass=MonitoredQueuePool,
+            pool_size=settings.POOL_SIZE,
+            max_overflow=settings.POOL_MAX_OVERFLOW,
+            pool_timeout=settings.POOL_TIMEOUT,
+            pool_recycle=settings.POOL_RECYCLE,
+            pool_pre_ping=settings.POOL_PRE_PING,
+        )
+    if url.get_driver_name() == "asyncpg":
+        engine_args["connect_args"] = {
+            "statement_cache_size": settings.POOL_STATEMENT_CACHE_SIZE
+        }
+    engine_args.update(kwargs)
+    return create_async_engine(url, **engine_args)
+
+
+def get_pool_stats(engine: Optional[AsyncEngine] = None) -> dict:
+    pool = (engine or async_engine).pool
+    if isinstance(pool, MonitoredQueuePool):
+        return pool.get_stats()
+    return {"pool": pool.status()}
+
+
+async_engine = create_db_engine()
+# 只读副本，配置后查询语句路由到副本
+replica_engines = [create_db_engine(url) for url in settings.DATABASE_REPLICA_URLS]
 
 async_session_maker = async_sessionmaker(
     bind=async_engine, class_=AsyncSession, expire_on_commit=False
@@ -28,7 +66,7 @@ def create_engine_by_url(db_url: Optional[str] = None) -> Union[Engine, AsyncEng
         return async_engine
     try:
         # 尝试创建异步 AsyncEngine
-        return create_async_engine(db_url, echo=False, future=True)
+        return create_db_engine(db_url)
     except Exception as e:
         print(f"Failed to create asynchronous engine: {e}")
         # 尝试创建同步 Engine
@@ -27,7 +27,9 @@ def register_exception(app: FastAPI):
                 code=exc.status_code,
                 detail=exc.detail,
             )
-        return ORJSONResponse(content=content, status_code=exc.status_code)
+        return ORJSONResponse(
+            content=content, status_code=exc.status_code, headers=exc.headers
+        )
 
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
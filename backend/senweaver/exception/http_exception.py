@@ -86,3 +86,16 @@ class InvalidIDException(CustomException):
             status_code=status.HTTP_400_BAD_REQUEST,
             code=status.HTTP_400_BAD_REQUEST,
         )
+
+
+class TooManyRequestsException(CustomException):
+    def __init__(
+        self, detail: Union[str, None] = None, retry_after: Union[int, None] = None
+    ):
+        super().__init__(
+            detail=detail if detail is not None else "Too many requests",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            code=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(retry_after)}
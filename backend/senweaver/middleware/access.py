@@ -3,19 +3,33 @@ from fastapi import Request, Response
 from senweaver.exception.http_exception import ForbiddenException
 from senweaver.utils.request import get_request_trace_id
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def check_access(request: Request):
+    get_request_trace_id(request)
+    path = request.scope.get("path")
+    if (
+        settings.DEMO_MODE
+        and request.method not in ["GET", "OPTIONS"]
+        and (request.method, path) not in settings.DEMO_MODE_WHITE_ROUTES
+    ):
+        raise ForbiddenException("演示环境，禁止操作")
 
 
 class AccessMiddleware(BaseHTTPMiddleware):
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
     ) -> Response:
-        get_request_trace_id(request)
-        path = request.scope.get("path")
-        if (
-            settings.DEMO_MODE
-            and request.method not in ["GET", "OPTIONS"]
-            and (request.method, path) not in settings.DEMO_MODE_WHITE_ROUTES
-        ):
-            raise ForbiddenException("演示环境，禁止操作")
-
+        check_access(request)
         return await call_next(request)
+
+
+class AccessASGIMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            check_access(Request(scope))
+        await self.app(scope, receive, send)
@@ -7,25 +7,85 @@ Reference: https://github.com/h0rn3t/fastapi-async-sqlalchemy
 from contextvars import ContextVar
 from typing import Dict, Optional, Union
 
+from sqlalchemy import event
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 try:
     from sqlalchemy.ext.asyncio import async_sessionmaker
 except ImportError:
     from sqlalchemy.orm import sessionmaker as async_sessionmaker
 
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_session_used(session: Session, transaction, connection):
+    # A connection has been checked out of the pool for this session.
+    session.info["senweaver_used"] = True
+
+
+class LazySession:
+    """Holds the session of a `db()` context, created on first access."""
+
+    __slots__ = ("session", "session_args", "closed")
+
+    def __init__(self, session_args: Dict):
+        self.session: Optional[AsyncSession] = None
+        self.session_args = session_args
+        self.closed = False
+
+
+class SessionStats:
+    """Counts `db()` contexts and how many of them touched the pool."""
+
+    __slots__ = ("total", "used")
+
+    def __init__(self):
+        self.total = 0
+        self.used = 0
+
+    @property
+    def unused(self) -> int:
+        return self.total - self.used
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"total": self.total, "used": self.used, "unused": self.unused}
+
 
 def create_middleware_and_session_proxy():
     _Session: Optional[async_sessionmaker] = None
     # Usage of context vars inside closures is not recommended, since they are not properly
     # garbage collected, but in our use case context var is created on program startup and
     # is used throughout the whole its lifecycle.
-    _session: ContextVar[Optional[AsyncSession]] = ContextVar("_session", default=None)
+    _session: ContextVar[Optional[LazySession]] = ContextVar("_session", default=None)
+    _stats = SessionStats()
+
+    def init_session(
+        db_url: Optional[Union[str, URL]] = None,
+        custom_engine: Optional[Engine] = None,
+        engine_args: Dict = None,
+        session_args: Dict = None,
+    ):
+        engine_args = engine_args or {}
+        session_args = session_args or {}
+
+        if not custom_engine and not db_url:
+            raise ValueError("You need to pass a db_url or a custom_engine parameter.")
+        if not custom_engine:
+            engine = create_async_engine(db_url, **engine_args)
+        else:
+            engine = custom_engine
+
+        nonlocal _Session
+        _Session = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False, **session_args
+        )
 
     class SQLAlchemyMiddleware(BaseHTTPMiddleware):
         def __init__(
@@ -39,70 +99,126 @@ def create_middleware_and_session_proxy():
         ):
             super().__init__(app)
             self.commit_on_exit = commit_on_exit
-            engine_args = engine_args or {}
-            session_args = session_args or {}
-
-            if not custom_engine and not db_url:
-                raise ValueError(
-                    "You need to pass a db_url or a custom_engine parameter."
-                )
-            if not custom_engine:
-                engine = create_async_engine(db_url, **engine_args)
-            else:
-                engine = custom_engine
-
-            nonlocal _Session
-            _Session = async_sessionmaker(
-                engine, class_=AsyncSession, expire_on_commit=False, **session_args
-            )
+            init_session(db_url, custom_engine, engine_args, session_args)
 
         async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
-            async with DBSession(commit_on_exit=self.commit_on_exit):
+            async with DBSession(
+                commit_on_exit=self.commit_on_exit,
+                read_only=request.method in READ_ONLY_METHODS,
+            ):
                 return await call_next(request)
 
+    class SQLAlchemyASGIMiddleware:
+        """
+        Pure ASGI variant of SQLAlchemyMiddleware.
+
+        The session stays open until the response body has been sent, so streaming
+        responses can still use it, and no extra task is spawned per request.
+        """
+
+        def __init__(
+            self,
+            app: ASGIApp,
+            db_url: Optional[Union[str, URL]] = None,
+            custom_engine: Optional[Engine] = None,
+            engine_args: Dict = None,
+            session_args: Dict = None,
+            commit_on_exit: bool = False,
+        ):
+            self.app = app
+            self.commit_on_exit = commit_on_exit
+            init_session(db_url, custom_engine, engine_args, session_args)
+
+        async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+            if scope["type"] != "http":
+                await self.app(scope, receive, send)
+                return
+            async with DBSession(
+                commit_on_exit=self.commit_on_exit,
+                read_only=scope["method"] in READ_ONLY_METHODS,
+            ):
+                await self.app(scope, receive, send)
+
     class DBSessionMeta(type):
         @property
         def session(self) -> AsyncSession:
-            """Return an instance of Session local to the current async context."""
+            """
+            Return an instance of Session local to the current async context.
+
+            The session is created on first access, a pooled connection is only
+            checked out once it executes a statement.
+            """
             if _Session is None:
                 raise SessionNotInitialisedError
-            session = _session.get()
-            if session is None:
+            lazy_session = _session.get()
+            if lazy_session is None or lazy_session.closed:
                 raise MissingSessionError
+            if lazy_session.session is None:
+                lazy_session.session = _Session(**lazy_session.session_args)
+            return lazy_session.session
 
-            return session
+        @property
+        def stats(self) -> SessionStats:
+            return _stats
 
     class DBSession(metaclass=DBSessionMeta):
-        def __init__(self, session_args: Dict = None, commit_on_exit: bool = False):
+        def __init__(
+            self,
+            session_args: Dict = None,
+            commit_on_exit: bool = False,
+            read_only: bool = False,
+        ):
             self.token = None
             self.session_args = session_args or {}
             self.commit_on_exit = commit_on_exit
+            self.read_only = read_only
+            if read_only:
+                # Read-only contexts never flush or commit on exit.
+                self.session_args.setdefault("autoflush", False)
 
         async def __aenter__(self):
             if not isinstance(_Session, async_sessionmaker):
                 raise SessionNotInitialisedError
 
-            self.token = _session.set(_Session(**self.session_args))  # type: ignore
+            self.token = _session.set(LazySession(self.session_args))
             return type(self)
 
         async def __aexit__(self, exc_type, exc_value, traceback):
-            session = _session.get()
+            lazy_session = _session.get()
+            lazy_session.closed = True
+            session = lazy_session.session
+            _stats.total += 1
+            if session is None:
+                _session.reset(self.token)
+                return
 
             try:
-                if exc_type is not None:
+                if not (
+                    session.in_transaction()
+                    or session.new
+                    or session.dirty
+                    or session.deleted
+                ):
+                    # Session was never used, nothing to commit or roll back.
+                    pass
+                elif exc_type is not None:
                     await session.rollback()
                 elif (
-                    self.commit_on_exit
+                    self.commit_on_exit and not self.read_only
                 ):  # Note: Changed this to elif to avoid commit after rollback
                     await session.commit()
             finally:
+                if session.info.get("senweaver_used"):
+                    _stats.used += 1
                 await session.close()
                 _session.reset(self.token)
 
-    return SQLAlchemyMiddleware, DBSession
+    return SQLAlchemyMiddleware, SQLAlchemyASGIMiddleware, DBSession
 
 
-SQLAlchemyMiddleware, db = create_middleware_and_session_proxy()
+SQLAlchemyMiddleware, SQLAlchemyASGIMiddleware, db = (
+    create_middleware_and_session_proxy()
+)
 
 
 class MissingSessionError(Exception):
@@ -2,30 +2,44 @@ import re
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from config.settings import settings
 from senweaver.exception.http_exception import ForbiddenException
 
 
+async def check_file_access(request: Request):
+    if request.method != "GET" or not request.url.path.startswith(
+        f"{settings.UPLOAD_URL}/"
+    ):
+        return
+    path = request.url.path
+    if (
+        not re.match(r"^[\w\-\u4e00-\u9fff\/]+(\.[a-zA-Z0-9]+)?$", path)
+        or "/./" in path
+        or "//" in path
+    ):
+        raise ForbiddenException("Invalid path")
+    if request.url.path.startswith(f"{settings.UPLOAD_PUBLIC_URL}/"):
+        # 公开文件访问
+        return
+    # 判断文件访问权限
+    await request.auth.check_file_permission(request)
+
+
 class FileMiddleware(BaseHTTPMiddleware):
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
     ) -> Response:
-        if request.method != "GET" or not request.url.path.startswith(
-            f"{settings.UPLOAD_URL}/"
-        ):
-            return await call_next(request)
-        path = request.url.path
-        if (
-            not re.match(r"^[\w\-\u4e00-\u9fff\/]+(\.[a-zA-Z0-9]+)?$", path)
-            or "/./" in path
-            or "//" in path
-        ):
-            raise ForbiddenException("Invalid path")
-        if request.url.path.startswith(f"{settings.UPLOAD_PUBLIC_URL}/"):
-            # 公开文件访问
-            return await call_next(request)
-        # 判断文件访问权限
-        await request.auth.check_file_permission(request)
-
+        await check_file_access(request)
         return await call_next(request)
+
+
+class FileASGIMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            await check_file_access(Request(scope))
+        await self.app(scope, receive, send)
@@ -13,14 +13,18 @@ from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_limiter import FastAPILimiter
 from fastapi_offline import FastAPIOffline
-from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from senweaver.db.session import create_redis_pool
+from senweaver.db.routing import get_session_args
+from senweaver.core.openapi import load_openapi, register_openapi
+from senweaver.db.session import async_engine, create_redis_pool, replica_engines
 from senweaver.exception.exception_handler import register_exception
-from senweaver.middleware.access import AccessMiddleware
-from senweaver.middleware.db import SQLAlchemyMiddleware
+from senweaver.middleware.access import AccessASGIMiddleware, AccessMiddleware
+from senweaver.middleware.db import SQLAlchemyASGIMiddleware, SQLAlchemyMiddleware
+from senweaver.middleware.file import FileASGIMiddleware, FileMiddleware
 from senweaver.module.manager import module_manager
-from senweaver.utils.globals import GlobalsMiddleware, g
+from senweaver.utils.cache import VersionedCache
+from senweaver.utils.globals import GlobalsASGIMiddleware, GlobalsMiddleware, g
+from senweaver.utils.image import shutdown_executor
 from senweaver.utils.request import get_request_identifier
 
 
@@ -29,6 +33,7 @@ async def lifespan(app: FastAPI):
     # Startup
     redis_client = await create_redis_pool()
     app.state.redis = redis_client
+    VersionedCache.init(redis_client)
 
     # cache
     FastAPICache.init(
@@ -42,6 +47,8 @@ async def lifespan(app: FastAPI):
         identifier=get_request_identifier,
     )
     await module_manager.run()
+    if settings.OPENAPI_URL and settings.OPENAPI_PRECOMPUTE:
+        load_openapi(app)
     yield
     # shutdown
     await FastAPICache.clear()
@@ -49,6 +56,10 @@ async def lifespan(app: FastAPI):
     await FastAPILimiter.close()
     # close redis
     await redis_client.close()
+    await async_engine.dispose()
+    for engine in replica_engines:
+        await engine.dispose()
+    shutdown_executor()
     g.cleanup()
     gc.collect()
 
@@ -104,6 +115,8 @@ def create_app(*args: Any, **kwargs: Any):
     app_startup(app)
     plugin_startup(app)
 
+    register_openapi(app)
+
     return app
 
 
@@ -114,31 +127,28 @@ def register_middleware(app: FastAPI):
 
         app.add_middleware(GZipMiddleware)
 
-    from senweaver.middleware.file import FileMiddleware
+    # 纯 ASGI 中间件，关闭后使用 BaseHTTPMiddleware 实现
+    if settings.MIDDLEWARE_ASGI:
+        file_middleware = FileASGIMiddleware
+        db_middleware = SQLAlchemyASGIMiddleware
+        globals_middleware = GlobalsASGIMiddleware
+        access_middleware = AccessASGIMiddleware
+    else:
+        file_middleware = FileMiddleware
+        db_middleware = SQLAlchemyMiddleware
+        globals_middleware = GlobalsMiddleware
+        access_middleware = AccessMiddleware
 
-    app.add_middleware(FileMiddleware)
+    app.add_middleware(file_middleware)
 
     # JWT auth,required
     module_manager.auth_module.start(app)
 
     app.add_middleware(
-        SQLAlchemyMiddleware,
-        db_url=str(settings.DATABASE_URL),
-        engine_args={
-            "echo": True,  # 打印SQL语句
-            "future": True,
-            "poolclass": (
-                NullPool
-                if settings.ENVIRONMENT == EnvironmentEnum.DEVELOPMENT
-                else AsyncAdaptedQueuePool
-            ),
-            "pool_pre_ping": True,
-            # "pool_size": settings.POOL_SIZE,
-            # "max_overflow": 64,
-        },
+        db_middleware, custom_engine=async_engine, session_args=get_session_args()
     )
-    app.add_middleware(GlobalsMiddleware)
-    app.add_middleware(AccessMiddleware)
+    app.add_middleware(globals_middleware)
+    app.add_middleware(access_middleware)
     # CORS
     if settings.CORS_ENABLE:
         origins = []
@@ -150,6 +160,7 @@ def register_middleware(app: FastAPI):
             allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
             allow_methods=settings.CORS_ALLOW_METHODS,
             allow_headers=settings.CORS_ALLOW_HEADERS,
+            expose_headers=[settings.TOKEN_ACCESS_HEADER],
         )
 
 
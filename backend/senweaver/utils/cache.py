@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+from pydantic import BaseModel
+from redis.asyncio import Redis, RedisError
+
+from config.settings import settings
+from senweaver.db.events import on_tables_changed
+from senweaver.logger import logger
+
+
+class VersionedCache:
+    """
+    进程内缓存，通过 redis 中的版本号在多个 worker 之间失效。
+
+    每次读取前调用 `sync` 比较版本号，版本变化时清空本地缓存；
+    指定 `tables` 后，相关数据表的写入事务提交时自动失效。
+    `check_interval` 大于 0 时，该间隔内不重复读取 redis 中的版本号。
+    """
+
+    redis: Optional[Redis] = None
+
+    def __init__(
+        self,
+        name: str,
+        tables: tuple[str, ...] = (),
+        maxsize: int = 256,
+        check_interval: float = 0,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self.checked_at = 0.0
+        self.version: Optional[str] = None
+        self.data: OrderedDict[str, Any] = OrderedDict()
+        if tables:
+            on_tables_changed(*tables)(self.on_changed)
+
+    @classmethod
+    def init(cls, redis: Redis):
+        cls.redis = redis
+
+    @property
+    def version_key(self) -> str:
+        return f"{settings.NAME.lower()}:version:{self.name}"
+
+    async def sync(self) -> str:
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < self.check_interval:
+            return self.version
+        version = None
+        if self.redis is not None:
+            try:
+                version = await self.redis.get(self.version_key)
+            except RedisError as e:
+                logger.warning(f"读取缓存版本失败：{e}")
+        version = str(version or 0)
+        if version != self.version:
+            self.data.clear()
+            self.version = version
+        self.checked_at = now
+        return version
+
+    def get(self, key: str) -> Any:
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any, version: str):
+        # 计算期间缓存已失效，丢弃旧版本的数据
+        if version != self.version:
+            return
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        version = await self.sync()
+        value = self.get(key)
+        if value is None:
+            value = await loader()
+            self.put(key, value, version)
+        return value
+
+    def clear(self):
+        self.data.clear()
+        self.version = None
+
+    async def invalidate(self):
+        self.clear()
+        if self.redis is not None:
+            try:
+                await self.redis.incr(self.version_key)
+            except RedisError as e:
+                logger.warning(f"更新缓存版本失败：{e}")
+
+    def on_changed(self, tables: set[str]):
+        # 先同步清空本进程的缓存，再异步更新版本号通知其他进程
+        self.clear()
+        return self.invalidate()
+
+
+class Snapshot:
+    """加载后只读的配置快照，按模型缓存类型化的结果"""
+
+    __slots__ = ("values", "models")
+
+    def __init__(self, values: Mapping[str, Any]):
+        self.values = MappingProxyType(dict(values))
+        self.models: dict[Any, BaseModel] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def to_model(
+        self, model: type[BaseModel], default: Optional[dict] = None
+    ) -> BaseModel:
+        """按模型字段取值并校验，结果在快照内复用，调用方不应修改"""
+        key = (model, repr(sorted(default.items()))) if default else model
+        instance = self.models.get(key)
+        if instance is None:
+            data = dict(default or {})
+            for name in model.model_fields:
+                if name in self.values:
+                    data[name] = self.values[name]
+            instance = self.models[key] = model(**data)
+        return instance
@@ -1,4 +1,10 @@
-from typing import Any
+import zlib
+from typing import Any, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 class DataSanitizer:
@@ -37,3 +43,45 @@ class DataSanitizer:
         ):
             return cls.MASK
         return value
+
+
+class PayloadCodec:
+    """日志内容的截断与压缩，压缩方式：none、zlib、zstd（需要安装 zstandard）"""
+
+    TRUNCATED_MARKER = "...[truncated, {size} bytes]"
+
+    @classmethod
+    def truncate(cls, data: bytes, limit: int, size: Optional[int] = None) -> bytes:
+        """
+        超过 limit 字节时截断并追加标记，截断位置对齐到完整的 UTF-8 字符，
+        data 只是内容的开头部分时通过 size 指定完整的字节数
+        """
+        size = len(data) if size is None else size
+        if limit <= 0 or size <= limit:
+            return data
+        text = data[:limit].decode("utf-8", errors="ignore")
+        return (text + cls.TRUNCATED_MARKER.format(size=size)).encode("utf-8")
+
+    @classmethod
+    def get_method(cls, method: str) -> str:
+        if method == "zstd" and zstandard is None:
+            return "zlib"
+        return method if method in ("zlib", "zstd") else "none"
+
+    @classmethod
+    def compress(cls, data: Optional[bytes], method: str) -> Optional[bytes]:
+        if data is None or method == "none":
+            return data
+        if method == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return zlib.compress(data, 6)
+
+    @classmethod
+    def decompress(cls, data: Optional[bytes], method: str) -> Optional[bytes]:
+        if data is None or method == "none":
+            return data
+        if method == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd payloads")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
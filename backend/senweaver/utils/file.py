@@ -0,0 +1,263 @@
+import io
+import os
+import time
+import zipfile
+from email.utils import parsedate_to_datetime
+from secrets import token_hex
+from typing import Iterable, Iterator, Mapping, NamedTuple, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+def read_range(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+class RangeFileResponse(FileResponse):
+    """
+    支持断点续传和协商缓存的文件响应。
+
+    - 单个或多个 Range 请求返回 206，多个范围使用 multipart/byteranges
+    - If-None-Match、If-Modified-Since 命中时返回 304
+    - 服务器支持 ASGI 的 pathsend、zerocopysend 扩展时由服务器通过 sendfile 发送，
+      否则在线程中按 chunk_size 读取
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        stat_result: Optional[os.stat_result] = None,
+        etag: Optional[str] = None,
+        content_disposition_type: str = "attachment",
+    ) -> None:
+        headers = dict(headers or {})
+        if etag:
+            headers.setdefault("etag", f'"{etag}"')
+        super().__init__(
+            path,
+            headers=headers,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat_result,
+            content_disposition_type=content_disposition_type,
+        )
+        self.extensions: Mapping[str, dict] = {}
+
+    def is_not_modified(self, headers: Headers) -> bool:
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = self.headers.get("etag", "").removeprefix("W/")
+            return any(
+                tag.strip().removeprefix("W/") in (etag, "*")
+                for tag in if_none_match.split(",")
+            )
+        if_modified_since = headers.get("if-modified-since")
+        last_modified = self.headers.get("last-modified")
+        if if_modified_since and last_modified:
+            try:
+                return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+                    if_modified_since
+                )
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+        self.extensions = scope.get("extensions") or {}
+        if scope["method"].upper() in ("GET", "HEAD") and self.is_not_modified(
+            Headers(scope=scope)
+        ):
+            headers = [
+                (key, value)
+                for key, value in self.raw_headers
+                if key in (b"etag", b"last-modified", b"cache-control", b"vary")
+            ]
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await super().__call__(scope, receive, send)
+
+    async def send_range(
+        self, send: Send, fd: int, start: int, end: int, more_body: bool
+    ) -> None:
+        if "http.response.zerocopysend" in self.extensions:
+            await send(
+                {
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": start,
+                    "count": end - start,
+                    "more_body": more_body,
+                }
+            )
+            return
+        while start < end:
+            chunk = await anyio.to_thread.run_sync(
+                read_range, fd, min(self.chunk_size, end - start), start
+            )
+            if not chunk:
+                break
+            start += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        if not more_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send_file(self, send: Send, ranges: list[tuple[int, int]], wrap=None):
+        fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+        try:
+            for start, end in ranges:
+                if wrap is None:
+                    await self.send_range(send, fd, start, end, False)
+                    continue
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": wrap(start, end),
+                        "more_body": True,
+                    }
+                )
+                await self.send_range(send, fd, start, end, True)
+                await send(
+                    {"type": "http.response.body", "body": b"\n", "more_body": True}
+                )
+        finally:
+            os.close(fd)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.pathsend" in self.extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            await self.send_file(send, [(0, self.stat_result.st_size)])
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send(
+            {"type": "http.response.start", "status": 206, "headers": self.raw_headers}
+        )
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self.send_file(send, [(start, end)])
+
+    async def _handle_multiple_ranges(
+        self,
+        send: Send,
+        ranges: list[tuple[int, int]],
+        file_size: int,
+        send_header_only: bool,
+    ) -> None:
+        boundary = token_hex(13)
+        content_length, header_generator = self.generate_multipart(
+            ranges, boundary, file_size, self.headers["content-type"]
+        )
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await send(
+            {"type": "http.response.start", "status": 206, "headers": self.raw_headers}
+        )
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await self.send_file(send, ranges, header_generator)
+        await send(
+            {
+                "type": "http.response.body",
+                # 每个范围后的换行已计入长度，结束分隔符前不再换行
+                "body": f"--{boundary}--\n".encode("latin-1"),
+                "more_body": False,
+            }
+        )
+
+
+class ZipStream(io.RawIOBase):
+    """
+    只写、不可 seek 的输出，zipfile 写入后由 `drain` 取出已生成的数据。
+
+    zipfile 检测到无法 seek 时为每个文件写数据描述符，
+    文件内容边读边压缩，不需要临时文件
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+class ZipEntry(NamedTuple):
+    path: str | os.PathLike[str]
+    arcname: str
+    compress: bool = True
+
+
+def iter_zip(entries: Iterable[ZipEntry], chunk_size: int = 1048576) -> Iterator[bytes]:
+    """
+    逐个文件生成 zip 数据，内存占用与文件数量、大小无关。
+
+    文件或偏移超过 4GB、条目超过 65535 个时由 zipfile 写入 ZIP64 扩展；
+    同步生成器，由 StreamingResponse 在线程池中迭代
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", allowZip64=True) as archive:
+        for entry in entries:
+            with open(entry.path, "rb") as file:
+                stat_result = os.fstat(file.fileno())
+                info = zipfile.ZipInfo(
+                    entry.arcname,
+                    date_time=time.localtime(max(stat_result.st_mtime, 315532800))[:6],
+                )
+                info.file_size = stat_result.st_size
+                info.external_attr = 0o644 << 16
+                info.compress_type = (
+                    zipfile.ZIP_DEFLATED if entry.compress else zipfile.ZIP_STORED
+                )
+                with archive.open(info, "w") as dest:
+                    while chunk := file.read(chunk_size):
+                        dest.write(chunk)
+                        if len(stream.buffer) >= chunk_size:
+                            yield stream.drain()
+    # 剩余的数据和结束时写入的中央目录
+    yield stream.drain()
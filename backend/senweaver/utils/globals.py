@@ -44,7 +44,7 @@ from typing import Any
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
 class Globals:
@@ -130,4 +130,20 @@ class GlobalsMiddleware(BaseHTTPMiddleware):  # noqa
         super().__init__(app, globals_middleware_dispatch)
 
 
+class GlobalsASGIMiddleware:
+    """
+    Pure ASGI middleware to setup the globals context.
+
+    ASGI servers run every request cycle in its own task, which already gets a
+    copy of the context, so values set on `g` stay local to the request and are
+    still visible while a streaming response body is produced.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+
+
 g = Globals()
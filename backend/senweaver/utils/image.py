@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+THUMBNAIL_FITS = ("contain", "cover", "fill")
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "png": "PNG"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """图片处理的进程池，首次使用时创建，spawn 方式避免复制主进程的事件循环和连接"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers or None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def render_thumbnail(
+    src: str,
+    dest: str,
+    width: int,
+    height: int,
+    fit: str = "contain",
+    format: str = "webp",
+    quality: int = 85,
+) -> int:
+    """
+    生成缩略图并写入 dest，返回文件大小，在进程池中执行。
+
+    width、height 为 0 表示不限制；contain 保持比例缩放到框内，
+    cover 保持比例裁剪填满，fill 拉伸到指定尺寸，均不放大原图
+    """
+    with Image.open(src) as image:
+        # JPEG 解码时直接按比例缩小，大图只解码需要的精度
+        image.draft("RGB", (width or image.width, height or image.height))
+        image = ImageOps.exif_transpose(image)
+        width = min(width or image.width, image.width)
+        height = min(height or image.height, image.height)
+        if fit == "cover":
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        elif fit == "fill":
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            image = ImageOps.contain(image, (width, height), Image.Resampling.LANCZOS)
+        if format == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        # 写入临时文件后替换，读取方不会看到未写完的文件
+        path = Path(dest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            image.save(
+                temp_path, THUMBNAIL_FORMATS[format], quality=quality, optimize=True
+            )
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+    return path.stat().st_size
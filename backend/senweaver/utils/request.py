@@ -1,5 +1,6 @@
 import base64
 import uuid
+from functools import lru_cache
 from typing import Optional, Union
 
 from config.settings import settings
@@ -40,36 +41,49 @@ def get_request_trace_id(request: Optional[Request] = None):
     return trace_uuid
 
 
-def parse_user_agent(request: Request) -> tuple[str, str, str, str]:
-    user_agent_string = request.headers.get("User-Agent")
+@lru_cache(maxsize=settings.USER_AGENT_CACHE_SIZE)
+def parse_user_agent_string(user_agent_string: str) -> tuple[str, str, str]:
+    """解析 User-Agent 字符串，按字符串缓存解析结果"""
     user_agent = parse(user_agent_string)
-    device = user_agent.get_device()
-    os = user_agent.get_os()
-    browser = user_agent.get_browser()
+    return user_agent.get_device(), user_agent.get_os(), user_agent.get_browser()
+
+
+def parse_user_agent(request: Request) -> tuple[str, str, str, str]:
+    user_agent_string = request.headers.get("User-Agent") or ""
+    device, os, browser = parse_user_agent_string(user_agent_string)
     return user_agent_string[:128], device, os, browser
 
 
+def parse_location(ip: str) -> tuple[str, str, str]:
+    country, region, city = None, None, None
+    location_info = get_location_offline(ip)
+    if isinstance(location_info, dict):
+        country = location_info.get("country")
+        region = location_info.get("regionName")
+        city = location_info.get("city")
+    return country, region, city
+
+
 async def parse_ip_info(request: Request) -> tuple[str, str, str, str]:
     country, region, city = None, None, None
     ip = get_request_ip(request)
     redis_client = request.app.state.redis
     location_prefix = "senweaver:ip:location"
     location_expire_seconds = 60 * 60 * 24 * 1  # 过期时间，单位：秒
-    location = await redis_client.get("{location_prefix}:{ip}")
+    location = await redis_client.get(f"{location_prefix}:{ip}")
     location_parse = "offline"  # online,offline
     if location:
         country, region, city = location.split(" ")
         return ip, country, region, city
     if location_parse == "online":
         location_info = await get_location_online(ip, request.headers.get("User-Agent"))
+        if location_info:
+            country = location_info.get("country")
+            region = location_info.get("regionName")
+            city = location_info.get("city")
     elif location_parse == "offline":
-        location_info = get_location_offline(ip)
-    else:
-        location_info = None
-    if location_info:
-        country = location_info.get("country")
-        region = location_info.get("regionName")
-        city = location_info.get("city")
+        country, region, city = parse_location(ip)
+    if country or region or city:
         await redis_client.set(
             f"{location_prefix}:{ip}",
             f"{country} {region} {city}",
@@ -78,10 +92,23 @@ async def parse_ip_info(request: Request) -> tuple[str, str, str, str]:
     return ip, country, region, city
 
 
+def get_raw_client(request: Request) -> IClient:
+    """仅采集原始 ip 和 User-Agent，解析交由后台任务完成"""
+    user_agent_string = request.headers.get("User-Agent") or ""
+    return IClient(
+        ip=get_request_ip(request),
+        user_agent=user_agent_string[:128],
+        enriched=False,
+    )
+
+
 async def parse_client_info(request: Request):
     try:
         if request.state and hasattr(request.state, "client"):
             return request.state.client
+        if settings.LOG_DEFERRED_ENRICH:
+            request.state.client = get_raw_client(request)
+            return request.state.client
         user_agent, device, os, browser = parse_user_agent(request)
         ip, country, region, city = await parse_ip_info(request)
         client = IClient(
@@ -3,7 +3,8 @@ from math import ceil
 from time import time
 from typing import Any, Generic, Optional, Sequence, TypeVar
 
-from fastapi import status
+import orjson
+from fastapi import Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field, field_serializer
 from pydantic.alias_generators import to_camel
 from senweaver.utils.request import get_request_trace_id
@@ -90,3 +91,30 @@ class PageResponse(ResponseBase[PageBase[T]], Generic[T]):
 success_response = SuccessResponse
 error_response = ErrorResponse
 page_response = PageResponse
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and (
+        if_none_match.strip() == "*"
+        or etag in [tag.strip() for tag in if_none_match.split(",")]
+    )
+
+
+def cached_response(
+    request: Request,
+    etag: str,
+    content: bytes,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    返回预编码的 JSON 对象，content 的字段与每次请求变化的 time/requestId 合并，
+    If-None-Match 命中时返回 304
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    base = orjson.dumps(success_response().model_dump())
+    if content != b"{}":
+        base = base[:-1] + b"," + content[1:]
+    return Response(content=base, media_type="application/json", headers=headers)
@@ -0,0 +1,60 @@
+import os
+import tempfile
+from pathlib import Path
+
+# 测试使用独立的 SQLite 数据库和数据目录，需要在导入配置之前设置
+TEST_PATH = Path(tempfile.mkdtemp(prefix="senweaver-test-"))
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{TEST_PATH / 'test.db'}",
+    REDIS_URL="redis://localhost:6379/15",
+    CORS_ALLOW_ORIGINS="http://localhost",
+    LOG_PATH=str(TEST_PATH / "logs"),
+    UPLOAD_PATH=str(TEST_PATH / "uploads"),
+    UPLOAD_TEMP_PATH=str(TEST_PATH / "uploads" / ".tmp"),
+    THUMBNAIL_PATH=str(TEST_PATH / "thumbnails"),
+    OPENAPI_CACHE_PATH=str(TEST_PATH / "openapi"),
+)
+# 上传目录存在时才挂载静态文件
+(TEST_PATH / "uploads").mkdir()
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+
+@pytest.fixture(scope="session")
+def app():
+    from senweaver.server import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+async def engine(app):
+    """每个测试重建数据表，db() 可以在请求之外使用"""
+    from senweaver.db.session import async_engine
+    from senweaver.middleware.db import SQLAlchemyASGIMiddleware
+
+    SQLAlchemyASGIMiddleware(None, custom_engine=async_engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield async_engine
+    await async_engine.dispose()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+@pytest.fixture
+def queries(engine):
+    """统计执行的 SQL 语句数量"""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.system.logic.attachment_logic import AttachmentLogic
+from app.system.logic.common_logic import CommonLogic
+from app.system.model.attachment import Attachment, AttachmentBlob
+from app.system.model.system_config import SystemConfig
+from config.settings import settings
+from senweaver.middleware.db import db
+
+
+def make_attachment(filepath: str, **kwargs) -> Attachment:
+    created_time = datetime.now(timezone.utc) - timedelta(days=30)
+    return Attachment(
+        filename="a.png",
+        suffix=".png",
+        filesize=1,
+        filepath=filepath,
+        mime_type="image/png",
+        hash="hash",
+        storage="local",
+        is_tmp=True,
+        created_time=created_time,
+        **kwargs,
+    )
+
+
+def write_temp_file(content: bytes):
+    settings.UPLOAD_TEMP_PATH.mkdir(parents=True, exist_ok=True)
+    path = settings.UPLOAD_TEMP_PATH / "upload.tmp"
+    path.write_bytes(content)
+    return path
+
+
+async def test_garbage_skips_attachments_referenced_in_text(engine):
+    cutoff = datetime.now(timezone.utc)
+    async with db(commit_on_exit=True):
+        db.session.add_all(
+            [
+                make_attachment("default/config/aa/used.png"),
+                make_attachment("default/config/bb/unused.png"),
+                SystemConfig(
+                    key="logo",
+                    value={
+                        "url": f"http://localhost{settings.UPLOAD_URL}"
+                        "/default/config/aa/used.png"
+                    },
+                ),
+            ]
+        )
+    async with db():
+        rows = await AttachmentLogic.find_garbage(db.session, cutoff, None, 100, False)
+    assert [row.filepath for row in rows] == ["default/config/bb/unused.png"]
+
+
+async def test_mark_used_in_clears_tmp_flag(engine):
+    async with db(commit_on_exit=True):
+        db.session.add(make_attachment("default/notice/cc/body.png"))
+    async with db(commit_on_exit=True):
+        await AttachmentLogic.mark_used_in(
+            db.session,
+            f'<p><img src="{settings.UPLOAD_URL}/default/notice/cc/body.png"></p>',
+        )
+    async with db():
+        is_tmp = await db.session.scalar(select(Attachment.is_tmp))
+    assert is_tmp is False
+
+
+async def test_save_blob_reuses_existing_file(engine):
+    content = b"same content"
+    async with db(commit_on_exit=True):
+        first = await CommonLogic.save_blob(
+            db.session, write_temp_file(content), "default", "ab" * 4, len(content), ""
+        )
+    async with db(commit_on_exit=True):
+        second = await CommonLogic.save_blob(
+            db.session, write_temp_file(content), "default", "ab" * 4, len(content), ""
+        )
+    async with db():
+        ref_count = await db.session.scalar(select(AttachmentBlob.ref_count))
+    assert first == second
+    assert ref_count == 2
+    assert (settings.UPLOAD_PATH / first).read_bytes() == content
+
+
+async def test_save_blob_keeps_temp_file_when_blob_was_swept(engine):
+    # 清理任务已删除记录但还没删除文件时，新上传不能依赖这个文件
+    content = b"swept content"
+    orphan = settings.UPLOAD_PATH / "default" / "cd" / ("cd" * 4)
+    orphan.parent.mkdir(parents=True, exist_ok=True)
+    orphan.write_bytes(content)
+    async with db(commit_on_exit=True):
+        filepath = await CommonLogic.save_blob(
+            db.session, write_temp_file(content), "default", "cd" * 4, len(content), ""
+        )
+    orphan.unlink()
+    assert (settings.UPLOAD_PATH / filepath).read_bytes() == content
+    async with db():
+        blob = await db.session.scalar(select(AttachmentBlob))
+    assert blob.filepath == filepath
+    assert blob.ref_count == 1
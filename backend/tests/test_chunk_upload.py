@@ -0,0 +1,102 @@
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from sqlalchemy import select
+from starlette.requests import ClientDisconnect
+
+from app.system.logic.common_logic import CommonLogic
+from app.system.model.attachment import Attachment
+from app.system.schema.file import IChunkUploadInit
+from config.settings import settings
+from senweaver.middleware.db import db
+
+PART_SIZE = 64 * 1024
+
+
+def make_request(body: bytes = b"", disconnect_after: int = -1) -> Request:
+    """分片请求，disconnect_after >= 0 时发送该长度后断开连接"""
+    messages = []
+    if disconnect_after >= 0:
+        messages.append(
+            {"type": "http.request", "body": body[:disconnect_after], "more_body": True}
+        )
+        messages.append({"type": "http.disconnect"})
+    else:
+        step = 4096
+        for offset in range(0, len(body), step):
+            messages.append(
+                {
+                    "type": "http.request",
+                    "body": body[offset : offset + step],
+                    "more_body": offset + step < len(body),
+                }
+            )
+        if not messages:
+            messages.append({"type": "http.request", "body": b""})
+
+    async def receive():
+        return messages.pop(0)
+
+    auth = SimpleNamespace(db=db, get_creator_data=lambda model: {})
+    return Request(
+        {
+            "type": "http",
+            "method": "PUT",
+            "path": "/file/chunk",
+            "headers": [],
+            "user": SimpleNamespace(id=1),
+            "auth": auth,
+        },
+        receive,
+    )
+
+
+@pytest.fixture(autouse=True)
+def part_size(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_PART_SIZE", PART_SIZE)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16 * 1024)
+
+
+async def test_resume_after_interrupted_chunk(engine):
+    content = os.urandom(PART_SIZE * 3 - 100)
+    parts = [content[i : i + PART_SIZE] for i in range(0, len(content), PART_SIZE)]
+    async with db(commit_on_exit=True):
+        upload = await CommonLogic.init_chunk_upload(
+            make_request(),
+            IChunkUploadInit(
+                filename="big.bin", filesize=len(content), category="files"
+            ),
+        )
+        upload_id = upload["upload_id"]
+        assert upload["chunk_count"] == 3
+        await CommonLogic.upload_chunk(make_request(parts[0]), upload_id, 0)
+        # 上传第二个分片时连接中断，不保留不完整的分片
+        with pytest.raises(ClientDisconnect):
+            await CommonLogic.upload_chunk(
+                make_request(parts[1], disconnect_after=PART_SIZE // 2), upload_id, 1
+            )
+    chunk_dir = CommonLogic.get_chunk_dir(upload_id)
+    assert not list(chunk_dir.glob("*.tmp"))
+    # 进程被杀死时来不及清理，留下写了一半的临时文件
+    chunk_dir.joinpath(f"2.{'0' * 32}.tmp").write_bytes(parts[2][:1000])
+
+    # 重新连接后查询已接收的分片，只上传缺少的分片
+    async with db(commit_on_exit=True):
+        status = await CommonLogic.get_chunk_status(make_request(), upload_id)
+        assert status["chunks"] == [0]
+        for index in range(3):
+            if index not in status["chunks"]:
+                await CommonLogic.upload_chunk(
+                    make_request(parts[index]), upload_id, index
+                )
+        data = await CommonLogic.complete_chunk_upload(make_request(), upload_id)
+
+    assert data["filesize"] == len(content)
+    assert data["hash"] == hashlib.sha1(content).hexdigest()
+    assert not chunk_dir.exists()
+    async with db():
+        filepath = await db.session.scalar(select(Attachment.filepath))
+    assert (settings.UPLOAD_PATH / filepath).read_bytes() == content
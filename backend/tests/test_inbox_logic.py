@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.system.model.role import Role
+from app.system.model.user import User
+from plugins.notifications.logic.inbox_logic import InboxLogic
+from plugins.notifications.model import Notice, NoticeInbox, NoticeRole
+from senweaver.middleware.db import db
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+async def redis(monkeypatch, engine):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(InboxLogic, "get_redis", classmethod(lambda cls: client))
+    yield client
+    await client.aclose()
+
+
+async def wait_tasks():
+    while InboxLogic.tasks:
+        await asyncio.gather(*InboxLogic.tasks)
+
+
+async def test_count_is_not_cached_while_inbox_changes(redis):
+    async with db(commit_on_exit=True):
+        db.session.add(NoticeInbox(owner_id=1, notice_id=1, unread=True))
+    # 修改已提交但还没有累加计数时统计，结果不能写入缓存，否则会多算一次
+    await InboxLogic.hold_counts([1])
+    async with db(commit_on_exit=True):
+        db.session.add(NoticeInbox(owner_id=1, notice_id=2, unread=True))
+    async with db():
+        assert await InboxLogic.get_unread_count(db.session, 1) == 2
+    assert await redis.get(InboxLogic.counter_key(1)) is None
+    await InboxLogic.change_counts({1: 1})
+    async with db():
+        assert await InboxLogic.get_unread_count(db.session, 1) == 2
+    assert await redis.get(InboxLogic.counter_key(1)) == "2"
+    await InboxLogic.change_counts({1: -1})
+    assert await redis.get(InboxLogic.counter_key(1)) == "1"
+
+
+async def test_count_is_not_cached_when_version_changed(redis, monkeypatch):
+    async with db(commit_on_exit=True):
+        db.session.add(NoticeInbox(owner_id=1, notice_id=1, unread=True))
+    count = InboxLogic.get_unread_count
+
+    async def change_during_count(session, owner_id):
+        # 统计之后、写入缓存之前完成一次修改
+        await InboxLogic.hold_counts([owner_id])
+        await InboxLogic.change_counts({owner_id: 0})
+
+    async with db():
+        original = db.session.scalar
+
+        async def scalar(*args, **kwargs):
+            result = await original(*args, **kwargs)
+            await change_during_count(db.session, 1)
+            return result
+
+        monkeypatch.setattr(db.session, "scalar", scalar)
+        assert await count(db.session, 1) == 1
+    assert await redis.get(InboxLogic.counter_key(1)) is None
+
+
+async def test_role_member_receives_published_notices(redis):
+    async with db(commit_on_exit=True):
+        session = db.session
+        role = Role(name="editor", code="editor")
+        user = User(username="alice", nickname="alice", password="x")
+        session.add_all([role, user])
+        await session.flush()
+        notice = Notice(title="t", notice_type=Notice.NoticeChoices.ROLE)
+        session.add(notice)
+        await session.flush()
+        session.add(NoticeRole(notice_id=notice.id, role_id=role.id))
+    await InboxLogic.fanout(notice.id)
+    await wait_tasks()
+    async with db():
+        assert await db.session.scalar(select(NoticeInbox.owner_id)) is None
+    # 发布后加入角色的用户补写收件箱
+    async with db(commit_on_exit=True):
+        result = await db.session.execute(select(User).where(User.id == user.id))
+        member = result.scalars().first()
+        await db.session.refresh(member, ["roles"])
+        member.roles = [await db.session.get(Role, role.id)]
+    await wait_tasks()
+    async with db():
+        owners = (await db.session.execute(select(NoticeInbox.owner_id))).scalars()
+        assert list(owners) == [user.id]
+        assert await InboxLogic.get_unread_count(db.session, user.id) == 1
+    # 移出角色后移除
+    async with db(commit_on_exit=True):
+        result = await db.session.execute(select(User).where(User.id == user.id))
+        member = result.scalars().first()
+        await db.session.refresh(member, ["roles"])
+        member.roles = []
+    await wait_tasks()
+    async with db():
+        assert await db.session.scalar(select(NoticeInbox.owner_id)) is None
+    assert await redis.get(InboxLogic.counter_key(user.id)) == "0"
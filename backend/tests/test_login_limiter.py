@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from fastapi import Request
+
+from config.settings import settings
+from senweaver.auth.limiter import LoginLimiter, get_client_ip
+from senweaver.exception.http_exception import TooManyRequestsException
+
+
+def make_request(client: str, headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/login",
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in headers.items()
+            ],
+            "client": (client, 50000),
+            "app": SimpleNamespace(state=SimpleNamespace(redis=None)),
+        }
+    )
+
+
+async def test_spoofed_forwarded_headers_do_not_bypass_limit(monkeypatch):
+    # 同一连接地址伪造 10000 个不同的转发地址，允许校验密码的次数不超过令牌桶容量
+    monkeypatch.setattr(settings, "LOGIN_RATE", 0.01)
+    limiter = LoginLimiter()
+    hashes = 0
+    for index in range(10000):
+        request = make_request(
+            "203.0.113.7",
+            {
+                "X-Forwarded-For": f"10.{index >> 16 & 255}.{index >> 8 & 255}"
+                f".{index & 255}",
+                "X-Real-IP": f"198.51.100.{index & 255}",
+            },
+        )
+        try:
+            await limiter.check(request, f"user{index}")
+        except TooManyRequestsException:
+            continue
+        hashes += 1
+    assert hashes <= settings.LOGIN_BURST
+
+
+def test_forwarded_header_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_TRUSTED_PROXIES", ["10.0.0.0/8"])
+    headers = {"X-Forwarded-For": "1.1.1.1, 203.0.113.7, 10.0.0.2"}
+    assert get_client_ip(make_request("10.0.0.1", headers)) == "203.0.113.7"
+    assert get_client_ip(make_request("203.0.113.9", headers)) == "203.0.113.9"
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from plugins.notifications.logic.notice_logic import NoticeLogic
+from plugins.notifications.model import Notice, NoticeUserRead
+from senweaver.middleware.db import db
+
+
+def make_request(owner_id: int):
+    auth = SimpleNamespace(db=db, get_creator_data=lambda model: {})
+    return SimpleNamespace(auth=auth, user=SimpleNamespace(id=owner_id))
+
+
+async def create_notices(count: int) -> list[int]:
+    async with db(commit_on_exit=True):
+        notices = [
+            Notice(title=f"n{index}", notice_type=Notice.NoticeChoices.USER)
+            for index in range(count)
+        ]
+        db.session.add_all(notices)
+        await db.session.flush()
+        ids = [notice.id for notice in notices]
+        # 一半已有未读记录，一半需要新增
+        db.session.add_all(
+            [
+                NoticeUserRead(notice_id=notice_id, owner_id=1, unread=True)
+                for notice_id in ids[::2]
+            ]
+        )
+    return ids
+
+
+async def read_queries(queries, ids: list[int]) -> int:
+    async with db():
+        start = queries.count
+        assert await NoticeLogic.read_message(make_request(1), ids) == len(ids)
+        return queries.count - start
+
+
+async def test_read_message_queries_do_not_grow_with_ids(engine, queries):
+    few = await create_notices(4)
+    many = await create_notices(200)
+    assert await read_queries(queries, few) == await read_queries(queries, many)
+    async with db():
+        unread = await db.session.scalar(
+            select(func.count())
+            .select_from(NoticeUserRead)
+            .where(NoticeUserRead.unread.is_(True))
+        )
+    assert unread == 0
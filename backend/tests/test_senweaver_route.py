@@ -0,0 +1,65 @@
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+
+from senweaver.core.senweaver_route import SenweaverRoute
+
+CHUNK = b"x" * (1024 * 1024)
+CHUNK_COUNT = 100
+
+
+def make_app(produced: list[float]) -> FastAPI:
+    router = APIRouter(route_class=SenweaverRoute)
+
+    @router.post("/export")
+    async def export():
+        async def content():
+            for _ in range(CHUNK_COUNT):
+                produced.append(time.perf_counter())
+                yield CHUNK
+
+        return StreamingResponse(content(), media_type="text/plain")
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def test_streamed_post_response_is_not_buffered():
+    produced: list[float] = []
+    app = make_app(produced)
+    first_byte = []
+    size = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/export",
+        "raw_path": b"/export",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if not first_byte:
+                first_byte.append((time.perf_counter(), len(produced)))
+            size += len(message["body"])
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    assert size == len(CHUNK) * CHUNK_COUNT
+    first_time, first_produced = first_byte[0]
+    # 收到第一块内容时只生成了第一个分片，不需要等待 100 MB 全部生成
+    assert first_produced == 1
+    assert first_time - started < elapsed / 10
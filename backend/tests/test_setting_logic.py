@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from plugins.settings.logic.setting_logic import SettingLogic
+from plugins.settings.model.setting import Setting
+from senweaver.middleware.db import db
+
+
+class TenSettings(BaseModel):
+    TEST_1: int = 0
+    TEST_2: int = 0
+    TEST_3: int = 0
+    TEST_4: int = 0
+    TEST_5: int = 0
+    TEST_6: int = 0
+    TEST_7: int = 0
+    TEST_8: int = 0
+    TEST_9: int = 0
+    TEST_10: int = 0
+
+
+def make_request(user_id: int = 1):
+    auth = SimpleNamespace(
+        db=db, get_creator_data=lambda model: {"creator_id": user_id}
+    )
+    return SimpleNamespace(user=SimpleNamespace(id=user_id), auth=auth)
+
+
+async def test_save_commits_and_refreshes_snapshot(engine):
+    async with db():
+        data = await SettingLogic.save(
+            make_request(), "test", TenSettings(TEST_1=1, TEST_2=2)
+        )
+    assert (data.TEST_1, data.TEST_2) == (1, 2)
+    # 新的会话能读到已提交的值
+    async with db():
+        rows = (await db.session.execute(Setting.__table__.select())).all()
+    assert {row.name: row.value for row in rows} == {"TEST_1": 1, "TEST_2": 2}
+
+    async with db():
+        data = await SettingLogic.save(make_request(), "test", TenSettings(TEST_1=5))
+    assert (data.TEST_1, data.TEST_2) == (5, 2)
+
+
+async def test_read_ten_settings_without_queries(engine, queries):
+    values = {f"TEST_{index}": index for index in range(1, 11)}
+    async with db():
+        await SettingLogic.save(make_request(), "test", TenSettings(**values))
+        await SettingLogic.get_settings(db.session, TenSettings)
+    queries.count = 0
+    async with db():
+        for name, value in values.items():
+            data = await SettingLogic.get_settings(db.session, TenSettings)
+            assert getattr(data, name) == value
+    assert queries.count == 0
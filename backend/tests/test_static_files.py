@@ -0,0 +1,29 @@
+import httpx
+from sqlalchemy import event
+
+from config.settings import settings
+from senweaver.middleware.db import db
+
+
+async def test_static_file_does_not_check_out_connection(app, engine):
+    path = settings.UPLOAD_PATH / "public" / "static.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"static")
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)
+    event.listen(engine.sync_engine, "checkout", listener)
+    try:
+        used = db.stats.used
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            for _ in range(20):
+                response = await client.get(f"{settings.UPLOAD_PUBLIC_URL}/static.txt")
+                assert response.status_code == 200
+                assert response.content == b"static"
+    finally:
+        event.remove(engine.sync_engine, "checkout", listener)
+    # 静态文件请求创建了会话上下文，但没有从连接池取出连接
+    assert checkouts == []
+    assert db.stats.used == used